@@ -0,0 +1,111 @@
+"""
+Benchmark of the standings engine (`utils.standings`) on synthetic multi-season league data.
+
+Every competition plays a double round-robin per season. The vectorized engine is compared with
+a per-match loop that only accumulates the counts (no form, team details or ranking).
+
+Usage (from the repository root):
+    python benchmarks/bench_standings.py --competitions 10 --seasons 10 --teams 20
+"""
+import argparse
+import collections
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from utils.standings import compute_standings  # noqa: E402
+
+
+def synthetic_matches(competitions: int, seasons: int, teams: int, seed: int = 42) -> pd.DataFrame:
+    """Double round-robin results for every competition and season, with Poisson distributed goals."""
+    rng = np.random.default_rng(seed)
+    home, away = np.array([(h, a) for h in range(teams) for a in range(teams) if h != a]).T
+    matches_per_season = len(home)
+    matchday = np.arange(matches_per_season) // (teams // 2) + 1
+
+    frames = []
+    for competition in range(competitions):
+        for season in range(seasons):
+            start = pd.Timestamp(2000 + season, 8, 1, tz='UTC')
+            team_ids = competition * 1000 + np.arange(teams)
+            frames.append(pd.DataFrame({
+                'competition_id': 2000 + competition,
+                'season_start_date': start.date(),
+                'utc_date': start + pd.to_timedelta(matchday * 7, unit='D'),
+                'status': 'FINISHED',
+                'matchday': matchday,
+                'stage': 'REGULAR_SEASON',
+                'home_team_id': team_ids[home],
+                'home_team_name': [f'Team {team_id}' for team_id in team_ids[home]],
+                'home_team_short_name': None,
+                'home_team_tla': None,
+                'home_team_crest': None,
+                'away_team_id': team_ids[away],
+                'away_team_name': [f'Team {team_id}' for team_id in team_ids[away]],
+                'away_team_short_name': None,
+                'away_team_tla': None,
+                'away_team_crest': None,
+                'full_time_home': rng.poisson(1.5, matches_per_season),
+                'full_time_away': rng.poisson(1.1, matches_per_season),
+            }))
+    return pd.concat(frames, ignore_index=True)
+
+
+def loop_standings(matches: pd.DataFrame) -> dict:
+    """Reference implementation: one dict update per team and match."""
+    table = collections.defaultdict(lambda: [0, 0, 0, 0, 0, 0])
+    for match in matches.itertuples(index=False):
+        season = match.season_start_date.year
+        for team_id, goals_for, goals_against in (
+            (match.home_team_id, match.full_time_home, match.full_time_away),
+            (match.away_team_id, match.full_time_away, match.full_time_home),
+        ):
+            row = table[(match.competition_id, season, team_id)]
+            row[0] += 1
+            row[1] += goals_for > goals_against
+            row[2] += goals_for == goals_against
+            row[3] += goals_for < goals_against
+            row[4] += goals_for
+            row[5] += goals_against
+    return table
+
+
+def timed(function, *args, repeat=3, **kwargs) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(*args, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark of the standings engine')
+    parser.add_argument('--competitions', type=int, default=10)
+    parser.add_argument('--seasons', type=int, default=10)
+    parser.add_argument('--teams', type=int, default=20)
+    args = parser.parse_args()
+
+    matches = synthetic_matches(args.competitions, args.seasons, args.teams)
+    standings = compute_standings(matches)
+    assert len(standings) == args.competitions * args.seasons * args.teams
+
+    results = {
+        'benchmark': 'standings',
+        'matches': len(matches),
+        'vectorized_s': timed(compute_standings, matches),
+        'vectorized_matchday_s': timed(compute_standings, matches, matchday=args.teams - 1),
+        'loop_s': timed(loop_standings, matches, repeat=1),
+    }
+    results['speedup'] = results['loop_s'] / results['vectorized_s']
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,165 @@
+"""
+Cold start of the extractor: the time (and peak RSS) a fresh process takes to get to the first request
+of a task, which every Airflow task pays since each one runs in a new container.
+
+Each target is run as a new process, `--repeat` times after one unmeasured warm-up run (the files are
+in the page cache, as for tasks scheduled one after the other), and the median time is kept:
+    help            python main.py --help (interpreter, click and the CLI)
+    <request_type>  import main, configure the telemetry and import the modules of the request type
+    docker          docker run --rm <image> python main.py --help, with --image and a docker CLI
+
+The peak RSS is the maximum resident memory of the process (`rss_delta_mb`, as it starts from nothing);
+it isn't measured for the docker target, where the process is the docker CLI.
+
+Usage (from the repository root):
+    python benchmarks/cold_start.py
+    python benchmarks/cold_start.py --image football_image --baseline benchmarks/results/cold_start_baseline.json
+"""
+from typing import Dict, List
+import argparse
+import datetime
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(os.path.dirname(BENCHMARKS_DIR), 'src')
+sys.path.insert(0, BENCHMARKS_DIR)
+
+from common import compare, environment, load_results, save_results  # noqa: E402
+
+# The modules each request type of main.py imports once the arguments are parsed
+REQUEST_MODULES = {
+    'teams': ['utils.teams_api'],
+    'teams_upcoming_matches': ['utils.teams_api'],
+    'competitions': ['utils.competitions_api'],
+    'competitions_standings': ['utils.competitions_api'],
+    'competitions_top_scorers': ['utils.competitions_api'],
+    'matches_today': ['utils.matches_api'],
+    'matches': ['utils.matches_api'],
+    'matches_live': ['utils.matches_api', 'utils.matches_live'],
+    'team_ratings': ['utils.ratings'],
+    'partitions_retention': ['utils.database', 'utils.partitions'],
+    'landing_import': ['utils.database', 'utils.sinks'],
+}
+
+
+def request_command(request_type: str) -> List[str]:
+    """The command importing what `main.py --request_type <request_type>` imports before its first request."""
+    imports = '; '.join(f'import {module}' for module in REQUEST_MODULES[request_type])
+    return [sys.executable, '-c', f'import main; main.configure_telemetry(); {imports}']
+
+
+def run_once(command: List[str], cwd: str = SRC_DIR) -> Dict[str, float]:
+    """
+    Runs a command as a new process.
+
+    Returns:
+        Dict[str, float]: Its wall time (`seconds`) and maximum resident memory in MB (`rss_delta_mb`).
+
+    Raises:
+        RuntimeError: If the command fails.
+    """
+    start = time.perf_counter()
+    process = subprocess.Popen(command, cwd=cwd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    _, status, usage = os.wait4(process.pid, 0)
+    seconds = time.perf_counter() - start
+    process.returncode = os.waitstatus_to_exitcode(status)
+    stderr = process.stderr.read().decode(errors='replace')
+    process.stderr.close()
+    if process.returncode != 0:
+        raise RuntimeError(f"{' '.join(command)} failed ({process.returncode}): {stderr.strip()[-500:]}")
+    # ru_maxrss is in KB on Linux
+    return {'seconds': seconds, 'rss_delta_mb': usage.ru_maxrss / 1024}
+
+
+def measure_start(command: List[str], repeat: int = 5, memory: bool = True) -> Dict[str, float]:
+    """
+    Measures the cold start of a command: one warm-up run, then the median of `repeat` runs.
+
+    Returns:
+        Dict[str, float]: The median, min and max `seconds` and, with `memory`, the highest `rss_delta_mb`.
+    """
+    run_once(command)
+    runs = [run_once(command) for _ in range(repeat)]
+    seconds = [run['seconds'] for run in runs]
+    result = {
+        'seconds': round(statistics.median(seconds), 6),
+        'min_seconds': round(min(seconds), 6),
+        'max_seconds': round(max(seconds), 6),
+    }
+    if memory:
+        result['rss_delta_mb'] = round(max(run['rss_delta_mb'] for run in runs), 2)
+    return result
+
+
+def run(request_types: List[str] = None, repeat: int = 5, image: str = None) -> Dict:
+    """
+    Measures the cold start of `--help`, of every request type and, with `image`, of a container.
+
+    Args:
+        request_types (List[str], optional): The request types to measure. Defaults to all of them.
+        repeat (int, optional): Measured runs of each target. Defaults to 5.
+        image (str, optional): The extractor image to start with `docker run`. Defaults to None.
+
+    Returns:
+        Dict: `environment` and `benchmarks` (`cold_start.<target>` -> {'start': measurements}), in the
+        format of `run_benchmarks.run`, so `common.compare` works on it.
+    """
+    targets = {'help': ([sys.executable, 'main.py', '--help'], True)}
+    for request_type in request_types or REQUEST_MODULES:
+        targets[request_type] = (request_command(request_type), True)
+    if image:
+        if shutil.which('docker') is None:
+            raise RuntimeError('--image needs the docker CLI')
+        targets['docker'] = (['docker', 'run', '--rm', image, 'python', 'main.py', '--help'], False)
+
+    results = {'environment': environment(), 'repeat': repeat, 'image': image, 'benchmarks': {}}
+    for target, (command, memory) in targets.items():
+        print(f'Measuring cold start of {target}...', file=sys.stderr)
+        results['benchmarks'][f'cold_start.{target}'] = {'start': measure_start(command, repeat, memory)}
+    return results
+
+
+def print_summary(results: Dict) -> None:
+    print(f"{'target':<40} {'median s':>10} {'min s':>10} {'max s':>10} {'peak MB':>9}")
+    for key, result in results['benchmarks'].items():
+        start = result['start']
+        peak = f"{start['rss_delta_mb']:>9.1f}" if 'rss_delta_mb' in start else f"{'-':>9}"
+        print(f"{key:<40} {start['seconds']:>10.3f} {start['min_seconds']:>10.3f} {start['max_seconds']:>10.3f} {peak}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Cold start time of the extractor, per request type')
+    parser.add_argument('--request-types', nargs='+', choices=sorted(REQUEST_MODULES), help='Default: all of them')
+    parser.add_argument('--repeat', type=int, default=5, help='Measured runs of each target')
+    parser.add_argument('--image', help='Also measure `docker run` of this image (e.g. football_image)')
+    parser.add_argument('--output', help='Results file (default: benchmarks/results/cold_start_<timestamp>.json)')
+    parser.add_argument('--baseline', help='Results of a previous run to compare with')
+    parser.add_argument('--threshold', type=float, default=0.25, help='Allowed relative regression (0.25 = 25%%)')
+    parser.add_argument('--min-seconds', type=float, default=0.05, help='Time regressions below this are ignored')
+    args = parser.parse_args()
+
+    results = run(args.request_types, args.repeat, args.image)
+    output = args.output or os.path.join(
+        BENCHMARKS_DIR, 'results', 'cold_start_' + datetime.datetime.now().strftime('%Y%m%dT%H%M%S') + '.json')
+    save_results(results, output)
+    print_summary(results)
+    print(f'Results written to {output}')
+
+    if args.baseline:
+        rows = compare(results, load_results(args.baseline), args.threshold, args.min_seconds)
+        regressions = [row for row in rows if row['regressed']]
+        for row in regressions:
+            print(f"REGRESSION {row['benchmark']} {row['metric']}: "
+                  f"{row['baseline']} -> {row['current']} ({row['change']:+.0%})")
+        if regressions:
+            sys.exit(1)
+        print(f'No cold start regressed beyond {args.threshold:.0%} of {args.baseline}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+"""
+Measurement helpers shared by the benchmarks: wall time and peak RSS of each stage, JSON results
+and the comparison of a run with a baseline run.
+
+The peak RSS of a stage is sampled by a background thread while the stage runs (resident memory of
+the process, from /proc on Linux). It includes the memory still held from the previous stages, so
+`rss_delta_mb` (peak minus the RSS when the stage started) is the part the stage itself needed.
+"""
+from typing import Callable, Dict, List, Tuple
+import datetime
+import json
+import os
+import platform
+import resource
+import threading
+import time
+
+PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+
+def current_rss_mb() -> float:
+    """Returns the resident memory of the process, in MB."""
+    try:
+        with open('/proc/self/statm') as file:
+            return int(file.read().split()[1]) * PAGE_SIZE / 1024 ** 2
+    except OSError:
+        # No /proc (e.g. macOS): the peak of the process is the closest available value (bytes on macOS)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 1024 ** 2 if platform.system() == 'Darwin' else peak / 1024
+
+
+class PeakRSS:
+    """
+    Samples the resident memory in a background thread while the `with` block runs.
+
+    Attributes:
+        interval (float): Seconds between samples.
+        start_mb (float): The RSS when the block started.
+        peak_mb (float): The highest RSS sampled.
+    """
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.start_mb = 0.0
+        self.peak_mb = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.peak_mb = max(self.peak_mb, current_rss_mb())
+
+    def __enter__(self) -> 'PeakRSS':
+        self.start_mb = self.peak_mb = current_rss_mb()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.peak_mb = max(self.peak_mb, current_rss_mb())
+
+
+def measure(function: Callable, *args, **kwargs) -> Tuple[object, Dict[str, float]]:
+    """
+    Runs a stage, measuring its wall time and peak RSS.
+
+    Args:
+        function (Callable): The stage.
+
+    Returns:
+        Tuple[object, Dict[str, float]]: The result of the stage, and its `seconds`, `peak_rss_mb` and `rss_delta_mb`.
+    """
+    with PeakRSS() as rss:
+        start = time.perf_counter()
+        result = function(*args, **kwargs)
+        seconds = time.perf_counter() - start
+    return result, {
+        'seconds': round(seconds, 6),
+        'peak_rss_mb': round(rss.peak_mb, 2),
+        'rss_delta_mb': round(rss.peak_mb - rss.start_mb, 2),
+    }
+
+
+def environment() -> Dict[str, str]:
+    """Describes where the benchmark ran, so results from different machines aren't compared blindly."""
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpus': os.cpu_count(),
+        'created_at': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+    }
+
+
+def save_results(results: Dict, path: str) -> None:
+    """Writes the results of a run as JSON, creating the directory if needed."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(results, file, indent=2, default=str)
+
+
+def load_results(path: str) -> Dict:
+    with open(path, encoding='utf-8') as file:
+        return json.load(file)
+
+
+def compare(current: Dict, baseline: Dict, threshold: float = 0.25, min_seconds: float = 0.05,
+            min_rss_mb: float = 20.0) -> List[Dict]:
+    """
+    Compares every stage of a run with the same stage of a baseline run.
+
+    A stage regresses when its time (or peak RSS delta) grows by more than `threshold` relative to the
+    baseline and by more than the noise floor (`min_seconds` / `min_rss_mb`) in absolute terms, so very
+    short stages don't fail the run because of timer jitter.
+
+    Args:
+        current (Dict): The results of the run (see `run_benchmarks.run`).
+        baseline (Dict): The results of the baseline run.
+        threshold (float, optional): Allowed relative growth. Defaults to 0.25 (25%).
+        min_seconds (float, optional): Time growth below this is ignored. Defaults to 0.05.
+        min_rss_mb (float, optional): Memory growth below this is ignored. Defaults to 20.
+
+    Returns:
+        List[Dict]: One row per stage present in both runs, with both values, the change and a `regressed` flag.
+    """
+    rows = []
+    for key, stages in current['benchmarks'].items():
+        for stage, metrics in stages.items():
+            before = baseline.get('benchmarks', {}).get(key, {}).get(stage)
+            # Only the measured stages (skipped stages and counts have no `seconds`)
+            if not isinstance(metrics, dict) or 'seconds' not in metrics or 'seconds' not in (before or {}):
+                continue
+            for metric, floor in (('seconds', min_seconds), ('rss_delta_mb', min_rss_mb)):
+                if metric not in metrics or metric not in before:
+                    continue
+                old, new = before[metric], metrics[metric]
+                change = (new - old) / old if old > 0 else 0.0
+                rows.append({
+                    'benchmark': key,
+                    'stage': stage,
+                    'metric': metric,
+                    'baseline': old,
+                    'current': new,
+                    'change': round(change, 4),
+                    'regressed': change > threshold and new - old > floor,
+                })
+    return rows
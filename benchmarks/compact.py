@@ -0,0 +1,188 @@
+"""
+A compact, columnar form of large match sets (e.g. the full history of the competitions), compared with
+the processors' DataFrames by `match_memory.py`. The extractor doesn't use it.
+
+`flatten_matches` holds every match several times at once: the validated models, one dict per row
+and the object columns of the DataFrame, each with its own copy of the repeated strings. Here the
+matches are validated and flattened one at a time, their values appended to per-column lists that
+are turned into an Arrow record batch every `batch_size` matches. The repeated strings (competition,
+team and area names, status, stage...) are dictionary encoded: each batch stores them once, plus an
+integer code per row, and they come back as categorical columns in pandas.
+
+Needs `src` on the path (as the benchmarks set it).
+"""
+from typing import Dict, Iterable, Iterator, Union
+import pandas as pd
+import pyarrow as pa
+
+from contracts.matches_contract import Match
+from utils.flatten import REFEREE_COLUMNS, match_row, referee_rows
+
+BATCH_SIZE = 10_000
+
+_TIMESTAMP = pa.timestamp('us', tz='UTC')
+_CATEGORY = pa.dictionary(pa.int32(), pa.string())
+
+# Same columns, in the same order, as the matches table of `flatten_matches`
+MATCH_SCHEMA = pa.schema([
+    ('id', pa.int64()),
+    ('utc_date', _TIMESTAMP),
+    ('status', _CATEGORY),
+    ('matchday', pa.int32()),
+    ('stage', _CATEGORY),
+    ('which_group', _CATEGORY),
+    ('last_updated', _TIMESTAMP),
+    ('area_id', pa.int32()),
+    ('area_name', _CATEGORY),
+    ('area_code', _CATEGORY),
+    ('area_flag', _CATEGORY),
+    ('competition_id', pa.int32()),
+    ('competition_name', _CATEGORY),
+    ('competition_code', _CATEGORY),
+    ('competition_type', _CATEGORY),
+    ('competition_emblem', _CATEGORY),
+    ('season_id', pa.int32()),
+    ('season_start_date', pa.date32()),
+    ('season_end_date', pa.date32()),
+    ('season_current_matchday', pa.int32()),
+    ('season_winner_id', pa.int32()),
+    ('home_team_id', pa.int32()),
+    ('home_team_name', _CATEGORY),
+    ('home_team_short_name', _CATEGORY),
+    ('home_team_tla', _CATEGORY),
+    ('home_team_crest', _CATEGORY),
+    ('away_team_id', pa.int32()),
+    ('away_team_name', _CATEGORY),
+    ('away_team_short_name', _CATEGORY),
+    ('away_team_tla', _CATEGORY),
+    ('away_team_crest', _CATEGORY),
+    ('score_winner', _CATEGORY),
+    ('score_duration', _CATEGORY),
+    ('full_time_home', pa.int32()),
+    ('full_time_away', pa.int32()),
+    ('half_time_home', pa.int32()),
+    ('half_time_away', pa.int32()),
+    ('raw_json', pa.string()),
+])
+
+REFEREE_SCHEMA = pa.schema([
+    ('match_id', pa.int64()),
+    ('referee_id', pa.int64()),
+    ('name', _CATEGORY),
+    ('type', _CATEGORY),
+    ('nationality', _CATEGORY),
+])
+
+
+def _to_batch(columns: Dict[str, list], schema: pa.Schema) -> pa.RecordBatch:
+    arrays = []
+    for field in schema:
+        if pa.types.is_dictionary(field.type):
+            arrays.append(pa.array(columns[field.name], type=pa.string()).dictionary_encode())
+        else:
+            arrays.append(pa.array(columns[field.name], type=field.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+class CompactMatches:
+    """
+    Accumulates matches in Arrow record batches (see the module docstring).
+
+    Attributes:
+        batch_size (int): Matches buffered as Python lists before they're converted to a batch.
+        rows (int): Matches appended so far.
+
+    Example:
+        compact = CompactMatches()
+        compact.extend(response['matches'])
+        tables = compact.to_tables()
+    """
+    def __init__(self, batch_size: int = BATCH_SIZE):
+        self.batch_size = batch_size
+        self.rows = 0
+        self._batches = {'matches': [], 'match_referees': []}
+        self._reset()
+
+    def _reset(self) -> None:
+        self._matches = {name: [] for name in MATCH_SCHEMA.names}
+        self._referees = {name: [] for name in REFEREE_COLUMNS}
+        self._buffered = 0
+
+    def append(self, match: Union[Match, dict]) -> None:
+        """
+        Appends one match.
+
+        Args:
+            match (Union[Match, dict]): The validated match, or the match as returned by the API (validated here).
+        """
+        if not isinstance(match, Match):
+            match = Match.model_validate(match)
+        for name, value in match_row(match).items():
+            self._matches[name].append(value)
+        for row in referee_rows(match):
+            for name, value in row.items():
+                self._referees[name].append(value)
+        self.rows += 1
+        self._buffered += 1
+        if self._buffered >= self.batch_size:
+            self._flush()
+
+    def extend(self, matches: Iterable[Union[Match, dict]]) -> 'CompactMatches':
+        """Appends every match of an iterable (which is consumed one match at a time)."""
+        for match in matches:
+            self.append(match)
+        return self
+
+    def _flush(self) -> None:
+        if self._buffered:
+            self._batches['matches'].append(_to_batch(self._matches, MATCH_SCHEMA))
+            self._batches['match_referees'].append(_to_batch(self._referees, REFEREE_SCHEMA))
+        self._reset()
+
+    def to_tables(self) -> Dict[str, pa.Table]:
+        """
+        Returns the matches appended so far.
+
+        Returns:
+            Dict[str, pa.Table]: The `matches` and `match_referees` tables.
+        """
+        self._flush()
+        return {
+            'matches': pa.Table.from_batches(self._batches['matches'], schema=MATCH_SCHEMA),
+            'match_referees': pa.Table.from_batches(self._batches['match_referees'], schema=REFEREE_SCHEMA),
+        }
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the record batches (not counting the matches still buffered)."""
+        return sum(batch.nbytes for batches in self._batches.values() for batch in batches)
+
+
+def compact_matches(matches: Iterable[Union[Match, dict]], batch_size: int = BATCH_SIZE) -> Dict[str, pa.Table]:
+    """
+    Builds the compact tables of a set of matches.
+
+    Args:
+        matches (Iterable[Union[Match, dict]]): The matches, validated or as returned by the API.
+        batch_size (int, optional): Matches per record batch. Defaults to BATCH_SIZE.
+
+    Returns:
+        Dict[str, pa.Table]: The `matches` and `match_referees` tables.
+    """
+    return CompactMatches(batch_size).extend(matches).to_tables()
+
+
+def iter_dataframes(table: pa.Table, rows: int = BATCH_SIZE) -> Iterator[pd.DataFrame]:
+    """
+    Converts a compact table into DataFrames of at most `rows` rows, so loading a large set never
+    needs all of its rows as Python objects at once.
+
+    Args:
+        table (pa.Table): A table of `compact_matches`.
+        rows (int, optional): Rows per DataFrame. Defaults to BATCH_SIZE.
+
+    Yields:
+        pd.DataFrame: The rows of the table, in order.
+    """
+    for batch in table.to_batches(max_chunksize=rows):
+        yield batch.to_pandas()
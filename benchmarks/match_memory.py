@@ -0,0 +1,123 @@
+"""
+Memory of a large match set in each in-memory representation, per 100k matches.
+
+Each representation is built in its own process (so what one of them freed doesn't lower the peak of
+the next), from the same synthetic match history streamed by `payloads.SyntheticResponses.iter_matches`:
+    response   the parsed JSON of the matches (what `requests` returns), nothing else
+    dataframe  the parsed JSON, the validated models and `flatten_matches` (the path of the processors)
+    compact    `compact.CompactMatches`, fed one match at a time (Arrow, dictionary encoded strings)
+
+`peak_mb` is the peak RSS while building minus the RSS before, `size_mb` the size of the built
+representation once the intermediate copies are dropped: the RSS growth for the response (nothing else
+is held), `memory_usage(deep=True)` of the DataFrames, the buffers of the Arrow tables. Both are for
+100k matches.
+
+Measured on Python 3.13, pandas 2.2, pydantic 2.11, pyarrow 26, 100k matches (the seconds include
+encoding and parsing the JSON of each match):
+    representation   peak_mb   size_mb   seconds
+    response             640       640       4.4
+    dataframe           1878       177      14.6
+    compact               64        22       6.3
+
+Usage (from the repository root):
+    python benchmarks/match_memory.py --count 100000
+"""
+from typing import Dict, List
+import argparse
+import datetime
+import gc
+import json
+import os
+import subprocess
+import sys
+import time
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(BENCHMARKS_DIR), 'src'))
+sys.path.insert(0, BENCHMARKS_DIR)
+
+from common import PeakRSS, environment, save_results  # noqa: E402
+
+REPRESENTATIONS = ('response', 'dataframe', 'compact')
+PER = 100_000
+
+
+def build(representation: str, count: int, seed: int = 42) -> Dict[str, float]:
+    """
+    Builds one representation of `count` matches in this process.
+
+    Returns:
+        Dict[str, float]: `seconds`, `peak_mb` and `size_mb` (not scaled).
+    """
+    from payloads import SyntheticResponses
+    from contracts.matches_contract import Match
+    from compact import CompactMatches
+    from utils.flatten import flatten_matches
+
+    matches = SyntheticResponses(1, seed).iter_matches(count)
+    gc.collect()
+    with PeakRSS() as rss:
+        start = time.perf_counter()
+        if representation == 'response':
+            held = [json.loads(json.dumps(match)) for match in matches]
+        elif representation == 'dataframe':
+            response = [json.loads(json.dumps(match)) for match in matches]
+            models = [Match.model_validate(match) for match in response]
+            held = flatten_matches(models)
+            del response, models
+        else:
+            held = CompactMatches().extend(json.loads(json.dumps(match)) for match in matches).to_tables()
+        seconds = time.perf_counter() - start
+
+    if representation == 'response':
+        size = rss.peak_mb - rss.start_mb
+    elif representation == 'dataframe':
+        size = sum(df.memory_usage(deep=True).sum() for df in held.values()) / 1024 ** 2
+    else:
+        size = sum(table.nbytes for table in held.values()) / 1024 ** 2
+    return {'seconds': seconds, 'peak_mb': rss.peak_mb - rss.start_mb, 'size_mb': size}
+
+
+def run(count: int, representations: List[str] = REPRESENTATIONS) -> Dict:
+    """
+    Builds every representation in a new process.
+
+    Returns:
+        Dict: `environment`, `count` and, per representation, its metrics scaled to 100k matches.
+    """
+    results = {'environment': environment(), 'count': count, 'representations': {}}
+    for representation in representations:
+        print(f'Building {count} matches as {representation}...', file=sys.stderr)
+        output = subprocess.run([sys.executable, __file__, '--child', representation, '--count', str(count)],
+                                capture_output=True, text=True, check=True).stdout
+        metrics = json.loads(output)
+        results['representations'][representation] = {
+            metric: round(value * PER / count, 2) for metric, value in metrics.items()
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Memory of a match set in each representation, per 100k matches')
+    parser.add_argument('--count', type=int, default=PER, help='Matches built')
+    parser.add_argument('--representations', nargs='+', choices=REPRESENTATIONS, default=list(REPRESENTATIONS))
+    parser.add_argument('--output', help='Results file (default: benchmarks/results/match_memory_<timestamp>.json)')
+    parser.add_argument('--child', choices=REPRESENTATIONS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(build(args.child, args.count)))
+        return
+
+    results = run(args.count, args.representations)
+    output = args.output or os.path.join(
+        BENCHMARKS_DIR, 'results', 'match_memory_' + datetime.datetime.now().strftime('%Y%m%dT%H%M%S') + '.json')
+    save_results(results, output)
+    print(f"{'representation':<16} {'peak_mb':>10} {'size_mb':>10} {'seconds':>9}   (per {PER} matches)")
+    for representation, metrics in results['representations'].items():
+        print(f"{representation:<16} {metrics['peak_mb']:>10.1f} {metrics['size_mb']:>10.1f} {metrics['seconds']:>9.2f}")
+    print(f'Results written to {output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""
+Throughput of the validation and transformation of large responses per number of workers of the
+processing pool (see `utils.parallel`), as in a replay or a backfill.
+
+Two workloads, from the synthetic responses of `payloads.py`:
+    matches  one matches response of `--count` matches, split in pages (`transform_matches_today`)
+    teams    the teams of every competition at `--scale`, one shard per competition (`transform_teams`)
+
+Each worker count is timed from the start of the pool (the workers import the processors on their first
+shard) to the last table decoded in this process, so the numbers include the pool and the Arrow IPC
+round trip. 1 worker runs in the process, as the processors do by default. `speedup` is relative to it;
+it can't go beyond the number of CPUs of the machine (in `environment`).
+
+Usage (from the repository root):
+    python benchmarks/parallel_transform.py --count 200000 --workers 1 2 4 8
+"""
+from typing import Dict, List
+import argparse
+import datetime
+import os
+import sys
+import time
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(BENCHMARKS_DIR), 'src'))
+sys.path.insert(0, BENCHMARKS_DIR)
+
+from common import environment, save_results  # noqa: E402
+from payloads import SyntheticResponses  # noqa: E402
+from utils.matches_api import transform_matches_today  # noqa: E402
+from utils.parallel import ShardPool, pages  # noqa: E402
+from utils.teams_api import transform_teams  # noqa: E402
+
+
+def workloads(count: int, scale: int, seed: int = 42) -> Dict[str, Dict]:
+    """The shards of each workload and the rows they produce (matches, teams)."""
+    responses = SyntheticResponses(scale, seed)
+    matches = {**responses.matches_today(), 'matches': list(SyntheticResponses(1, seed).iter_matches(count))}
+    teams = [(responses.teams(competition_id), competition_id) for competition_id in responses.competition_ids()]
+    return {
+        'matches': {'transform': transform_matches_today, 'shards': [(page,) for page in pages(matches)],
+                    'table': 'matches'},
+        'teams': {'transform': transform_teams, 'shards': teams, 'table': 'teams'},
+    }
+
+
+def run(count: int, scale: int, workers: List[int]) -> Dict:
+    """
+    Transforms every workload with every worker count.
+
+    Returns:
+        Dict: `environment` and, per workload and worker count, `seconds`, `rows_per_second` and `speedup`.
+    """
+    results = {'environment': environment(), 'cpus': os.cpu_count(), 'count': count, 'scale': scale, 'workloads': {}}
+    for name, workload in workloads(count, scale).items():
+        results['workloads'][name] = {}
+        for worker_count in workers:
+            print(f'Transforming {name} with {worker_count} workers...', file=sys.stderr)
+            start = time.perf_counter()
+            with ShardPool(worker_count) as pool:
+                rows = sum(len(shard.result()[workload['table']])
+                           for shard in pool.map(workload['transform'], workload['shards']))
+            seconds = time.perf_counter() - start
+            results['workloads'][name][worker_count] = {
+                'shards': len(workload['shards']),
+                'rows': rows,
+                'seconds': round(seconds, 3),
+                'rows_per_second': round(rows / seconds),
+            }
+        single = results['workloads'][name].get(1)
+        for metrics in results['workloads'][name].values():
+            metrics['speedup'] = round(single['seconds'] / metrics['seconds'], 2) if single else None
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Validation and transformation throughput per number of workers')
+    parser.add_argument('--count', type=int, default=100_000, help='Matches of the matches workload')
+    parser.add_argument('--scale', type=int, default=10, help='Scale of the teams responses (see payloads.py)')
+    parser.add_argument('--workers', type=int, nargs='+', default=sorted({1, 2, 4, os.cpu_count() or 1}))
+    parser.add_argument('--output', help='Results file (default: benchmarks/results/parallel_transform_<timestamp>.json)')
+    args = parser.parse_args()
+
+    results = run(args.count, args.scale, args.workers)
+    output = args.output or os.path.join(
+        BENCHMARKS_DIR, 'results', 'parallel_transform_' + datetime.datetime.now().strftime('%Y%m%dT%H%M%S') + '.json')
+    save_results(results, output)
+    print(f"{'workload':<10} {'workers':>8} {'shards':>7} {'rows':>9} {'seconds':>9} {'rows/s':>10} {'speedup':>8}   ({results['cpus']} CPUs)")
+    for name, runs in results['workloads'].items():
+        for worker_count, metrics in runs.items():
+            speedup = f"{metrics['speedup']:>8.2f}" if metrics['speedup'] else f"{'-':>8}"
+            print(f"{name:<10} {worker_count:>8} {metrics['shards']:>7} {metrics['rows']:>9} {metrics['seconds']:>9.2f} "
+                  f"{metrics['rows_per_second']:>10} {speedup}")
+    print(f'Results written to {output}')
+
+
+if __name__ == '__main__':
+    main()
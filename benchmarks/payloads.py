@@ -0,0 +1,542 @@
+"""
+Synthetic football-data.org payloads, valid for every contract in `src/contracts/`, at any scale.
+
+At scale 1 the responses have about the real size (13 competitions, 20 teams per competition with
+their squads, 20-team tables, 10 top scorers, a few matches per team and day). A scale of N multiplies
+the number of items inside each response (teams, table rows, scorers, matches) by N; the number of
+calls a processor makes stays the same, so a run at 100× measures responses 100 times larger.
+
+Everything is derived from the seed, so the same arguments always give the same bytes. The items of a
+response are produced by iterators and can be streamed (`stream_response`, `write_response`), so
+millions of matches can be written to disk or served by the stand-in server (`stand_in_server.py`)
+without holding them in memory.
+
+Usage (from the repository root), writing every endpoint plus a 2 million matches history:
+    python benchmarks/payloads.py --output /tmp/payloads --scale 10 --matches 2000000
+"""
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple
+import argparse
+import datetime
+import functools
+import json
+import os
+import random
+
+COMPETITIONS = 13
+TEAMS_PER_COMPETITION = 20
+SQUAD_SIZE = 30
+STAFF_SIZE = 5
+TOP_SCORERS = 10
+MATCHES_PER_TEAM = 5
+MATCHES_TODAY = 40
+SEASONS = 3
+# Cup competitions: only the current season is requested (see CompetitionsDetailsProcessor)
+CUP_IDS = (2000, 2001, 2018, 2152)
+# Kick-off times of a matchday (Friday to Sunday), as offsets from the first day
+KICK_OFFS = [datetime.timedelta(days=day, hours=hour, minutes=minute)
+             for day in range(3) for hour, minute in ((12, 30), (15, 0), (17, 30), (20, 0))]
+# Streamed responses are written in chunks of about this many bytes
+CHUNK_SIZE = 64 * 1024
+
+AREA = {"id": 2072, "name": "England", "code": "ENG", "flag": "https://crests.football-data.org/770.svg"}
+ODDS = {"msg": "Activate Odds-Package in User-Panel to retrieve odds."}
+
+# The nested objects repeated across items (competitions, seasons, teams, timestamps) are built once
+# and shared, which keeps the generator fast; consumers must copy them before changing them.
+
+# A response: the fields before the items, the key of the items, the items and the fields computed
+# from the items once they were all produced (e.g. counts)
+Response = Tuple[Dict[str, Any], str, Iterable[Dict[str, Any]], Callable[[], Dict[str, Any]]]
+
+
+def competition_ids(count: int = COMPETITIONS) -> List[int]:
+    """The competition ids, cups included."""
+    return list(CUP_IDS[:count]) + [2002 + i for i in range(count - len(CUP_IDS))]
+
+
+@functools.lru_cache(maxsize=None)
+def _competition(competition_id: int) -> Dict[str, Any]:
+    return {
+        "id": competition_id,
+        "name": f"Competition {competition_id}",
+        "code": f"C{competition_id % 1000}",
+        "type": "CUP" if competition_id in CUP_IDS else "LEAGUE",
+        "emblem": f"https://crests.football-data.org/{competition_id}.png",
+    }
+
+
+@functools.lru_cache(maxsize=None)
+def _season(year: int) -> Dict[str, Any]:
+    return {"id": year, "startDate": f"{year}-08-16", "endDate": f"{year + 1}-05-25", "currentMatchday": 13, "winner": None}
+
+
+@functools.lru_cache(maxsize=None)
+def _team_ref(team_id: int) -> Dict[str, Any]:
+    return {
+        "id": team_id,
+        "name": f"Team {team_id} FC",
+        "shortName": f"Team {team_id}",
+        "tla": f"T{team_id % 100:02d}",
+        "crest": f"https://crests.football-data.org/{team_id}.png",
+    }
+
+
+@functools.lru_cache(maxsize=None)
+def _timestamp(value: datetime.datetime) -> str:
+    return value.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def round_robin(teams: int) -> List[Tuple[int, int, int]]:
+    """
+    The fixtures of a double round-robin (circle method): (matchday, home index, away index),
+    every team playing once per matchday, home and away swapped in the second half.
+    """
+    slots = list(range(teams + teams % 2))
+    rounds = len(slots) - 1
+    fixtures = []
+    for matchday in range(rounds):
+        for i in range(len(slots) // 2):
+            home, away = slots[i], slots[-1 - i]
+            if max(home, away) >= teams:
+                continue  # Bye of the odd team out
+            if matchday % 2:
+                home, away = away, home
+            fixtures.append((matchday + 1, home, away))
+        slots.insert(1, slots.pop())
+    return fixtures + [(matchday + rounds, away, home) for matchday, home, away in fixtures]
+
+
+class SyntheticResponses:
+    """
+    Builds the responses of every endpoint used by the processors, deterministically for a seed.
+
+    Attributes:
+        scale (int): Multiplier of the number of items inside each response.
+        seed (int): Seed of the scores, dates and names.
+        competitions (int): Number of competitions (the first ones are the cups).
+        seasons (int): Number of seasons, up to the current one.
+    """
+    def __init__(self, scale: int = 1, seed: int = 42, competitions: int = COMPETITIONS, seasons: int = SEASONS):
+        self.scale = scale
+        self.seed = seed
+        self.competitions_count = competitions
+        self.seasons = seasons
+        self.today = datetime.date.today()
+
+    def _random(self, *key) -> random.Random:
+        return random.Random(f"{self.seed}-{'-'.join(map(str, key))}")
+
+    def competition_ids(self) -> List[int]:
+        return competition_ids(self.competitions_count)
+
+    def season_years(self) -> List[int]:
+        """The seasons (starting year), oldest first."""
+        current = self.today.year if self.today.month >= 8 else self.today.year - 1
+        return list(range(current - self.seasons + 1, current + 1))
+
+    def team_ids(self, competition_id: int) -> List[int]:
+        """Ids of the teams of a competition at this scale."""
+        return [competition_id * 10000 + i for i in range(TEAMS_PER_COMPETITION * self.scale)]
+
+    # Items of each endpoint
+
+    def _iter_competitions(self) -> Iterator[Dict[str, Any]]:
+        # The competitions list isn't paginated by the API; scaling repeats it with new ids
+        for copy in range(self.scale):
+            for competition_id in self.competition_ids():
+                yield {
+                    **_competition(competition_id),
+                    "id": competition_id + 100000 * copy,
+                    "area": AREA,
+                    "plan": "TIER_ONE",
+                    "currentSeason": _season(self.season_years()[-1]),
+                    "numberOfAvailableSeasons": self.seasons,
+                    "lastUpdated": "2024-12-01T00:00:00Z",
+                }
+
+    def _iter_table(self, competition_id: int, season: int) -> Iterator[Dict[str, Any]]:
+        rng = self._random("standings", competition_id, season)
+        for position, team_id in enumerate(self.team_ids(competition_id), start=1):
+            won, draw, lost = rng.randint(0, 20), rng.randint(0, 10), rng.randint(0, 20)
+            goals_for, goals_against = rng.randint(10, 80), rng.randint(10, 80)
+            yield {
+                "position": position,
+                "team": _team_ref(team_id),
+                "playedGames": won + draw + lost,
+                "form": ",".join(rng.choice("WDL") for _ in range(5)),
+                "won": won, "draw": draw, "lost": lost,
+                "points": won * 3 + draw,
+                "goalsFor": goals_for, "goalsAgainst": goals_against,
+                "goalDifference": goals_for - goals_against,
+            }
+
+    def _iter_scorers(self, competition_id: int, season: int) -> Iterator[Dict[str, Any]]:
+        rng = self._random("scorers", competition_id, season)
+        team_ids = self.team_ids(competition_id)
+        for i in range(TOP_SCORERS * self.scale):
+            player_id = competition_id * 100000 + i
+            yield {
+                "player": {
+                    "id": player_id, "name": f"Player {player_id}", "firstName": "Player", "lastName": str(player_id),
+                    "dateOfBirth": "1995-01-01", "nationality": "England", "section": "Offence",
+                    "position": "Centre-Forward", "shirtNumber": rng.randint(1, 99),
+                    "lastUpdated": "2024-12-01T00:00:00Z",
+                },
+                "team": {**_team_ref(team_ids[i % len(team_ids)]), "address": "Street 1"},
+                "playedMatches": rng.randint(1, 38),
+                "goals": max(1, 30 - i // self.scale),
+                "assists": rng.randint(0, 10),
+                "penalties": rng.choice([None, 0, 1, 2]),
+            }
+
+    def _iter_teams(self, competition_id: int) -> Iterator[Dict[str, Any]]:
+        for team_id in self.team_ids(competition_id):
+            yield {
+                **_team_ref(team_id),
+                "area": AREA,
+                "address": f"Street {team_id}",
+                "website": f"http://team{team_id}.example",
+                "founded": 1900 + team_id % 120,
+                "clubColors": "Red / White",
+                "venue": f"Stadium {team_id}",
+                "runningCompetitions": [_competition(competition_id)] + [_competition(cup) for cup in CUP_IDS[:2]],
+                "coach": {
+                    "id": team_id, "firstName": "Coach", "lastName": str(team_id), "name": f"Coach {team_id}",
+                    "dateOfBirth": "1970-01-01", "nationality": "England",
+                    "contract": {"start": "2023-07", "until": "2026-06"},
+                },
+                "squad": [
+                    {"id": team_id * 100 + i, "name": f"Player {team_id * 100 + i}",
+                     "position": ("Goalkeeper", "Defence", "Midfield", "Offence")[i % 4],
+                     "dateOfBirth": "1998-03-01", "nationality": "England"}
+                    for i in range(SQUAD_SIZE)
+                ],
+                "staff": [{"id": team_id * 10 + i, "name": f"Staff {i}", "dateOfBirth": None, "nationality": "England"}
+                          for i in range(STAFF_SIZE)],
+                "lastUpdated": "2024-12-01T00:00:00Z",
+            }
+
+    def match(self, match_id: int, competition_id: int, season: int, matchday: int, home_id: int, away_id: int,
+              utc_date: datetime.datetime, rng: random.Random) -> Dict[str, Any]:
+        """A match; played (with scores and referees) when its date is in the past."""
+        finished = utc_date.date() < self.today
+        home, away = (min(rng.randint(0, 6), rng.randint(0, 6)), min(rng.randint(0, 5), rng.randint(0, 5))) if finished else (None, None)
+        winner = None
+        if finished:
+            winner = "HOME_TEAM" if home > away else ("AWAY_TEAM" if away > home else "DRAW")
+        return {
+            "area": AREA,
+            "competition": _competition(competition_id),
+            "season": _season(season),
+            "id": match_id,
+            "utcDate": _timestamp(utc_date),
+            "status": "FINISHED" if finished else "TIMED",
+            "matchday": matchday,
+            "stage": "REGULAR_SEASON",
+            "group": None,
+            "lastUpdated": _timestamp(utc_date + datetime.timedelta(hours=2) if finished else utc_date - datetime.timedelta(days=7)),
+            "homeTeam": _team_ref(home_id),
+            "awayTeam": _team_ref(away_id),
+            "score": {
+                "winner": winner,
+                "duration": "REGULAR",
+                "fullTime": {"home": home, "away": away},
+                "halfTime": {"home": None if home is None else home // 2, "away": None if away is None else away // 2},
+            },
+            "odds": ODDS,
+            "referees": [
+                {"id": 11605 + rng.randint(0, 200), "name": "Referee", "type": "REFEREE", "nationality": "England"},
+                {"id": 21605 + rng.randint(0, 400), "name": "Assistant", "type": "ASSISTANT_REFEREE_N1", "nationality": None},
+            ] if finished else [],
+        }
+
+    def iter_matches(self, count: int = None, teams: int = TEAMS_PER_COMPETITION, start_id: int = 1,
+                     date_from: datetime.date = None, date_to: datetime.date = None,
+                     competitions: Iterable[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Match history: a double round-robin per competition and season, in the order of the dates.
+
+        Seasons follow each other (older than the configured ones when needed) until `count` matches were
+        produced. Only one match is held at a time, so any count can be streamed.
+
+        Args:
+            count (int, optional): Number of matches. Defaults to None (every match of the configured seasons).
+            teams (int, optional): Teams per competition. Defaults to TEAMS_PER_COMPETITION.
+            start_id (int, optional): Id of the first match. Defaults to 1.
+            date_from (datetime.date, optional): Only the matches from this day. Defaults to None.
+            date_to (datetime.date, optional): Only the matches up to this day. Defaults to None.
+            competitions (Iterable[int], optional): Only these competitions. Defaults to None (all).
+
+        Yields:
+            Dict[str, Any]: The matches, as the API sends them.
+        """
+        selected = None if competitions is None else set(competitions)
+        ids = [competition_id for competition_id in self.competition_ids() if selected is None or competition_id in selected]
+        fixtures = round_robin(teams)
+        games_per_matchday = teams // 2
+        matches_per_season = len(ids) * len(fixtures)
+        seasons = self.season_years()
+        if count is not None and matches_per_season:
+            # Enough seasons for the count, ending with the current one
+            needed = -(-count // matches_per_season)
+            seasons = list(range(seasons[-1] - max(needed, 1) + 1, seasons[-1] + 1))
+
+        rng = self._random("matches", teams)
+        produced = 0
+        for season_index, season in enumerate(seasons):
+            season_start = datetime.datetime(season, 8, 16, tzinfo=datetime.timezone.utc)
+            for position, (matchday, home, away) in enumerate(fixtures):
+                # Matchdays are a week apart; the games of a matchday are spread over the kick-off times of a
+                # weekend, in order
+                kick_off = (position % games_per_matchday) * len(KICK_OFFS) // games_per_matchday
+                utc_date = season_start + datetime.timedelta(days=7 * (matchday - 1)) + KICK_OFFS[kick_off]
+                if date_to and utc_date.date() > date_to:
+                    continue
+                for competition_index, competition_id in enumerate(ids):
+                    if count is not None and produced >= count:
+                        return
+                    match_id = start_id + (season_index * len(fixtures) + position) * len(ids) + competition_index
+                    match = self.match(match_id, competition_id, season, matchday, competition_id * 10000 + home,
+                                       competition_id * 10000 + away, utc_date, rng)
+                    if date_from and utc_date.date() < date_from:
+                        continue
+                    produced += 1
+                    yield match
+
+    def _iter_upcoming_matches(self, team_id: int) -> Iterator[Dict[str, Any]]:
+        rng = self._random("upcoming", team_id)
+        competition_id = team_id // 10000
+        opponents = self.team_ids(competition_id)
+        kick_off = datetime.datetime.combine(self.today, datetime.time(16), tzinfo=datetime.timezone.utc) + datetime.timedelta(days=1)
+        season = self.season_years()[-1]
+        for i in range(MATCHES_PER_TEAM * self.scale):
+            yield self.match(team_id * 1000 + i, competition_id, season, 13 + i // self.scale, team_id, rng.choice(opponents),
+                             kick_off + datetime.timedelta(days=7 * (i // self.scale)), rng)
+
+    def _iter_matches_today(self) -> Iterator[Dict[str, Any]]:
+        rng = self._random("today")
+        ids = self.competition_ids()
+        kick_off = datetime.datetime.combine(self.today, datetime.time(12), tzinfo=datetime.timezone.utc)
+        season = self.season_years()[-1]
+        for i in range(MATCHES_TODAY * self.scale):
+            competition_id = ids[i % len(ids)]
+            teams = self.team_ids(competition_id)
+            match = self.match(900000000 + i, competition_id, season, 13, teams[(2 * i) % len(teams)],
+                               teams[(2 * i + 1) % len(teams)], kick_off + datetime.timedelta(hours=i % 10), rng)
+            if i % 3 == 0:
+                # Some of today's games are already over
+                match["status"] = "FINISHED"
+                match["score"]["fullTime"] = {"home": i % 4, "away": i % 3}
+                match["score"]["halfTime"] = {"home": 0, "away": 0}
+                match["score"]["winner"] = "HOME_TEAM" if i % 4 > i % 3 else ("AWAY_TEAM" if i % 3 > i % 4 else "DRAW")
+            yield match
+
+    # Responses of each endpoint (see `Response`)
+
+    def _matches_response(self, matches: Iterable[Dict[str, Any]], date_from: datetime.date, date_to: datetime.date,
+                          **filters) -> Response:
+        counts = {"count": 0, "played": 0, "competitions": set()}
+
+        def counted() -> Iterator[Dict[str, Any]]:
+            for match in matches:
+                counts["count"] += 1
+                counts["played"] += match["status"] == "FINISHED"
+                counts["competitions"].add(match["competition"]["code"])
+                yield match
+
+        def result_set() -> Dict[str, Any]:
+            return {"resultSet": {
+                "count": counts["count"], "competitions": ",".join(sorted(counts["competitions"])),
+                "first": date_from.isoformat(), "last": date_to.isoformat(), "played": counts["played"],
+            }}
+
+        head = {"filters": {"dateFrom": date_from.isoformat(), "dateTo": date_to.isoformat(), "permission": "TIER_ONE", **filters}}
+        return head, "matches", counted(), result_set
+
+    def response(self, endpoint: str, **kwargs) -> Response:
+        """
+        The response of an endpoint, with its items still to be produced.
+
+        Args:
+            endpoint (str): One of `ENDPOINTS`.
+            **kwargs: The arguments of the endpoint (e.g. competition_id, season, team_id, date_from).
+
+        Returns:
+            Response: (head, items key, items, tail).
+        """
+        year = self.season_years()[-1]
+        if endpoint == "competitions":
+            return {"filters": {"client": "benchmark"}}, "competitions", self._iter_competitions(), lambda: {"count": self.competitions_count * self.scale}
+        if endpoint in ("standings", "scorers", "teams"):
+            competition_id, season = kwargs["competition_id"], kwargs.get("season") or year
+            head = {"filters": {"season": str(season)}, "competition": _competition(competition_id), "season": _season(season)}
+            if endpoint == "teams":
+                return head, "teams", self._iter_teams(competition_id), lambda: {"count": TEAMS_PER_COMPETITION * self.scale}
+            if endpoint == "scorers":
+                return head, "scorers", self._iter_scorers(competition_id, season), lambda: {"count": TOP_SCORERS * self.scale}
+            table = list(self._iter_table(competition_id, season))
+            return {**head, "area": AREA}, "standings", iter([{"stage": "REGULAR_SEASON", "type": "TOTAL", "group": None, "table": table}]), dict
+        if endpoint == "team_matches":
+            date_from = self.today + datetime.timedelta(days=1)
+            return self._matches_response(self._iter_upcoming_matches(kwargs["team_id"]), date_from,
+                                          date_from + datetime.timedelta(days=7 * MATCHES_PER_TEAM), status=["SCHEDULED"])
+        if endpoint == "matches":
+            date_from, date_to = kwargs.get("date_from"), kwargs.get("date_to")
+            if date_from is None and date_to is None and kwargs.get("count") is None:
+                return self._matches_response(self._iter_matches_today(), self.today, self.today)
+            matches = self.iter_matches(kwargs.get("count"), date_from=date_from, date_to=date_to,
+                                        competitions=kwargs.get("competitions"))
+            return self._matches_response(matches, date_from or datetime.date(self.season_years()[0], 8, 16), date_to or self.today)
+        raise ValueError(f"Unknown endpoint: {endpoint}")
+
+    def document(self, endpoint: str, **kwargs) -> Dict[str, Any]:
+        """The response of an endpoint as a dict (all the items in memory)."""
+        head, key, items, tail = self.response(endpoint, **kwargs)
+        document = {**head, key: list(items)}
+        return {**document, **tail()}
+
+    # The endpoints as the processors call them
+
+    def competitions(self) -> Dict[str, Any]:
+        return self.document("competitions")
+
+    def standings(self, competition_id: int, season: int = None) -> Dict[str, Any]:
+        return self.document("standings", competition_id=competition_id, season=season)
+
+    def top_scorers(self, competition_id: int, season: int = None) -> Dict[str, Any]:
+        return self.document("scorers", competition_id=competition_id, season=season)
+
+    def teams(self, competition_id: int) -> Dict[str, Any]:
+        return self.document("teams", competition_id=competition_id)
+
+    def team_upcoming_matches(self, team_id: int) -> Dict[str, Any]:
+        return self.document("team_matches", team_id=team_id)
+
+    def matches_today(self) -> Dict[str, Any]:
+        return self.document("matches")
+
+    def matches(self, date_from: datetime.date, date_to: datetime.date, competition_ids: List[int] = None) -> Dict[str, Any]:
+        return self.document("matches", date_from=date_from, date_to=date_to, competitions=competition_ids)
+
+
+ENDPOINTS = ("competitions", "standings", "scorers", "teams", "team_matches", "matches")
+
+
+def stream_response(response: Response, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Encodes a response as a JSON document, one chunk at a time: only the current chunk is in memory.
+
+    The fields computed from the items (e.g. `resultSet`) come after them in the document, which is
+    still the same object for a JSON parser.
+
+    Args:
+        response (Response): The response (see `SyntheticResponses.response`).
+        chunk_size (int, optional): Approximate size of the chunks. Defaults to CHUNK_SIZE.
+
+    Yields:
+        bytes: The chunks of the document.
+    """
+    head, key, items, tail = response
+    buffer = [json.dumps(head)[:-1], ", " if head else "", json.dumps(key), ": ["]
+    size = 0
+    for i, item in enumerate(items):
+        encoded = json.dumps(item)
+        buffer.append(", " + encoded if i else encoded)
+        size += len(encoded)
+        if size >= chunk_size:
+            yield "".join(buffer).encode()
+            buffer, size = [], 0
+    fields = json.dumps(tail())[1:]
+    buffer.append("]" + (", " + fields if fields != "}" else "}"))
+    yield "".join(buffer).encode()
+
+
+def write_response(response: Response, path: str) -> int:
+    """
+    Streams a response to a JSON file.
+
+    Returns:
+        int: The bytes written.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    written = 0
+    with open(path, "wb") as file:
+        for chunk in stream_response(response):
+            written += file.write(chunk)
+    return written
+
+
+def write_jsonl(items: Iterable[Dict[str, Any]], path: str) -> int:
+    """
+    Streams items to a JSON Lines file (one item per line), e.g. the matches of `iter_matches`.
+
+    Returns:
+        int: The items written.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    count = 0
+    with open(path, "w", encoding="utf-8") as file:
+        for item in items:
+            file.write(json.dumps(item) + "\n")
+            count += 1
+    return count
+
+
+class SyntheticAPI:
+    """
+    Stand-in for CompetitionsAPI, TeamsAPI and MatchesAPI answering with `SyntheticResponses`,
+    so the processors run unchanged without calling football-data.org.
+    """
+    def __init__(self, responses: SyntheticResponses):
+        self.responses = responses
+
+    def get_competitions(self, plan: str = "TIER_ONE") -> Dict[str, Any]:
+        return self.responses.competitions()
+
+    def get_standings(self, competition_id: int, season: int = None) -> Dict[str, Any]:
+        return self.responses.standings(competition_id, season)
+
+    def get_top_scorers(self, competition_id: int, season: int = None) -> Dict[str, Any]:
+        return self.responses.top_scorers(competition_id, season)
+
+    def get_teams(self, competition_id: int) -> Dict[str, Any]:
+        return self.responses.teams(competition_id)
+
+    def get_team_upcoming_matches(self, team_id: int) -> Dict[str, Any]:
+        return self.responses.team_upcoming_matches(team_id)
+
+    def get_matches_today(self) -> Dict[str, Any]:
+        return self.responses.matches_today()
+
+    def get_matches(self, date_from: datetime.date, date_to: datetime.date, competition_ids: List[int] = None) -> Dict[str, Any]:
+        return self.responses.matches(date_from, date_to, competition_ids)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Writes synthetic football-data.org payloads")
+    parser.add_argument("--output", required=True, help="Directory of the payloads")
+    parser.add_argument("--scale", type=int, default=1, help="Multiplier of the items of each response")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--competitions", type=int, default=COMPETITIONS)
+    parser.add_argument("--seasons", type=int, default=SEASONS)
+    parser.add_argument("--matches", type=int, default=0, help="Also write a match history of this many matches (matches.jsonl)")
+    args = parser.parse_args()
+
+    responses = SyntheticResponses(args.scale, args.seed, args.competitions, args.seasons)
+    write_response(responses.response("competitions"), os.path.join(args.output, "competitions.json"))
+    for competition_id in responses.competition_ids():
+        write_response(responses.response("teams", competition_id=competition_id),
+                       os.path.join(args.output, "teams", f"{competition_id}.json"))
+        for season in responses.season_years():
+            for endpoint in ("standings", "scorers"):
+                write_response(responses.response(endpoint, competition_id=competition_id, season=season),
+                               os.path.join(args.output, endpoint, f"{competition_id}_{season}.json"))
+    write_response(responses.response("matches"), os.path.join(args.output, "matches_today.json"))
+    if args.matches:
+        count = write_jsonl(responses.iter_matches(args.matches), os.path.join(args.output, "matches.jsonl"))
+        print(f"{count} matches written")
+    print(f"Payloads written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+"""
+End-to-end benchmark of the extract-transform-load path of the processors, on synthetic responses
+scaled to N times their real size (see `payloads.py`).
+
+Every processor runs its path in separate stages, each one timed with its peak RSS:
+    parse      JSON bytes of the responses -> validated contracts (json + pydantic)
+    transform  contracts -> flattened DataFrames with their load_timestamp (utils.flatten)
+    serialize  DataFrames -> rows for the driver (Database._to_records)
+    load       the processor's own `_write_to_db` into a scratch schema of a local Postgres
+
+The load stage needs the PG_* variables of a reachable database and is recorded as skipped otherwise.
+It serializes the rows again (the driver needs them), so the database part is `load - serialize`.
+
+Results are written as JSON (benchmarks/results/<timestamp>.json by default). With `--baseline`,
+the run is compared with a previous result and exits with status 1 when a stage regressed beyond
+`--threshold`.
+
+Usage (from the repository root):
+    python benchmarks/run_benchmarks.py --scales 10 100
+    python benchmarks/run_benchmarks.py --scales 10 --baseline benchmarks/results/baseline.json --threshold 0.25
+"""
+from typing import Callable, Dict, List
+import argparse
+import dataclasses
+import datetime
+import gc
+import json
+import os
+import sys
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(BENCHMARKS_DIR), 'src'))
+sys.path.insert(0, BENCHMARKS_DIR)
+
+# Telemetry isn't sent from benchmark runs
+os.environ.setdefault('LOGFIRE_SEND_TO_LOGFIRE', 'false')
+os.environ.setdefault('LOGFIRE_CONSOLE', 'false')
+
+import pandas as pd  # noqa: E402
+
+from common import compare, environment, load_results, measure, save_results  # noqa: E402
+from payloads import CUP_IDS, SyntheticAPI, SyntheticResponses, competition_ids  # noqa: E402
+from contracts.competitions_contract import CompetitionsResponse  # noqa: E402
+from contracts.competitions_standings_contract import CompetitionStandingsResponse  # noqa: E402
+from contracts.competitions_top_scorers_contract import TopScorersResponse  # noqa: E402
+from contracts.matches_contract import MatchesTodayResponse  # noqa: E402
+from contracts.teams_contract import TeamsResponse  # noqa: E402
+from utils.competitions_api import CompetitionsDetailsProcessor, CompetitionsProcessor  # noqa: E402
+from utils.database import Database  # noqa: E402
+from utils.flatten import flatten_competitions, flatten_matches, flatten_standings, flatten_teams, flatten_top_scorers  # noqa: E402
+from utils.matches_api import MatchesProcessor, write_match_referees  # noqa: E402
+from utils.teams_api import TeamsProcessor, TeamUpcomingMatchesProcessor  # noqa: E402
+
+STAGES = ('parse', 'transform', 'serialize', 'load')
+
+
+@dataclasses.dataclass
+class Benchmark:
+    """
+    The path of one processor (and table), split in stages.
+
+    Attributes:
+        name (str): The benchmark key in the results.
+        processor (Callable): Builds the processor from the API stand-in and the schema.
+        calls (Callable): The API calls the processor makes, as (method, kwargs) pairs for the responses.
+        contract (type): The contract validating each response.
+        transform (Callable): Flattens the validated responses into the tables to load (name -> DataFrame).
+    """
+    name: str
+    processor: Callable
+    calls: Callable
+    contract: type
+    transform: Callable
+
+
+def _detail_calls(method: str) -> Callable:
+    """The calls of CompetitionsDetailsProcessor: 3 seasons of the leagues, the current season of the cups."""
+    def calls(responses: SyntheticResponses) -> List:
+        year = datetime.date.today().year
+        return [
+            (method, {'competition_id': competition_id, 'season': None if competition_id in CUP_IDS else season})
+            for season in range(year - 2, year + 1)
+            for competition_id in competition_ids()
+            if competition_id not in CUP_IDS or season == year
+        ]
+    return calls
+
+
+def _with_timestamp(tables: Dict[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
+    load_timestamp = datetime.datetime.now(datetime.timezone.utc).isoformat()
+    for df in tables.values():
+        df['load_timestamp'] = load_timestamp
+    return tables
+
+
+def _teams_tables(parsed: List[TeamsResponse]) -> Dict[str, pd.DataFrame]:
+    flat = [flatten_teams(response.teams, response.competition.id) for response in parsed]
+    return _with_timestamp({
+        table: pd.concat([tables['teams' if table == 'teams' else table] for tables in flat], ignore_index=True)
+        for table in ('teams', *TeamsProcessor.CHILD_TABLES)
+    })
+
+
+def _upcoming_matches_table(parsed: List[MatchesTodayResponse]) -> Dict[str, pd.DataFrame]:
+    frames = []
+    for response in parsed:
+        df = flatten_matches(response.matches)['matches']
+        df['date_from'] = response.filters.date_from
+        df['date_to'] = response.filters.date_to
+        frames.append(df)
+    return _with_timestamp({'teams_upcoming_matches': pd.concat(frames)})
+
+
+def _matches_today_tables(parsed: List[MatchesTodayResponse]) -> Dict[str, pd.DataFrame]:
+    flat = flatten_matches(parsed[0].matches)
+    flat['matches']['date_from'] = parsed[0].filters.date_from
+    return _with_timestamp({'matches_today': flat['matches'], 'match_referees': flat['match_referees']})
+
+
+BENCHMARKS = [
+    Benchmark(
+        'CompetitionsProcessor.competitions',
+        lambda api, schema: CompetitionsProcessor(api, schema=schema, table='competitions'),
+        lambda responses: [('get_competitions', {})],
+        CompetitionsResponse,
+        lambda parsed: _with_timestamp({'competitions': flatten_competitions(parsed[0].competitions)}),
+    ),
+    Benchmark(
+        'CompetitionsDetailsProcessor.competitions_standings',
+        lambda api, schema: CompetitionsDetailsProcessor(api, schema=schema, table='competitions_standings'),
+        _detail_calls('get_standings'),
+        CompetitionStandingsResponse,
+        lambda parsed: _with_timestamp({'competitions_standings': pd.concat(
+            [flatten_standings(response, response.competition.id) for response in parsed], ignore_index=True)}),
+    ),
+    Benchmark(
+        'CompetitionsDetailsProcessor.competitions_top_scorers',
+        lambda api, schema: CompetitionsDetailsProcessor(api, schema=schema, table='competitions_top_scorers'),
+        _detail_calls('get_top_scorers'),
+        TopScorersResponse,
+        lambda parsed: _with_timestamp({'competitions_top_scorers': pd.concat(
+            [flatten_top_scorers(response, response.competition.id) for response in parsed], ignore_index=True)}),
+    ),
+    Benchmark(
+        'TeamsProcessor.teams',
+        lambda api, schema: TeamsProcessor(api, competition_ids=competition_ids(), schema=schema, table='teams'),
+        lambda responses: [('get_teams', {'competition_id': competition_id}) for competition_id in competition_ids()],
+        TeamsResponse,
+        _teams_tables,
+    ),
+    Benchmark(
+        'TeamUpcomingMatchesProcessor.teams_upcoming_matches',
+        lambda api, schema: TeamUpcomingMatchesProcessor(api, schema=schema, table='teams_upcoming_matches'),
+        # One call per team of the real-size competitions; each response is scaled
+        lambda responses: [('get_team_upcoming_matches', {'team_id': team_id})
+                           for competition_id in competition_ids()
+                           for team_id in SyntheticResponses(1, responses.seed).team_ids(competition_id)],
+        MatchesTodayResponse,
+        _upcoming_matches_table,
+    ),
+    Benchmark(
+        'MatchesProcessor.matches_today',
+        lambda api, schema: MatchesProcessor(api, schema=schema, table='matches_today'),
+        lambda responses: [('get_matches_today', {})],
+        MatchesTodayResponse,
+        _matches_today_tables,
+    ),
+]
+
+
+def database_available() -> str:
+    """Returns why the load stage can't run (no PG_* variables, connection refused), or None when it can."""
+    if not os.getenv('PG_HOST'):
+        return 'PG_HOST is not set'
+    db = Database(db_name=os.getenv('PG_DB'), user=os.getenv('PG_USER'), password=os.getenv('PG_PASS'),
+                  host=os.getenv('PG_HOST'), port=5432)
+    try:
+        db.connect()
+    except Exception as e:
+        return f'database unreachable: {e}'.strip()
+    finally:
+        db.close()
+    return None
+
+
+def run_benchmark(benchmark: Benchmark, scale: int, schema: str, skip_load: str = None, seed: int = 42) -> Dict:
+    """
+    Runs the stages of one benchmark at one scale.
+
+    Returns:
+        Dict: The metrics of each stage (see `common.measure`), plus the response size and row counts.
+    """
+    responses = SyntheticResponses(scale, seed)
+    api = SyntheticAPI(responses)
+    # The responses are built (and encoded as the API sends them) before any stage is timed
+    payloads = [json.dumps(getattr(api, method)(**kwargs)).encode() for method, kwargs in benchmark.calls(responses)]
+    gc.collect()
+
+    result = {'scale': scale, 'calls': len(payloads), 'response_mb': round(sum(map(len, payloads)) / 1024 ** 2, 2)}
+    parsed, result['parse'] = measure(lambda: [benchmark.contract(**json.loads(payload)) for payload in payloads])
+    del payloads
+    tables, result['transform'] = measure(benchmark.transform, parsed)
+    del parsed
+    result['rows'] = {table: len(df) for table, df in tables.items()}
+    _, result['serialize'] = measure(lambda: {table: Database._to_records(df) for table, df in tables.items()})
+
+    if skip_load:
+        result['load'] = {'skipped': skip_load}
+    else:
+        processor = benchmark.processor(api, schema)
+
+        def load():
+            for table, df in tables.items():
+                if table == 'match_referees':
+                    write_match_referees(processor.db, schema, df, df['load_timestamp'].iloc[0])
+                else:
+                    processor._write_to_db(df, table)
+            processor.db.close()
+
+        _, result['load'] = measure(load)
+
+    del tables
+    gc.collect()
+    return result
+
+
+def run(scales: List[int], schema: str = 'bench', only: List[str] = None, skip_load: bool = False) -> Dict:
+    """
+    Runs every benchmark at every scale.
+
+    Args:
+        scales (List[int]): The scales of the responses (e.g. [10, 100]).
+        schema (str, optional): The scratch schema the load stage writes to. Defaults to 'bench'.
+        only (List[str], optional): Only run the benchmarks whose name contains one of these. Defaults to None.
+        skip_load (bool, optional): Don't run the load stage. Defaults to False.
+
+    Returns:
+        Dict: `environment` and `benchmarks` (`<name>@<scale>x` -> result of `run_benchmark`).
+    """
+    skip_reason = 'disabled (--skip-load)' if skip_load else database_available()
+    results = {'environment': environment(), 'schema': schema, 'benchmarks': {}}
+    for scale in scales:
+        for benchmark in BENCHMARKS:
+            if only and not any(name in benchmark.name for name in only):
+                continue
+            key = f'{benchmark.name}@{scale}x'
+            print(f'Running {key}...', file=sys.stderr)
+            results['benchmarks'][key] = run_benchmark(benchmark, scale, schema, skip_reason)
+    return results
+
+
+def print_summary(results: Dict) -> None:
+    print(f"{'benchmark':<60} " + ' '.join(f'{stage + " s":>12}' for stage in STAGES) + f" {'peak MB':>9}")
+    for key, result in results['benchmarks'].items():
+        seconds = [f"{result[stage]['seconds']:>12.3f}" if 'seconds' in result[stage] else f"{'skipped':>12}" for stage in STAGES]
+        peak = max(result[stage].get('peak_rss_mb', 0) for stage in STAGES)
+        print(f'{key:<60} ' + ' '.join(seconds) + f' {peak:>9.1f}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark of the extract-transform-load path of the processors')
+    parser.add_argument('--scales', type=int, nargs='+', default=[10, 100], help='Response size multipliers')
+    parser.add_argument('--only', nargs='+', help='Only run the benchmarks whose name contains one of these')
+    parser.add_argument('--schema', default='bench', help='Scratch schema written by the load stage')
+    parser.add_argument('--skip-load', action='store_true', help="Don't load into Postgres")
+    parser.add_argument('--output', help='Results file (default: benchmarks/results/<timestamp>.json)')
+    parser.add_argument('--baseline', help='Results of a previous run to compare with')
+    parser.add_argument('--threshold', type=float, default=0.25, help='Allowed relative regression of a stage (0.25 = 25%%)')
+    parser.add_argument('--min-seconds', type=float, default=0.05, help='Time regressions below this are ignored')
+    args = parser.parse_args()
+
+    results = run(args.scales, args.schema, args.only, args.skip_load)
+    output = args.output or os.path.join(
+        BENCHMARKS_DIR, 'results', datetime.datetime.now().strftime('%Y%m%dT%H%M%S') + '.json')
+    save_results(results, output)
+    print_summary(results)
+    print(f'Results written to {output}')
+
+    if args.baseline:
+        rows = compare(results, load_results(args.baseline), args.threshold, args.min_seconds)
+        regressions = [row for row in rows if row['regressed']]
+        for row in regressions:
+            print(f"REGRESSION {row['benchmark']} {row['stage']} {row['metric']}: "
+                  f"{row['baseline']} -> {row['current']} ({row['change']:+.0%})")
+        if regressions:
+            sys.exit(1)
+        print(f'No stage regressed beyond {args.threshold:.0%} of {args.baseline}')
+
+
+if __name__ == '__main__':
+    main()
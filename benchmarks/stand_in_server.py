@@ -0,0 +1,153 @@
+"""
+Stand-in for the football-data.org API, answering every endpoint the processors call with the
+synthetic payloads of `payloads.py`. Responses are streamed (chunked transfer encoding) as they are
+generated, so even responses with millions of matches use little memory on either side.
+
+Point the extractor at it with the `FOOTBALL_API_URL` variable (and lift the rate limit, which is
+only needed by the real API):
+    python benchmarks/stand_in_server.py --port 8080 --scale 10
+    FOOTBALL_API_URL=http://localhost:8080/v4 FOOTBALL_API_RATE_LIMIT=100000 python src/main.py --request_type competitions
+
+Routes (under /v4): competitions, competitions/<id>/standings, competitions/<id>/scorers,
+competitions/<id>/teams, teams/<id>/matches and matches (today's matches, or the match history
+between dateFrom and dateTo, optionally filtered by competitions).
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+import argparse
+import datetime
+import json
+import re
+import time
+
+from payloads import SyntheticResponses, stream_response
+
+ROUTES = [
+    (re.compile(r'^/v4/competitions/?$'), 'competitions'),
+    (re.compile(r'^/v4/competitions/(?P<competition_id>\d+)/standings/?$'), 'standings'),
+    (re.compile(r'^/v4/competitions/(?P<competition_id>\d+)/scorers/?$'), 'scorers'),
+    (re.compile(r'^/v4/competitions/(?P<competition_id>\d+)/teams/?$'), 'teams'),
+    (re.compile(r'^/v4/teams/(?P<team_id>\d+)/matches/?$'), 'team_matches'),
+    (re.compile(r'^/v4/matches/?$'), 'matches'),
+]
+
+
+def route(path: str, query: Dict[str, list]) -> Optional[Tuple[str, dict]]:
+    """
+    Maps a request to an endpoint of `SyntheticResponses.response` and its arguments.
+
+    Args:
+        path (str): The path of the request (e.g. /v4/competitions/2021/standings).
+        query (Dict[str, list]): The parsed query string.
+
+    Returns:
+        Optional[Tuple[str, dict]]: The endpoint and its arguments, or None when no route matches.
+    """
+    for pattern, endpoint in ROUTES:
+        match = pattern.match(path)
+        if not match:
+            continue
+        kwargs = {key: int(value) for key, value in match.groupdict().items()}
+        if 'season' in query:
+            kwargs['season'] = int(query['season'][0])
+        if 'dateFrom' in query:
+            kwargs['date_from'] = datetime.date.fromisoformat(query['dateFrom'][0])
+        if 'dateTo' in query:
+            kwargs['date_to'] = datetime.date.fromisoformat(query['dateTo'][0])
+        if 'competitions' in query:
+            kwargs['competitions'] = [int(value) for value in query['competitions'][0].split(',')]
+        return endpoint, kwargs
+    return None
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Answers the requests with the synthetic responses of the server."""
+    protocol_version = 'HTTP/1.1'
+
+    def _send_json(self, status: int, body: dict) -> None:
+        encoded = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(encoded)))
+        self.end_headers()
+        self.wfile.write(encoded)
+
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        target = route(url.path, parse_qs(url.query))
+        if target is None:
+            self._send_json(404, {'message': f'The resource {url.path} does not exist.', 'errorCode': 404})
+            return
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        endpoint, kwargs = target
+        try:
+            response = self.server.responses.response(endpoint, **kwargs)
+        except (KeyError, ValueError) as e:
+            self._send_json(400, {'message': str(e), 'errorCode': 400})
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        for chunk in stream_response(response):
+            self.wfile.write(f'{len(chunk):X}\r\n'.encode() + chunk + b'\r\n')
+        self.wfile.write(b'0\r\n\r\n')
+
+    def log_message(self, format: str, *args) -> None:
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class StandInServer(ThreadingHTTPServer):
+    """
+    The stand-in API server.
+
+    Attributes:
+        responses (SyntheticResponses): The generator of the responses.
+        latency (float): Seconds added before each response (the real API answers in ~100-300ms).
+        verbose (bool): Log each request.
+    """
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], responses: SyntheticResponses, latency: float = 0.0, verbose: bool = False):
+        super().__init__(address, StandInHandler)
+        self.responses = responses
+        self.latency = latency
+        self.verbose = verbose
+
+    @property
+    def url(self) -> str:
+        """The base URL to use as FOOTBALL_API_URL."""
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}/v4'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Stand-in football-data.org API serving synthetic payloads')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--scale', type=int, default=1, help='Multiplier of the items of each response')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--competitions', type=int, default=13)
+    parser.add_argument('--seasons', type=int, default=3)
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds added before each response')
+    parser.add_argument('--verbose', action='store_true')
+    args = parser.parse_args()
+
+    responses = SyntheticResponses(args.scale, args.seed, args.competitions, args.seasons)
+    server = StandInServer((args.host, args.port), responses, args.latency, args.verbose)
+    print(f'Serving synthetic payloads on {server.url} (scale {args.scale}, seed {args.seed})')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -58,6 +58,13 @@ api_competitions_top_scorers = Table(
     extra={'dataSource':'football-org.api'}
 )
 
+api_matches = Table(
+    cluster="postgres://dpg-ct4ike9u0jms73a8mtf0-a.oregon-postgres.render.com:5432",
+    database="football_db_v5as",
+    name="raw.matches",
+    extra={'dataSource':'football-org.api'}
+)
+
 results = Table(
     cluster="postgres://dpg-ct4ike9u0jms73a8mtf0-a.oregon-postgres.render.com:5432",
     database="football_db_v5as",
@@ -85,7 +92,7 @@ def futebol_pipeline_with_lineage() -> None:
         image='football_image',     # Nome da imagem Docker local
         api_version='auto',
         auto_remove='success',  # Remove o container após a execução
-        command='poetry run python /src/main.py --request_type competitions',   # Comando para rodar o código Python no container
+        command='python /src/main.py --request_type competitions',   # Comando para rodar o código Python no container
         docker_url='unix://var/run/docker.sock',  # Conexão com o Docker local
         network_mode='bridge',            # Definindo o modo de rede do Docker
         #volumes=['/src:/src'],  # Montando o diretório local para o container
@@ -98,7 +105,7 @@ def futebol_pipeline_with_lineage() -> None:
         image='football_image',    
         api_version='auto',
         auto_remove='success', 
-        command='poetry run python /src/main.py --request_type teams',   
+        command='python /src/main.py --request_type teams',   
         docker_url='unix://var/run/docker.sock',  
         network_mode='bridge',         
         environment=environment_vars,
@@ -110,19 +117,42 @@ def futebol_pipeline_with_lineage() -> None:
         image='football_image',    
         api_version='auto',
         auto_remove='success',  
-        command='poetry run python /src/main.py --request_type matches_today', 
+        command='python /src/main.py --request_type matches_today', 
         docker_url='unix://var/run/docker.sock',  
         network_mode='bridge',            
         environment=environment_vars,
         outlets=[api_matches_today]
     )
 
+    docker_task_matches_sync = DockerOperator(
+        task_id='run_football_pipeline_matches_sync',  
+        image='football_image',    
+        api_version='auto',
+        auto_remove='success',  
+        command='python /src/main.py --request_type matches', 
+        docker_url='unix://var/run/docker.sock',  
+        network_mode='bridge',            
+        environment=environment_vars,
+        outlets=[api_matches]
+    )
+
+    docker_task_team_ratings = DockerOperator(
+        task_id='run_football_pipeline_team_ratings',  
+        image='football_image',    
+        api_version='auto',
+        auto_remove='success',  
+        command='python /src/main.py --request_type team_ratings', 
+        docker_url='unix://var/run/docker.sock',  
+        network_mode='bridge',            
+        environment=environment_vars,
+    )
+
     docker_task_competitions_standings = DockerOperator(
         task_id='run_football_pipeline_competitions_standings', 
         image='football_image',    
         api_version='auto',
         auto_remove='success',  
-        command='poetry run python /src/main.py --request_type competitions_standings',   
+        command='python /src/main.py --request_type competitions_standings',   
         docker_url='unix://var/run/docker.sock',
         network_mode='bridge',           
         environment=environment_vars,
@@ -134,7 +164,7 @@ def futebol_pipeline_with_lineage() -> None:
         image='football_image',  
         api_version='auto',
         auto_remove='success',  
-        command='poetry run python /src/main.py --request_type competitions_top_scorers',  
+        command='python /src/main.py --request_type competitions_top_scorers',  
         docker_url='unix://var/run/docker.sock',  
         network_mode='bridge',           
         environment=environment_vars,
@@ -168,8 +198,9 @@ def futebol_pipeline_with_lineage() -> None:
         )
 
 
-    docker_task_competitions >> docker_task_teams >> docker_task_matches_today
-    docker_task_matches_today >> docker_task_competitions_top_scorers >> docker_task_competitions_standings
+    docker_task_competitions >> docker_task_teams >> docker_task_matches_today >> docker_task_matches_sync
+    docker_task_matches_sync >> docker_task_team_ratings
+    docker_task_matches_sync >> docker_task_competitions_top_scorers >> docker_task_competitions_standings
     docker_task_competitions_standings >> dbt_transformations >> dbt_marts >> query_table
     
 
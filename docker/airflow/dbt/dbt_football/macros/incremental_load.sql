@@ -0,0 +1,8 @@
+{% macro incremental_load_filter(column='load_timestamp') %}
+
+    {# on incremental runs only the rows loaded after the last build are read from the source #}
+    {% if is_incremental() %}
+        where {{ column }} > (select coalesce(max({{ column }}), '1900-01-01') from {{ this }})
+    {% endif %}
+
+{% endmacro %}
@@ -0,0 +1,12 @@
+{% macro log_build_times(results) %}
+
+    {# logs the build time of each model, so every dbt task of the DAG reports how long its models took #}
+    {% if execute %}
+        {% for result in results if result.node.resource_type == 'model' %}
+            {{ log("Build time - " ~ result.node.name ~ ": " ~ (result.execution_time | round(2)) ~ "s"
+                   ~ " (status: " ~ result.status
+                   ~ ", rows affected: " ~ result.adapter_response.get('rows_affected', 'n/a') ~ ")", info=True) }}
+        {% endfor %}
+    {% endif %}
+
+{% endmacro %}
@@ -0,0 +1,6 @@
+{% macro postgres__refresh_materialized_view(relation) %}
+
+    {# refreshes without locking out the dashboard reads. Every materialized view needs a unique index for it #}
+    refresh materialized view concurrently {{ relation }}
+
+{% endmacro %}
@@ -0,0 +1,55 @@
+{{
+    config(
+        materialized='materialized_view',
+        indexes=[
+            {'columns': ['competition_id', 'season', 'position'], 'unique': True},
+        ]
+    )
+}}
+
+with
+
+standings as (
+
+    select * from {{ ref('stg_fb__competitions_standings') }}
+
+),
+
+competitions as (
+
+    select * from {{ ref('stg_fb__competitions') }}
+
+),
+
+competition_standings as (
+
+    select
+        s.competition_id,
+        c.competition_name,
+        c.emblem,
+        c.area_name,
+        c.area_flag,
+        s.season,
+        s.position,
+        s.team_id,
+        s.team_crest,
+        s.team_tla,
+        s.team_short_name,
+        s.points,
+        s.played_games,
+        s.won,
+        s.draw,
+        s.lost,
+        s.goals_for,
+        s.goals_against,
+        s.goal_difference,
+        s.form,
+        greatest(s.load_timestamp, c.load_timestamp) as load_timestamp
+
+    from standings s
+         inner join competitions c
+             on s.competition_id = c.competition_id
+
+)
+
+select * from competition_standings
@@ -0,0 +1,49 @@
+{{
+    config(
+        materialized='materialized_view',
+        indexes=[
+            {'columns': ['competition_id', 'season', 'player_id'], 'unique': True},
+        ]
+    )
+}}
+
+with
+
+top_scorers as (
+
+    select * from {{ ref('stg_fb__competitions_top_scorers') }}
+
+),
+
+competitions as (
+
+    select * from {{ ref('stg_fb__competitions') }}
+
+),
+
+competition_top_scorers as (
+
+    select
+        ts.competition_id,
+        c.competition_name,
+        ts.season,
+        ts.player_id,
+        ts.team_crest,
+        ts.team_short_name,
+        ts.player_name,
+        ts.player_section,
+        ts.player_nationality,
+        ts.player_date_of_birth,
+        ts.goals,
+        ts.assists,
+        ts.penalties,
+        ts.played_matches,
+        greatest(ts.load_timestamp, c.load_timestamp) as load_timestamp
+
+    from top_scorers ts
+         inner join competitions c
+             on ts.competition_id = c.competition_id
+
+)
+
+select * from competition_top_scorers
@@ -0,0 +1,46 @@
+{{
+    config(
+        materialized='materialized_view',
+        indexes=[
+            {'columns': ['competition_id', 'team_id'], 'unique': True},
+        ]
+    )
+}}
+
+with
+
+teams as (
+
+    select * from {{ ref('stg_fb__teams') }}
+
+),
+
+competitions as (
+
+    select * from {{ ref('stg_fb__competitions') }}
+
+),
+
+team_profiles as (
+
+    select
+        t.competition_id,
+        c.competition_name,
+        t.team_id,
+        t.team_name,
+        t.team_area_flag,
+        t.team_area_name,
+        t.tla,
+        t.crest,
+        t.club_colors,
+        t.coach_name as coach,
+        t.coach_contract_end,
+        greatest(t.load_timestamp, c.load_timestamp) as load_timestamp
+
+    from teams t
+         inner join competitions c
+             on t.competition_id = c.competition_id
+
+)
+
+select * from team_profiles
@@ -1,8 +1,16 @@
+{{
+    config(
+        materialized='incremental',
+        unique_key='competition_id'
+    )
+}}
+
 with
 
 source as (
 
     select * from {{ source('raw_football', 'competitions') }}
+    {{ incremental_load_filter() }}
 
 ),
 
@@ -12,6 +20,9 @@ raw_football_competitions as (
 
         ----------  ids
         id as competition_id,
+        area_id,
+        current_season_id,
+        current_season_winner_id,
 
         ---------- text
         name as competition_name,
@@ -19,13 +30,17 @@ raw_football_competitions as (
         type,
         emblem,
         plan,
-
-        ---------- json
-        area,
-        current_season,
+        area_name,
+        area_code,
+        area_flag,
 
         ---------- numerics
         number_of_available_seasons,
+        current_season_current_matchday,
+
+        ---------- dates
+        current_season_start_date,
+        current_season_end_date,
 
         ---------- timestamps
         last_updated as last_updated_in_source,
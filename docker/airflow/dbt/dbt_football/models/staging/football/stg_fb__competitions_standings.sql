@@ -1,8 +1,16 @@
+{{
+    config(
+        materialized='incremental',
+        unique_key=['competition_id', 'season', 'position']
+    )
+}}
+
 with
 
 source as (
 
     select * from {{ source('raw_football', 'competitions_standings') }}
+    {{ incremental_load_filter() }}
 
 ),
 
@@ -13,22 +21,15 @@ raw_football_competitions_standings as (
         ----------  ids
         id,
         competition_id,
-
-        ---------- Normalized Columns
-        cast(team->>'id' as integer) as team_id,
-        team->>'tla' as team_tla,
-        team->>'short_name' as team_short_name,
-        team->>'crest' as team_crest,
-
+        team_id,
+        season_id,
 
         ---------- text
+        team_tla,
+        team_short_name,
+        team_crest,
         form,
 
-
-        ---------- json
-        season_info,
-        
-
         ---------- numerics
         season,
         position,
@@ -40,6 +41,11 @@ raw_football_competitions_standings as (
         goals_for,
         goals_against,
         goal_difference,
+        season_current_matchday,
+
+        ---------- dates
+        season_start_date,
+        season_end_date,
 
         ---------- timestamps
         load_timestamp
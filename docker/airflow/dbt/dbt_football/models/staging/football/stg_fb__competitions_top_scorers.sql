@@ -1,3 +1,11 @@
+{# the raw table is truncated and reloaded by every extraction, so the model is rebuilt from it:
+   an incremental merge on the row keys would keep the rows that left the snapshot #}
+{{
+    config(
+        materialized='table'
+    )
+}}
+
 with
 
 source as (
@@ -13,34 +21,36 @@ raw_football_competitions_top_scorers as (
         ----------  ids
         id,
         competition_id,
-
-        ---------- Normalized Columns
-        player->>'id' as player_id,
-  		player->>'name' as player_name,
-  		player->>'section' as player_section,
-  		player->>'position'  as player_position,
-        player->>'last_name'  as player_last_name,
-        player->>'first_name'  as player_first_name,
-        player->>'nationality'  as player_nationality,
-        player->>'last_updated'  as player_last_updated,
-        player->>'shirt_number'  as player_shirt_number,
-        player->>'date_of_birth'  as player_date_of_birth,
-        team->>'id' as team_id,
-        team->>'tla' as team_tla,
-        team->>'short_name' as team_short_name,
-        team->>'crest' as team_crest,
-
-        ---------- json
-        season_info,
+        player_id,
+        team_id,
+        season_id,
+
+        ---------- text
+        player_name,
+        player_section,
+        player_position,
+        player_last_name,
+        player_first_name,
+        player_nationality,
+        team_tla,
+        team_short_name,
+        team_crest,
 
         ---------- numerics
         season,
+        player_shirt_number,
         played_matches,
         goals,
         assists,
         penalties,
 
+        ---------- dates
+        player_date_of_birth,
+        season_start_date,
+        season_end_date,
+
         ---------- timestamps
+        player_last_updated,
         load_timestamp
 
     from source
@@ -0,0 +1,65 @@
+{{
+    config(
+        materialized='incremental',
+        unique_key='id'
+    )
+}}
+
+with
+
+source as (
+
+    select * from {{ source('raw_football', 'matches') }}
+    {{ incremental_load_filter() }}
+
+),
+
+raw_football_matches as (
+
+    select
+
+        ----------  ids
+        id,
+        competition_id,
+        area_id as match_area_id,
+        season_id,
+        home_team_id,
+        away_team_id,
+
+        ---------- text
+        area_code as match_area_code,
+        area_flag as match_area_flag,
+        area_name as match_area_name,
+        competition_code,
+        competition_name,
+        competition_type,
+        competition_emblem,
+        home_team_tla,
+        home_team_short_name,
+        home_team_crest,
+        away_team_tla,
+        away_team_short_name,
+        away_team_crest,
+        score_winner as match_winner,
+        score_duration as match_duration,
+        status,
+        stage,
+        which_group,
+
+        ---------- numerics
+        matchday,
+        full_time_home as home_final_score,
+        full_time_away as away_final_score,
+        half_time_home as home_half_time_score,
+        half_time_away as away_half_time_score,
+
+        ---------- timestamps
+        utc_date,
+        last_updated as last_updated_in_source,
+        load_timestamp
+
+    from source
+
+)
+
+select * from raw_football_matches
\ No newline at end of file
@@ -1,3 +1,4 @@
+-- Kept as a view: the live poller updates raw.matches_today row by row and the dashboard reads it directly
 with
 
 source as (
@@ -12,46 +13,38 @@ raw_football_matches_today as (
 
         ----------  ids
         id,
-
-
-        ---------- Normalized Columns
-        area->>'id' as match_area_id,
-  		area->>'code' as match_area_code,
-  		area->>'flag' as match_area_flag,
-  		area->>'name'  as match_area_name,
-        competition->>'id' as competition_id,
-        competition->>'code' as competition_code,
-        competition->>'name' as competition_name,
-        competition->>'type' as competition_type,
-        competition->>'emblem' as competition_emblem,
-        home_team->>'id' as home_team_id,
-        home_team->>'tla' as home_team_tla,
-        home_team->>'short_name' as home_team_short_name,
-        home_team->>'crest' as home_team_crest,
-        away_team->>'id' as away_team_id,
-        away_team->>'tla' as away_team_tla,
-        away_team->>'short_name' as away_team_short_name,
-        away_team->>'crest' as away_team_crest,
-        score->>'winner' as match_winner,
-        score->>'duration' as match_duration,
-        score->>'full_time' as final_score,
-        score->>'half_time' as half_time_score,
-        score->'full_time'->>'home' as home_final_score,
-        score->'full_time'->>'away' as away_final_score,
+        competition_id,
+        area_id as match_area_id,
+        season_id,
+        home_team_id,
+        away_team_id,
 
         ---------- text
+        area_code as match_area_code,
+        area_flag as match_area_flag,
+        area_name as match_area_name,
+        competition_code,
+        competition_name,
+        competition_type,
+        competition_emblem,
+        home_team_tla,
+        home_team_short_name,
+        home_team_crest,
+        away_team_tla,
+        away_team_short_name,
+        away_team_crest,
+        score_winner as match_winner,
+        score_duration as match_duration,
         status,
         stage,
         which_group,
 
-
-        ---------- json
-        season,
-        odds,
-        referees,
-
         ---------- numerics
         matchday,
+        full_time_home as home_final_score,
+        full_time_away as away_final_score,
+        half_time_home as home_half_time_score,
+        half_time_away as away_half_time_score,
 
         ---------- timestamps
         utc_date,
@@ -1,20 +1,27 @@
-WITH players_data AS (
-    SELECT
-        team_id,
-        player_data->>'id' AS player_id,
-        player_data->>'name' AS player_name,
-        player_data->>'position' AS player_position,
-        player_data->>'nationality' AS player_nationality,
-        player_data->>'date_of_birth' AS player_date_of_birth
-    FROM
-        {{ ref('stg_fb__teams') }},
-        jsonb_array_elements(squad) AS player_data
+{# the raw table is truncated and reloaded by every extraction, so the model is rebuilt from it:
+   an incremental merge on the row keys would keep the rows that left the snapshot #}
+{{
+    config(
+        materialized='table'
+    )
+}}
+
+with
+
+source as (
+
+    select * from {{ source('raw_football', 'team_players') }}
+
 )
 
-SELECT distinct team_id,
+-- a player is listed once per competition of the team, only one row per team is kept
+select distinct on (team_id, player_id)
+        team_id,
         player_id,
-        player_name,
-        player_position,
-        player_nationality,
-        player_date_of_birth
-    FROM players_data
+        name as player_name,
+        position as player_position,
+        nationality as player_nationality,
+        date_of_birth as player_date_of_birth,
+        load_timestamp
+    from source
+    order by team_id, player_id, load_timestamp desc
@@ -1,20 +1,27 @@
-WITH running_competitions_data AS (
-    SELECT
-        team_id,
-        comp_data->>'id' AS competition_id,
-        comp_data->>'code' AS competition_code,
-        comp_data->>'name' AS competition_name,
-        comp_data->>'type' AS competition_type,
-        comp_data->>'emblem' AS competition_emblem
-    FROM
-        {{ ref('stg_fb__teams') }},
-        jsonb_array_elements(running_competitions) AS comp_data
+{# the raw table is truncated and reloaded by every extraction, so the model is rebuilt from it:
+   an incremental merge on the row keys would keep the rows that left the snapshot #}
+{{
+    config(
+        materialized='table'
+    )
+}}
+
+with
+
+source as (
+
+    select * from {{ source('raw_football', 'team_running_competitions') }}
+
 )
 
-SELECT distinct team_id,
-       competition_id,
-       competition_code,
-       competition_name,
-       competition_type,
-       competition_emblem
-FROM running_competitions_data
+-- the running competitions are listed once per competition of the team, only one row per team is kept
+select distinct on (team_id, running_competition_id)
+       team_id,
+       running_competition_id as competition_id,
+       code as competition_code,
+       name as competition_name,
+       type as competition_type,
+       emblem as competition_emblem,
+       load_timestamp
+from source
+order by team_id, running_competition_id, load_timestamp desc
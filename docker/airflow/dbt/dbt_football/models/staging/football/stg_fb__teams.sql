@@ -1,3 +1,11 @@
+{# the raw table is truncated and reloaded by every extraction, so the model is rebuilt from it:
+   an incremental merge on the row keys would keep the rows that left the snapshot #}
+{{
+    config(
+        materialized='table'
+    )
+}}
+
 with
 
 source as (
@@ -14,12 +22,13 @@ raw_football_teams as (
         id,
         competition_id,
         team_id,
-        area->>'id' as team_area_id,
-  		area->>'code' as team_area_code,
-  		area->>'flag' as team_area_flag,
-  		area->>'name'  as team_area_name,
+        area_id as team_area_id,
+        coach_id,
 
         ---------- text
+        area_code as team_area_code,
+        area_flag as team_area_flag,
+        area_name as team_area_name,
         name as team_name,
         short_name as team_short_name,
         tla,
@@ -28,23 +37,19 @@ raw_football_teams as (
         website,
         club_colors,
         venue,
-        coach->>'id' as coach_id,
-		coach->>'name' as coach_name,
-        coach->'contract'->>'start' as coach_contract_start,
-        coach->'contract'->>'until' as coach_contract_end,
-		coach->>'first_name' as coach_first_name,
-		coach->>'last_name' as coach_last_name,
-		coach->>'nationality' as coach_nationality,
-		coach->>'date_of_birth' as coach_date_of_birth,
-
-        ---------- json
-        running_competitions,
-        staff,
-        squad,
+        coach_name,
+        coach_contract_start,
+        coach_contract_end,
+        coach_first_name,
+        coach_last_name,
+        coach_nationality,
 
         ---------- numerics
         founded,
 
+        ---------- dates
+        coach_date_of_birth,
+
         ---------- timestamps
         last_updated as last_updated_in_source,
         load_timestamp
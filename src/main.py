@@ -1,44 +1,108 @@
 import click
-import logfire
+import os
 import logging
-from utils.competitions_api import CompetitionsAPI, CompetitionsProcessor, CompetitionsDetailsProcessor
-from utils.teams_api import TeamsAPI, TeamsProcessor, TeamUpcomingMatchesProcessor
-from utils.matches_api import MatchesAPI, MatchesProcessor
 from dotenv import load_dotenv
 
+from utils.telemetry import configure_telemetry
 
-# Configuração Logfire
-logfire.configure()
-logging.basicConfig(handlers=[logfire.LogfireLoggingHandler()])
+# The processors (and pandas, pydantic, psycopg2, requests) are only imported by the request type
+# that uses them, after the arguments are parsed: `--help` and short tasks don't pay for the others.
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
-logfire.instrument_requests()
-logfire.instrument_psycopg()
 
 load_dotenv()
 
 @click.command()
-@click.option('--request_type', type=click.Choice(['teams', 'teams_upcoming_matches', 'competitions','competitions_standings','competitions_top_scorers','matches_today'], case_sensitive=False), help="Tipo de requisição a ser feita")
-def main(request_type):
+@click.option('--request_type', type=click.Choice(['teams', 'teams_upcoming_matches', 'competitions','competitions_standings','competitions_top_scorers','matches_today','matches','matches_live','team_ratings','partitions_retention','landing_import'], case_sensitive=False), help="Tipo de requisição a ser feita")
+@click.option('--live_interval', type=float, default=20, show_default=True, help="Seconds between polls while games are live (matches_live only)")
+@click.option('--idle_interval', type=float, default=300, show_default=True, help="Seconds between polls when no game is live (matches_live only)")
+@click.option('--retention_months', type=int, default=36, show_default=True, help="Months of data kept in the partitioned tables (partitions_retention only)")
+@click.option('--landing_path', type=click.Path(exists=True, file_okay=False), help="Landing partition to import, e.g. /data/landing/teams/competition=2021 (landing_import only)")
+@click.option('--landing_truncate', is_flag=True, help="Delete the rows of the competition and season of the landing path before the import (landing_import only)")
+@click.option('--replay_from', '--replay-from', type=click.Path(exists=True, file_okay=False), help="Rebuild the tables of the request type from this response archive instead of calling the API")
+@click.option('--workers', type=int, default=None, help="Processes validating and transforming the replayed responses (default: one per CPU)")
+def main(request_type, live_interval, idle_interval, retention_months, landing_path, landing_truncate, replay_from, workers):
     """
     Main function to map the request type from CLI to the actual process.
     """
+    configure_telemetry()
+
+    if replay_from:
+        from utils.replay import REPLAYS, replay
+        if request_type not in REPLAYS:
+            raise click.UsageError(f"--replay_from only works with {', '.join(REPLAYS)}")
+        rows = replay(request_type, replay_from, schema='raw', workers=workers)
+        logger.info(f"{request_type} replayed from {replay_from}: {rows}")
+        return
+
     if request_type == 'teams':
+        from utils.teams_api import TeamsAPI, TeamsProcessor
         teams_api = TeamsAPI(token=None)
         TeamsProcessor(teams_api, competition_ids=[2001] ,schema='raw', table='teams').process()
     elif request_type == 'competitions':
+        from utils.competitions_api import CompetitionsAPI, CompetitionsProcessor
         competitions_api = CompetitionsAPI(token=None)
         CompetitionsProcessor(competitions_api, schema='raw', table='competitions').process()
     elif request_type == 'competitions_standings':
+        from utils.competitions_api import CompetitionsAPI, CompetitionsDetailsProcessor
         competitions_standings_api = CompetitionsAPI(token=None)
         CompetitionsDetailsProcessor(competitions_standings_api, schema='raw', table='competitions_standings').process()
     elif request_type == 'competitions_top_scorers':
+        from utils.competitions_api import CompetitionsAPI, CompetitionsDetailsProcessor
         competitions_top_scorers_api = CompetitionsAPI(token=None)
         CompetitionsDetailsProcessor(competitions_top_scorers_api, schema='raw', table='competitions_top_scorers').process()
     elif request_type == 'matches_today':
+        from utils.matches_api import MatchesAPI, MatchesProcessor
         competitions_top_scorers_api = MatchesAPI(token=None)
         MatchesProcessor(competitions_top_scorers_api, schema='raw', table='matches_today').process() 
+    elif request_type == 'matches':
+        from utils.matches_api import MatchesAPI, MatchesSyncProcessor
+        matches_api = MatchesAPI(token=None)
+        MatchesSyncProcessor(matches_api, schema='raw', table='matches').process()
+    elif request_type == 'matches_live':
+        from utils.matches_api import MatchesAPI
+        from utils.matches_live import MatchesLivePoller
+        matches_api = MatchesAPI(token=None)
+        MatchesLivePoller(matches_api, schema='raw', table='matches_today',
+                          live_interval=live_interval, idle_interval=idle_interval).process()
+    elif request_type == 'team_ratings':
+        from utils.ratings import TeamRatingsProcessor
+        TeamRatingsProcessor(schema='raw', table='team_ratings').process()
+    elif request_type == 'partitions_retention':
+        from utils.database import Database
+        from utils.partitions import PARTITIONED_TABLES, check_retention, detach_expired_partitions, retention_cutoff
+        db = Database(
+            db_name=os.getenv('PG_DB'),
+            user=os.getenv('PG_USER'),
+            password=os.getenv('PG_PASS'),
+            host=os.getenv('PG_HOST'),
+            port=5432
+        )
+        older_than = retention_cutoff(retention_months)
+        for table in PARTITIONED_TABLES:
+            try:
+                check_retention(table, older_than)
+            except ValueError as e:
+                raise click.BadParameter(str(e), param_hint='--retention_months')
+        for table in PARTITIONED_TABLES:
+            detached = detach_expired_partitions(db, 'raw', table, older_than)
+            logger.info(f"{table}: {len(detached)} partitions older than {older_than} detached {detached}")
+    elif request_type == 'landing_import':
+        from utils.database import Database
+        from utils.sinks import import_partition
+        if not landing_path:
+            raise click.UsageError("landing_import needs --landing_path")
+        db = Database(
+            db_name=os.getenv('PG_DB'),
+            user=os.getenv('PG_USER'),
+            password=os.getenv('PG_PASS'),
+            host=os.getenv('PG_HOST'),
+            port=5432
+        )
+        rows = import_partition(db, landing_path, schema='raw', truncate=landing_truncate)
+        logger.info(f"{rows} rows imported from {landing_path}")
     elif request_type == 'teams_upcoming_matches':
+        from utils.teams_api import TeamsAPI, TeamUpcomingMatchesProcessor
         teams_api = TeamsAPI(token=None)
         TeamUpcomingMatchesProcessor(teams_api,schema='raw', table='teams_upcoming_matches').process()
     else:
@@ -0,0 +1,153 @@
+"""
+This module archives the raw API responses, so they can be processed again (e.g. after a contract
+change) without calling the API.
+
+Every response body is stored once, compressed with zstd, under the SHA-256 of its content:
+    <dir>/blobs/<first 2 hex digits>/<sha256>.json.zst
+Identical bodies (e.g. a competition list that didn't change between two runs) share the same blob.
+Each request is recorded in an append-only index, one JSON line per request and one file per day:
+    <dir>/index/<yyyy-mm-dd>.jsonl   {"endpoint", "params", "fetched_at", "sha256", "bytes", "stored_bytes", "new"}
+
+The archive is enabled by the `RESPONSE_ARCHIVE_DIR` environment variable (see `FootballAPIBase`).
+pyarrow (its zstd codec) is only imported when a blob is written or read.
+"""
+from typing import Any, Dict, Iterator, Optional
+import datetime
+import glob
+import hashlib
+import json
+import logging
+import os
+import threading
+from urllib.parse import parse_qsl
+
+
+class ResponseArchive:
+    """
+    Content-addressed, zstd compressed store of the API responses (see the module docstring).
+
+    Attributes:
+        root (str): The directory of the archive.
+        level (int): The zstd compression level.
+    """
+    def __init__(self, root: str, level: int = 9):
+        self.root = root
+        self.level = level
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> Optional['ResponseArchive']:
+        """The archive of the `RESPONSE_ARCHIVE_DIR` variable, or None when it isn't set."""
+        root = os.getenv('RESPONSE_ARCHIVE_DIR')
+        return cls(root) if root else None
+
+    def blob_path(self, digest: str) -> str:
+        return os.path.join(self.root, 'blobs', digest[:2], f'{digest}.json.zst')
+
+    def store(self, endpoint: str, params: Dict[str, Any], body: bytes, fetched_at: str = None) -> str:
+        """
+        Archives a response: writes its blob unless the same body is already stored, and appends the
+        request to the index.
+
+        Args:
+            endpoint (str): The endpoint requested (e.g. competitions/2021/standings?season=2024).
+            params (Dict[str, Any]): The query parameters of the request.
+            body (bytes): The body of the response.
+            fetched_at (str, optional): When the response was received (ISO, UTC). Defaults to now.
+
+        Returns:
+            str: The SHA-256 of the body, the key of its blob.
+        """
+        import pyarrow as pa
+
+        # The query string of the endpoint goes with the other parameters
+        endpoint, _, query = endpoint.partition('?')
+        params = {**dict(parse_qsl(query)), **(params or {})}
+
+        digest = hashlib.sha256(body).hexdigest()
+        path = self.blob_path(digest)
+        new = not os.path.exists(path)
+        if new:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            compressed = pa.Codec('zstd', compression_level=self.level).compress(body, asbytes=True)
+            tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+            with open(tmp_path, 'wb') as file:
+                file.write(compressed)
+            os.replace(tmp_path, path)
+
+        fetched_at = fetched_at or datetime.datetime.now(datetime.timezone.utc).isoformat()
+        entry = {
+            'endpoint': endpoint,
+            'params': params,
+            'fetched_at': fetched_at,
+            'sha256': digest,
+            'bytes': len(body),
+            'stored_bytes': os.path.getsize(path),
+            'new': new,
+        }
+        index_path = os.path.join(self.root, 'index', f'{fetched_at[:10]}.jsonl')
+        with self._lock:
+            os.makedirs(os.path.dirname(index_path), exist_ok=True)
+            with open(index_path, 'a', encoding='utf-8') as file:
+                file.write(json.dumps(entry, default=str) + '\n')
+        return digest
+
+    def read(self, digest: str) -> bytes:
+        """
+        Reads the body of an archived response.
+
+        Args:
+            digest (str): The SHA-256 of the body.
+
+        Returns:
+            bytes: The body, decompressed.
+
+        Raises:
+            FileNotFoundError: If the blob isn't in the archive.
+        """
+        import pyarrow as pa
+
+        with pa.CompressedInputStream(pa.OSFile(self.blob_path(digest)), 'zstd') as stream:
+            return stream.read()
+
+    def load(self, digest: str) -> Dict[str, Any]:
+        """Reads an archived response as JSON (what `FootballAPIBase._make_request` returned)."""
+        return json.loads(self.read(digest))
+
+    def entries(self, endpoint: str = None) -> Iterator[Dict[str, Any]]:
+        """
+        The requests of the index, oldest first.
+
+        Args:
+            endpoint (str, optional): Only the requests whose endpoint starts with this. Defaults to None (all).
+
+        Yields:
+            Dict[str, Any]: The index entries (see the module docstring).
+        """
+        for index_path in sorted(glob.glob(os.path.join(self.root, 'index', '*.jsonl'))):
+            with open(index_path, encoding='utf-8') as file:
+                for line in file:
+                    if not line.strip():
+                        continue
+                    entry = json.loads(line)
+                    if endpoint is None or entry['endpoint'].startswith(endpoint):
+                        yield entry
+
+
+def archive_response(archive: Optional[ResponseArchive], endpoint: str, params: Dict[str, Any], body: bytes) -> None:
+    """
+    Archives a response when the archive is enabled. A failure is only logged, the archive must never
+    fail an extraction.
+
+    Args:
+        archive (Optional[ResponseArchive]): The archive, or None when disabled.
+        endpoint (str): The endpoint requested.
+        params (Dict[str, Any]): The query parameters of the request.
+        body (bytes): The body of the response.
+    """
+    if archive is None:
+        return
+    try:
+        archive.store(endpoint, params, body)
+    except Exception as e:
+        logging.warning(f"Could not archive the response of {endpoint}: {e}")
@@ -6,14 +6,15 @@ details, matches, and storing processed data into a PostgreSQL database.
 
 from typing import Dict, Any
 import pandas as pd
-import json
 import os
 import datetime
 
 from utils.football_api import FootballAPIBase
 from utils.processor import Processor
 from utils.database import Database
-from utils.queries import create_queries 
+from utils.flatten import flatten_competitions, flatten_standings, flatten_top_scorers
+from utils.history import standings_history
+from utils.partitions import STANDINGS_RELOADED_SEASONS
 from contracts.competitions_contract import CompetitionsResponse
 from contracts.competitions_standings_contract import CompetitionStandingsResponse
 from contracts.competitions_top_scorers_contract import TopScorersResponse
@@ -115,7 +116,7 @@ class CompetitionsProcessor(Processor):
 
     Methods:
         process: Main method to fetch, transform, and load competition data.
-        _write_to_db: Writes the processed DataFrame to the specified database table.
+        _write_to_db: Writes the processed DataFrame to the specified database table (see `Processor`).
     """
     def __init__(self, api_connection: CompetitionsAPI, schema = 'RAW', table = None):
         """
@@ -153,15 +154,13 @@ class CompetitionsProcessor(Processor):
         """
         self.logger.info(f"Start Processing - {self.table}")
         self.logger.info("Dataframe from response:")
-        competitions_data = CompetitionsResponse(**self.api_connection.get_competitions())
+        response = self._fetch(self.api_connection.get_competitions)
+        competitions_data = self._validate(CompetitionsResponse, response)
 
-        # Convertendo para dicionário e depois criando o DataFrame
-        competitions_dict = [comp.model_dump() for comp in competitions_data.competitions]
-        df = pd.DataFrame(competitions_dict)
-        
-        # Converte as colunas 'area' e 'current_season' para JSON (se não forem nulas)
-        df['area'] = df['area'].apply(lambda x: json.dumps(x) if isinstance(x, dict) else None)
-        df['current_season'] = df['current_season'].apply(lambda x: json.dumps(x, default=str) if isinstance(x, dict) else None)
+        # Flattening the nested fields into typed columns
+        with self.stage('transform') as stage:
+            df = flatten_competitions(competitions_data.competitions)
+            stage.rows = len(df)
 
         load_timesamp = datetime.datetime.now(datetime.timezone.utc).isoformat() 
         
@@ -178,30 +177,6 @@ class CompetitionsProcessor(Processor):
         self.logger.info(f"Writing to Database - {self.table}:")
         self._write_to_db(df_with_metadata)
 
-    def _write_to_db(self, df: pd.DataFrame) -> None:
-        """
-        Writes the processed DataFrame to the specified database table.
-
-        Args:
-            df (pd.DataFrame): The processed DataFrame to be inserted into the database.
-
-        Returns:
-            None
-        """
-        query = getattr(create_queries, self.table.upper()).format(
-            schema=self.schema,
-            table=self.table
-        )
-        # Verificar e criar a tabela se necessário
-        self.db.validate_table_exists(self.schema, self.table, query)
-        self.db.execute_query(
-            create_queries.TRUNCATE_TABLE.format(
-                schema=self.schema,
-                table=self.table
-            )
-        )
-        self.db.insert_pandas_bulk(df,f'{self.schema}.{self.table}')
-
 
 class CompetitionsDetailsProcessor(Processor):
     """
@@ -212,7 +187,7 @@ class CompetitionsDetailsProcessor(Processor):
 
     Methods:
         process: Main method to fetch, transform, and load competition details (standings/top scorers).
-        _write_to_db: Writes the processed DataFrame to the specified database table.
+        _write_to_db: Writes the processed DataFrame to the specified database table (see `Processor`).
     """
     def __init__(self, api_connection: CompetitionsAPI, schema = 'RAW', table = None):
         """
@@ -261,39 +236,32 @@ class CompetitionsDetailsProcessor(Processor):
 
             self.logger.info(f"Competition IDs Standings to be retrieved: {competition_ids}")
             
-            for season in range(actual_year-2, actual_year+1):
+            for season in range(actual_year-STANDINGS_RELOADED_SEASONS+1, actual_year+1):
                 self.logger.info(f'Retrieving data for season: {season}')
                 for competition_id in competition_ids:
                     self.logger.info(f'Retrieving data for competition id: {competition_id}')
                     ## For Cup competitions like FIFA World Cup/UEFA Champions League/European Championship/Libertadores different logic is needed
                     if competition_id not in [2000,2001,2018,2152]:
                         try:
-                            standing_data = CompetitionStandingsResponse(**self.api_connection.get_standings(competition_id=competition_id, season=season))
+                            standing_data = self._validate(CompetitionStandingsResponse, self._fetch(self.api_connection.get_standings, competition_id=competition_id, season=season))
                         except Exception as e: 
                             self.logger.error(f'Not able to retrieve data for competition_id: {competition_id} season: {season}. \nReason: {e}')
                             continue
                     elif season == actual_year:
                         try:
-                            standing_data = CompetitionStandingsResponse(**self.api_connection.get_standings(competition_id=competition_id))
+                            standing_data = self._validate(CompetitionStandingsResponse, self._fetch(self.api_connection.get_standings, competition_id=competition_id))
                         except Exception as e: 
                             self.logger.error(f'Not able to retrieve data for competition_id: {competition_id} season: {season}. \nReason: {e}')
                             continue
                     else:
                         #self.logger.info(f"Something happened that didn't met for conditions")
                         continue
-                    # Convertendo para dicionário e depois criando o DataFrame
-                    standings_dict = [item.model_dump() for item in standing_data.standings]
-                    df = pd.DataFrame(standings_dict[0]['table'])
-                    df['competition_id'] = competition_id
-                    df['season'] = standing_data.filters['season']
-                    df['season_info'] = standing_data.season.model_dump_json()
-
-                    standings_data.append(df)
+                    # Flattening the total table into typed columns
+                    with self.stage('transform') as stage:
+                        standings_data.append(flatten_standings(standing_data, competition_id))
+                        stage.rows = len(standings_data[-1])
 
-            final_competition_standings_df = pd.concat(standings_data)
-                
-            # # Converte a colunas 'team' (se não for nula)
-            final_competition_standings_df['team'] = final_competition_standings_df['team'].apply(lambda x: json.dumps(x) if isinstance(x, dict) else None)
+            final_competition_standings_df = pd.concat(standings_data, ignore_index=True)
 
             load_timesamp = datetime.datetime.now(datetime.timezone.utc).isoformat() 
             
@@ -308,6 +276,11 @@ class CompetitionsDetailsProcessor(Processor):
             # df_with_metadata.to_csv('competition_details', index=False)
             self.logger.info(f"Writing to Database - {self.table}:")
             self._write_to_db(df_with_metadata)
+
+            # The raw table only keeps the last load, the history keeps what changed
+            if self.write_postgres:
+                self.logger.info(f"Appending changes to the history - {self.table}:")
+                standings_history(self.db, self.schema).append(final_competition_standings_df, load_timesamp)
         
         elif self.table == 'competitions_top_scorers':
             top_scorers = []
@@ -326,32 +299,24 @@ class CompetitionsDetailsProcessor(Processor):
                     ## For Cup competitions like FIFA World Cup/UEFA Champions League/European Championship/Libertadores different logic is needed
                     if competition_id not in [2000,2001,2018,2152]:
                         try:
-                            top_scorer_data = TopScorersResponse(**self.api_connection.get_top_scorers(competition_id=competition_id, season=season))
+                            top_scorer_data = self._validate(TopScorersResponse, self._fetch(self.api_connection.get_top_scorers, competition_id=competition_id, season=season))
                         except Exception as e: 
                             self.logger.error(f'Not able to retrieve data for competition_id: {competition_id} season: {season}. \nReason: {e}')
                             continue
                     elif season == actual_year:
                         try: 
-                            top_scorer_data = TopScorersResponse(**self.api_connection.get_top_scorers(competition_id=competition_id))
+                            top_scorer_data = self._validate(TopScorersResponse, self._fetch(self.api_connection.get_top_scorers, competition_id=competition_id))
                         except Exception as e: 
                             self.logger.error(f'Not able to retrieve data for competition_id: {competition_id} season: {season}. \nReason: {e}')
                             continue
                     else:
                         continue
-                    # Convertendo para dicionário e depois criando o DataFrame
-                    top_scorers_dict = [item.model_dump() for item in top_scorer_data.scorers]
-                    df = pd.DataFrame(top_scorers_dict)
-                    df['competition_id'] = competition_id
-                    df['season'] = top_scorer_data.filters['season']
-                    df['season_info'] = top_scorer_data.season.model_dump_json()
+                    # Flattening the scorers into typed columns
+                    with self.stage('transform') as stage:
+                        top_scorers.append(flatten_top_scorers(top_scorer_data, competition_id))
+                        stage.rows = len(top_scorers[-1])
 
-                    top_scorers.append(df)
-
-            final_competition_top_scorers_df = pd.concat(top_scorers)
-                
-            # # Converte a colunas 'team' (se não for nula)
-            final_competition_top_scorers_df['team'] = final_competition_top_scorers_df['team'].apply(lambda x: json.dumps(x, default=str) if isinstance(x, dict) else None)
-            final_competition_top_scorers_df['player'] = final_competition_top_scorers_df['player'].apply(lambda x: json.dumps(x, default=str) if isinstance(x, dict) else None)
+            final_competition_top_scorers_df = pd.concat(top_scorers, ignore_index=True)
 
             load_timesamp = datetime.datetime.now(datetime.timezone.utc).isoformat() 
             
@@ -366,30 +331,3 @@ class CompetitionsDetailsProcessor(Processor):
             # df_with_metadata.to_csv('competition_top_scorers', index=False)
             self.logger.info(f"Writing to Database - {self.table}:")
             self._write_to_db(df_with_metadata)
-
-
-
-    def _write_to_db(self, df: pd.DataFrame) -> None:
-        """
-        Writes the processed DataFrame to the specified database table.
-
-        Args:
-            df (pd.DataFrame): The processed DataFrame to be inserted into the database.
-
-        Returns:
-            None
-        """
-        query = getattr(create_queries, self.table.upper()).format(
-            schema=self.schema,
-            table=self.table
-        )
-        # Verificar e criar a tabela se necessário
-        self.db.validate_table_exists(self.schema, self.table, query)
-        self.db.execute_query(
-            create_queries.TRUNCATE_TABLE.format(
-                schema=self.schema,
-                table=self.table
-            )
-        )
-
-        self.db.insert_pandas_bulk(df,f'{self.schema}.{self.table}')
\ No newline at end of file
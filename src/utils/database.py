@@ -27,6 +27,7 @@ class Database:
         self.host = host
         self.port = port
         self.connection = None
+        self._in_transaction = False
 
     def connect(self):
         """
@@ -65,6 +66,7 @@ class Database:
     def cursor(self):
         """
         Manages the database cursor context, automatically handling commits and rollbacks.
+        Inside `transaction`, the commit or rollback is left to the transaction.
 
         Yields:
             cursor: A database cursor for executing SQL queries.
@@ -73,14 +75,36 @@ class Database:
         cursor = self.connection.cursor()
         try:
             yield cursor
-            self.connection.commit()
+            if not self._in_transaction:
+                self.connection.commit()
         except Exception as e:
-            self.connection.rollback()
+            if not self._in_transaction:
+                self.connection.rollback()
             print(f"Error executing query: {e}")
             raise
         finally:
             cursor.close()
 
+    @contextmanager
+    def transaction(self):
+        """
+        Runs the queries of the block (e.g. a delete and the inserts replacing the rows) in one transaction,
+        committed at the end of the block and rolled back if it raises.
+        """
+        if self._in_transaction:
+            yield
+            return
+        self.connect()
+        self._in_transaction = True
+        try:
+            yield
+            self.connection.commit()
+        except Exception:
+            self.connection.rollback()
+            raise
+        finally:
+            self._in_transaction = False
+
     def insert(self, table, data):
         """
         Inserts data into a specified table.
@@ -149,6 +173,22 @@ class Database:
             if query.strip().lower().startswith("select"):
                 return cursor.fetchall()
 
+    def select_pandas(self, query, params=None) -> pd.DataFrame:
+        """
+        Executes a SELECT query and returns the result as a Pandas DataFrame.
+
+        Args:
+            query (str): The SQL query to execute.
+            params (tuple | list | dict, optional): Parameters to be passed to the query. Defaults to None.
+
+        Returns:
+            pd.DataFrame: The query result, with the column names of the query.
+        """
+        with self.cursor() as cursor:
+            cursor.execute(query, params)
+            columns = [description[0] for description in cursor.description]
+            return pd.DataFrame(cursor.fetchall(), columns=columns)
+
     def validate_table_exists(self, schema, table, create_table_sql):
         """
         Validates whether the schema and table exist in the database, creating them if necessary.
@@ -194,18 +234,32 @@ class Database:
                 cursor.execute(create_table_sql)
                 print(f"Tabela '{schema}.{table}' created successfully!")
 
-    def insert_pandas_bulk(self, df: pd.DataFrame, table_name: str):
+    @staticmethod
+    def _to_records(df: pd.DataFrame) -> list:
+        """
+        Converts a DataFrame into a list of rows, with the missing values (NaN/NaT) as None (NULL).
+
+        Args:
+            df (pd.DataFrame): The DataFrame to convert.
+
+        Returns:
+            list: One list of values per row.
+        """
+        return df.astype(object).where(df.notna(), None).values.tolist()
+
+    def insert_pandas_bulk(self, df: pd.DataFrame, table_name: str, records: list = None):
         """
         Inserts the data from a Pandas DataFrame into a specified table in bulk.
 
         Args:
             df (pd.DataFrame): The DataFrame containing the data to be inserted.
             table_name (str): The name of the target table.
+            records (list, optional): The rows of the DataFrame already converted by `_to_records`. Defaults to None (converted here).
         """
         logging.info("Starting dataframe bulk load")
         try:
             # Generate tuple list from Dataframe
-            records = df.values.tolist()
+            records = self._to_records(df) if records is None else records
             # Generate a placeholder string for SQL
             columns = ', '.join(df.columns)
             placeholders = ', '.join(['%s'] * len(df.columns))
@@ -220,6 +274,87 @@ class Database:
             print(f"Error to insert records: {e}")
             raise
 
+    def upsert_pandas_bulk(self, df: pd.DataFrame, table_name: str, conflict_columns: list, update_condition: str = None,
+                           records: list = None) -> int:
+        """
+        Inserts the data from a Pandas DataFrame into a specified table, updating the rows that already exist.
+
+        Args:
+            df (pd.DataFrame): The DataFrame containing the data to be upserted.
+            table_name (str): The name of the target table.
+            conflict_columns (list): The columns of the unique constraint used to detect existing rows.
+            update_condition (str, optional): An optional SQL condition that must hold for an existing row to be updated.
+                The existing row is referenced as `target` and the incoming one as `EXCLUDED`
+                (e.g. "target.last_updated < EXCLUDED.last_updated"). Defaults to None (always update).
+            records (list, optional): The rows of the DataFrame already converted by `_to_records`. Defaults to None (converted here).
+
+        Returns:
+            int: The number of rows inserted or updated.
+        """
+        logging.info("Starting dataframe bulk upsert")
+        try:
+            records = self._to_records(df) if records is None else records
+            columns = ', '.join(df.columns)
+            placeholders = ', '.join(['%s'] * len(df.columns))
+            updates = ', '.join([f"{col} = EXCLUDED.{col}" for col in df.columns if col not in conflict_columns])
+            upsert_query = (
+                f"INSERT INTO {table_name} AS target ({columns}) VALUES ({placeholders}) "
+                f"ON CONFLICT ({', '.join(conflict_columns)}) DO UPDATE SET {updates}"
+            )
+            if update_condition:
+                upsert_query += f" WHERE {update_condition}"
+
+            with self.cursor() as cursor:
+                cursor.executemany(upsert_query, records)
+                affected_rows = cursor.rowcount
+            print(f"{affected_rows} records upserted successfully!")
+            return affected_rows
+        except Exception as e:
+            print(f"Error to upsert records: {e}")
+            raise
+
+    def update_pandas_bulk(self, df: pd.DataFrame, table_name: str, key_columns: list) -> int:
+        """
+        Updates existing rows of a specified table with the data from a Pandas DataFrame.
+
+        Only the columns present in the DataFrame are updated. Rows that don't exist are ignored.
+
+        Args:
+            df (pd.DataFrame): The DataFrame containing the key columns and the values to be updated.
+            table_name (str): The name of the target table.
+            key_columns (list): The columns used to find the rows to update.
+
+        Returns:
+            int: The number of rows updated.
+        """
+        logging.info("Starting dataframe bulk update")
+        try:
+            value_columns = [col for col in df.columns if col not in key_columns]
+            records = self._to_records(df[value_columns + key_columns])
+            updates = ', '.join([f"{col} = %s" for col in value_columns])
+            conditions = ' AND '.join([f"{col} = %s" for col in key_columns])
+            update_query = f"UPDATE {table_name} SET {updates} WHERE {conditions}"
+
+            with self.cursor() as cursor:
+                cursor.executemany(update_query, records)
+                affected_rows = cursor.rowcount
+            print(f"{affected_rows} records updated successfully!")
+            return affected_rows
+        except Exception as e:
+            print(f"Error to update records: {e}")
+            raise
+
+    def notify(self, channel: str, payload: str) -> None:
+        """
+        Sends a notification to the listeners of a channel (Postgres NOTIFY).
+
+        Args:
+            channel (str): The name of the channel.
+            payload (str): The payload of the notification. Postgres limits it to 8000 bytes.
+        """
+        with self.cursor() as cursor:
+            cursor.execute("SELECT pg_notify(%s, %s)", (channel, payload))
+
 # Example
 if __name__ == "__main__":
     db = Database(
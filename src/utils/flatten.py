@@ -0,0 +1,333 @@
+"""
+This module flattens the validated contracts into typed, columnar rows ready to be loaded.
+
+Nested objects (areas, seasons, teams, coaches, scores) become prefixed columns and lists
+(squads, staff, running competitions, referees) become child tables, so the database stores
+plain indexable columns instead of JSONB documents. The full document of each row can still
+be kept in a `raw_json` column by setting the `ARCHIVE_RAW_JSON` environment variable to `true`.
+"""
+from typing import Dict, List, Optional
+import os
+import pandas as pd
+from pydantic import BaseModel
+
+from contracts.competitions_contract import Competition
+from contracts.competitions_standings_contract import CompetitionStandingsResponse
+from contracts.competitions_top_scorers_contract import TopScorersResponse
+from contracts.matches_contract import Match
+from contracts.teams_contract import Team
+
+
+def archive_json(model: BaseModel) -> Optional[str]:
+    """
+    Serializes the full document of a model when the raw JSON archive is enabled.
+
+    Args:
+        model (BaseModel): The validated model.
+
+    Returns:
+        Optional[str]: The JSON document, or None when `ARCHIVE_RAW_JSON` is not `true`.
+    """
+    if os.getenv('ARCHIVE_RAW_JSON', 'false').lower() != 'true':
+        return None
+    return model.model_dump_json()
+
+
+def _area_columns(area, prefix: str = 'area') -> Dict:
+    return {
+        f'{prefix}_id': area.id if area else None,
+        f'{prefix}_name': area.name if area else None,
+        f'{prefix}_code': area.code if area else None,
+        f'{prefix}_flag': area.flag if area else None,
+    }
+
+
+def _season_columns(season, prefix: str = 'season') -> Dict:
+    return {
+        f'{prefix}_id': season.id,
+        f'{prefix}_start_date': season.start_date,
+        f'{prefix}_end_date': season.end_date,
+        f'{prefix}_current_matchday': season.current_matchday,
+        f'{prefix}_winner_id': season.winner.id if season.winner else None,
+    }
+
+
+def _team_columns(team, prefix: str) -> Dict:
+    return {
+        f'{prefix}_id': team.id if team else None,
+        f'{prefix}_name': team.name if team else None,
+        f'{prefix}_short_name': team.short_name if team else None,
+        f'{prefix}_tla': team.tla if team else None,
+        f'{prefix}_crest': team.crest if team else None,
+    }
+
+
+def flatten_competitions(competitions: List[Competition]) -> pd.DataFrame:
+    """
+    Flattens the competitions.
+
+    Args:
+        competitions (List[Competition]): The validated competitions.
+
+    Returns:
+        pd.DataFrame: One row per competition.
+    """
+    return pd.DataFrame([
+        {
+            'id': competition.id,
+            'name': competition.name,
+            'code': competition.code,
+            'type': competition.type,
+            'emblem': competition.emblem,
+            'plan': competition.plan,
+            **_area_columns(competition.area),
+            **_season_columns(competition.current_season, prefix='current_season'),
+            'number_of_available_seasons': competition.number_of_available_seasons,
+            'last_updated': competition.last_updated,
+            'raw_json': archive_json(competition),
+        }
+        for competition in competitions
+    ])
+
+
+def flatten_teams(teams: List[Team], competition_id: int) -> Dict[str, pd.DataFrame]:
+    """
+    Flattens the teams of a competition into the teams table and its child tables.
+
+    Args:
+        teams (List[Team]): The validated teams.
+        competition_id (int): The competition the teams were retrieved for.
+
+    Returns:
+        Dict[str, pd.DataFrame]: The rows of the `teams`, `team_players`, `team_staff`
+        and `team_running_competitions` tables.
+    """
+    team_rows, player_rows, staff_rows, running_competition_rows = [], [], [], []
+
+    for team in teams:
+        coach = team.coach
+        contract = coach.contract if coach else None
+        team_rows.append({
+            'competition_id': competition_id,
+            'team_id': team.id,
+            'name': team.name,
+            'short_name': team.short_name,
+            'tla': team.tla,
+            'crest': team.crest,
+            'address': team.address,
+            'website': team.website,
+            'founded': team.founded,
+            'club_colors': team.club_colors,
+            'venue': team.venue,
+            **_area_columns(team.area),
+            'coach_id': coach.id if coach else None,
+            'coach_name': coach.name if coach else None,
+            'coach_first_name': coach.first_name if coach else None,
+            'coach_last_name': coach.last_name if coach else None,
+            'coach_date_of_birth': coach.date_of_birth if coach else None,
+            'coach_nationality': coach.nationality if coach else None,
+            'coach_contract_start': contract.start if contract else None,
+            'coach_contract_end': contract.until if contract else None,
+            'last_updated': team.last_updated,
+            'raw_json': archive_json(team),
+        })
+
+        for player in team.squad or []:
+            player_rows.append({
+                'competition_id': competition_id,
+                'team_id': team.id,
+                'player_id': player.id,
+                'name': player.name,
+                'position': player.position,
+                'date_of_birth': player.date_of_birth,
+                'nationality': player.nationality,
+            })
+
+        # Staff members are not modeled by the contract, only the known keys are kept
+        for member in team.staff or []:
+            member_contract = member.get('contract') or {}
+            staff_rows.append({
+                'competition_id': competition_id,
+                'team_id': team.id,
+                'staff_id': member.get('id'),
+                'name': member.get('name'),
+                'first_name': member.get('firstName'),
+                'last_name': member.get('lastName'),
+                'date_of_birth': member.get('dateOfBirth'),
+                'nationality': member.get('nationality'),
+                'contract_start': member_contract.get('start'),
+                'contract_end': member_contract.get('until'),
+            })
+
+        for running_competition in team.running_competitions or []:
+            running_competition_rows.append({
+                'competition_id': competition_id,
+                'team_id': team.id,
+                'running_competition_id': running_competition.id,
+                'name': running_competition.name,
+                'code': running_competition.code,
+                'type': running_competition.type,
+                'emblem': running_competition.emblem,
+            })
+
+    return {
+        'teams': pd.DataFrame(team_rows),
+        'team_players': pd.DataFrame(player_rows, columns=['competition_id', 'team_id', 'player_id', 'name', 'position', 'date_of_birth', 'nationality']),
+        'team_staff': pd.DataFrame(staff_rows, columns=['competition_id', 'team_id', 'staff_id', 'name', 'first_name', 'last_name', 'date_of_birth', 'nationality', 'contract_start', 'contract_end']),
+        'team_running_competitions': pd.DataFrame(running_competition_rows, columns=['competition_id', 'team_id', 'running_competition_id', 'name', 'code', 'type', 'emblem']),
+    }
+
+
+REFEREE_COLUMNS = ['match_id', 'referee_id', 'name', 'type', 'nationality']
+
+
+def match_row(match: Match) -> Dict:
+    """
+    Flattens one match into a row of the matches tables.
+
+    Args:
+        match (Match): The validated match.
+
+    Returns:
+        Dict: The columns of the match.
+    """
+    score = match.score
+    return {
+        'id': match.id,
+        'utc_date': match.utc_date,
+        'status': match.status,
+        'matchday': match.matchday,
+        'stage': match.stage,
+        'which_group': match.which_group,
+        'last_updated': match.last_updated,
+        **_area_columns(match.area),
+        'competition_id': match.competition.id,
+        'competition_name': match.competition.name,
+        'competition_code': match.competition.code,
+        'competition_type': match.competition.type,
+        'competition_emblem': match.competition.emblem,
+        **_season_columns(match.season),
+        **_team_columns(match.home_team, prefix='home_team'),
+        **_team_columns(match.away_team, prefix='away_team'),
+        'score_winner': score.winner,
+        'score_duration': score.duration,
+        'full_time_home': score.full_time.home,
+        'full_time_away': score.full_time.away,
+        'half_time_home': score.half_time.home,
+        'half_time_away': score.half_time.away,
+        'raw_json': archive_json(match),
+    }
+
+
+def referee_rows(match: Match) -> List[Dict]:
+    """
+    Flattens the referees of one match into rows of the `match_referees` table.
+
+    Args:
+        match (Match): The validated match.
+
+    Returns:
+        List[Dict]: One row per referee.
+    """
+    return [
+        {
+            'match_id': match.id,
+            'referee_id': referee.id,
+            'name': referee.name,
+            'type': referee.type,
+            'nationality': referee.nationality,
+        }
+        for referee in match.referees
+    ]
+
+
+def flatten_matches(matches: List[Match]) -> Dict[str, pd.DataFrame]:
+    """
+    Flattens matches into the matches table and the referees child table.
+
+    Args:
+        matches (List[Match]): The validated matches.
+
+    Returns:
+        Dict[str, pd.DataFrame]: The rows of the matches table (key `matches`) and of the `match_referees` table.
+    """
+    match_rows, all_referee_rows = [], []
+
+    for match in matches:
+        match_rows.append(match_row(match))
+        all_referee_rows.extend(referee_rows(match))
+
+    return {
+        'matches': pd.DataFrame(match_rows),
+        'match_referees': pd.DataFrame(all_referee_rows, columns=REFEREE_COLUMNS),
+    }
+
+
+def flatten_standings(response: CompetitionStandingsResponse, competition_id: int) -> pd.DataFrame:
+    """
+    Flattens the total standings table of a competition season.
+
+    Args:
+        response (CompetitionStandingsResponse): The validated standings response.
+        competition_id (int): The competition the standings were retrieved for.
+
+    Returns:
+        pd.DataFrame: One row per team of the table.
+    """
+    return pd.DataFrame([
+        {
+            'position': entry.position,
+            **_team_columns(entry.team, prefix='team'),
+            'played_games': entry.played_games,
+            'form': entry.form,
+            'won': entry.won,
+            'draw': entry.draw,
+            'lost': entry.lost,
+            'points': entry.points,
+            'goals_for': entry.goals_for,
+            'goals_against': entry.goals_against,
+            'goal_difference': entry.goal_difference,
+            'competition_id': competition_id,
+            'season': response.filters['season'],
+            **_season_columns(response.season),
+            'raw_json': archive_json(entry),
+        }
+        for entry in response.standings[0].table
+    ])
+
+
+def flatten_top_scorers(response: TopScorersResponse, competition_id: int) -> pd.DataFrame:
+    """
+    Flattens the top scorers of a competition season.
+
+    Args:
+        response (TopScorersResponse): The validated top scorers response.
+        competition_id (int): The competition the top scorers were retrieved for.
+
+    Returns:
+        pd.DataFrame: One row per scorer.
+    """
+    return pd.DataFrame([
+        {
+            'player_id': scorer.player.id,
+            'player_name': scorer.player.name,
+            'player_first_name': scorer.player.first_name,
+            'player_last_name': scorer.player.last_name,
+            'player_date_of_birth': scorer.player.date_of_birth,
+            'player_nationality': scorer.player.nationality,
+            'player_section': scorer.player.section,
+            'player_position': scorer.player.position,
+            'player_shirt_number': scorer.player.shirt_number,
+            'player_last_updated': scorer.player.last_updated,
+            **_team_columns(scorer.team, prefix='team'),
+            'played_matches': scorer.played_matches,
+            'goals': scorer.goals,
+            'assists': scorer.assists,
+            'penalties': scorer.penalties,
+            'competition_id': competition_id,
+            'season': response.filters['season'],
+            **_season_columns(response.season),
+            'raw_json': archive_json(scorer),
+        }
+        for scorer in response.scorers
+    ])
@@ -6,6 +6,8 @@ from typing import Any, Dict
 import os
 from dotenv import load_dotenv
 
+from utils.archive import ResponseArchive, archive_response
+
 load_dotenv()
 
 API_KEY = os.getenv("API_KEY")
@@ -24,11 +26,12 @@ class FootballAPIBase:
         - _make_request: Makes an HTTP GET request to the API while respecting rate limits.
         - _make_paginated_request: Makes a paginated API request and retrieves all results.
     """
-    BASE_URL = "https://api.football-data.org/v4"
+    # Can point to a stand-in of the API (see benchmarks/stand_in_server.py)
+    BASE_URL = os.getenv("FOOTBALL_API_URL", "https://api.football-data.org/v4")
     HEADERS = {"X-Auth-Token": API_KEY} 
 
     # Rate limit: 10 per minute
-    REQUESTS_LIMIT = 10
+    REQUESTS_LIMIT = int(os.getenv("FOOTBALL_API_RATE_LIMIT", 10))
     TIME_PERIOD = 60  # Segundos
 
 
@@ -41,6 +44,10 @@ class FootballAPIBase:
         """
         self.base_url = self.BASE_URL
         self.headers = {"X-Auth-Token": token or self.HEADERS["X-Auth-Token"]}
+        # Size of the body of the last response (see Processor._fetch)
+        self.last_response_bytes = None
+        # Raw responses are archived when RESPONSE_ARCHIVE_DIR is set (see utils.archive)
+        self.archive = ResponseArchive.from_env()
 
     @sleep_and_retry
     @limits(calls=REQUESTS_LIMIT, period=TIME_PERIOD)
@@ -68,6 +75,8 @@ class FootballAPIBase:
             try:
                 response = requests.get(url, headers=self.headers, params=params)
                 response.raise_for_status()
+                self.last_response_bytes = len(response.content)
+                archive_response(self.archive, endpoint, params, response.content)
                 return response.json()
 
             except requests.exceptions.HTTPError as http_err:
@@ -0,0 +1,245 @@
+"""
+This module keeps an append-only history of the tables that are fully replaced on every load
+(standings and squads), so their past states can be queried without calling the API again.
+
+Only deltas are stored: a row is appended when it is new or when any of its tracked values changed
+since its latest version, and a tombstone (`is_removed`) is appended when it disappears from its scope
+(e.g. a player leaving a squad). The history tables are range partitioned by (competition_id, load_date),
+one partition per competition and year, created at load time (see `utils.partitions`).
+"""
+from typing import Dict, Iterable, List, Tuple
+import datetime
+import logging
+import pandas as pd
+
+from utils.database import Database
+from utils.queries import create_queries
+from utils.partitions import ensure_partitions
+
+
+def _normalize(value):
+    """Makes values read from the database comparable to the values of a new load."""
+    if value is None or (not isinstance(value, (list, dict)) and pd.isna(value)):
+        return None
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, (datetime.date, datetime.datetime, pd.Timestamp)):
+        return value.isoformat()
+    return value
+
+
+def _rows(df: pd.DataFrame, columns: List[str]) -> List[Tuple]:
+    return [tuple(_normalize(value) for value in row) for row in df[columns].itertuples(index=False, name=None)]
+
+
+def compute_deltas(current: pd.DataFrame, latest: pd.DataFrame, key_columns: List[str],
+                   value_columns: List[str], scope_columns: List[str] = None) -> pd.DataFrame:
+    """
+    Compares a new load against the latest version of each row in the history.
+
+    Args:
+        current (pd.DataFrame): The rows of the new load.
+        latest (pd.DataFrame): The latest version of each row in the history, with an `is_removed` column.
+        key_columns (List[str]): The columns identifying a row.
+        value_columns (List[str]): The columns tracked for changes.
+        scope_columns (List[str], optional): Subset of the key columns defining the scope of a load
+            (e.g. a team for a squad). Rows missing from a scope present in the load get a tombstone.
+            Defaults to None (rows are never removed).
+
+    Returns:
+        pd.DataFrame: The new and changed rows plus the tombstones, with the key, value and `is_removed` columns.
+    """
+    columns = key_columns + value_columns
+    latest = latest[~latest['is_removed'].astype(bool)] if not latest.empty else latest
+    latest_values = {row[:len(key_columns)]: row[len(key_columns):] for row in _rows(latest, columns)} if not latest.empty else {}
+
+    current_rows = _rows(current, columns)
+    changed = [
+        row for row in current_rows
+        if latest_values.get(row[:len(key_columns)]) != row[len(key_columns):]
+    ]
+    deltas = pd.DataFrame(changed, columns=columns)
+    deltas['is_removed'] = False
+
+    if scope_columns:
+        scope_positions = [key_columns.index(column) for column in scope_columns]
+        loaded_scopes = {tuple(row[position] for position in scope_positions) for row in current_rows}
+        loaded_keys = {row[:len(key_columns)] for row in current_rows}
+        removed = [
+            key for key in latest_values
+            if key not in loaded_keys and tuple(key[position] for position in scope_positions) in loaded_scopes
+        ]
+        if removed:
+            tombstones = pd.DataFrame(removed, columns=key_columns)
+            tombstones['is_removed'] = True
+            deltas = pd.concat([deltas, tombstones], ignore_index=True)
+
+    return deltas
+
+
+class SnapshotHistory:
+    """
+    Append-only, delta based history of a table partitioned by (competition_id, load_date).
+
+    Attributes:
+        db (Database): The database holding the history.
+        schema (str): Database schema to use.
+        table (str): The history table (its DDL is the constant named after it in `create_queries`).
+        key_columns (List[str]): The columns identifying a row. Must start with `competition_id`.
+        value_columns (List[str]): The columns tracked for changes.
+        scope_columns (List[str]): The key columns defining the scope of a load, used for tombstones.
+
+    Methods:
+        - append: Appends the deltas of a new load.
+        - as_of: Returns the state of the table at a date.
+    """
+    def __init__(self, db: Database, schema: str, table: str, key_columns: List[str],
+                 value_columns: List[str], scope_columns: List[str] = None):
+        self.db = db
+        self.schema = schema
+        self.table = table
+        self.key_columns = key_columns
+        self.value_columns = value_columns
+        self.scope_columns = scope_columns
+
+    def _validate_table(self) -> None:
+        query = getattr(create_queries, self.table.upper()).format(schema=self.schema, table=self.table)
+        self.db.validate_table_exists(self.schema, self.table, query)
+
+        indexes_query = getattr(create_queries, f'{self.table.upper()}_INDEXES', None)
+        if indexes_query:
+            self.db.execute_query(indexes_query.format(schema=self.schema, table=self.table))
+
+    def latest(self, competition_ids: Iterable[int]) -> pd.DataFrame:
+        """
+        Reads the latest version (including tombstones) of every row of the given competitions.
+
+        Args:
+            competition_ids (Iterable[int]): The competitions to read.
+
+        Returns:
+            pd.DataFrame: One row per key, with the key, value and `is_removed` columns.
+        """
+        keys = ', '.join(self.key_columns)
+        query = f"""
+            select distinct on ({keys}) {keys}, {', '.join(self.value_columns)}, is_removed
+              from {self.schema}.{self.table}
+             where competition_id = any(%(competition_ids)s)
+             order by {keys}, load_date desc
+        """
+        return self.db.select_pandas(query, {'competition_ids': [int(competition_id) for competition_id in competition_ids]})
+
+    def append(self, df: pd.DataFrame, load_timestamp: str) -> int:
+        """
+        Appends the rows of a new load that changed since their latest version.
+
+        Loading the same day twice replaces the versions appended earlier that day.
+
+        Args:
+            df (pd.DataFrame): The rows of the new load. Must contain the key and value columns.
+            load_timestamp (str): The ISO timestamp of the load.
+
+        Returns:
+            int: The number of rows appended.
+        """
+        self._validate_table()
+
+        load_timestamp = datetime.datetime.fromisoformat(load_timestamp)
+        competition_ids = df['competition_id'].unique().tolist()
+
+        deltas = compute_deltas(df, self.latest(competition_ids), self.key_columns, self.value_columns, self.scope_columns)
+        logging.info(f"{len(deltas)} of {len(df)} rows changed since the latest version of {self.schema}.{self.table}")
+        if deltas.empty:
+            return 0
+
+        deltas['load_date'] = load_timestamp.date()
+        deltas['load_timestamp'] = load_timestamp.isoformat()
+        ensure_partitions(self.db, self.schema, self.table, deltas)
+        return self.db.upsert_pandas_bulk(
+            deltas,
+            f'{self.schema}.{self.table}',
+            conflict_columns=['competition_id', 'load_date'] + [column for column in self.key_columns if column != 'competition_id']
+        )
+
+    def as_of(self, as_of: datetime.date, filters: Dict) -> pd.DataFrame:
+        """
+        Rebuilds the state of the table at the end of a date.
+
+        The latest version of each key up to the date is found through the `<table>_as_of_idx` index
+        (key columns + load_date desc); only the partitions of the filtered competition are scanned.
+
+        Args:
+            as_of (datetime.date): The date to rebuild.
+            filters (Dict): Equality filters on the leading key columns (e.g. {"competition_id": 2021, "season": 2024}).
+
+        Returns:
+            pd.DataFrame: The rows that existed at the date, with the date of their version as `load_date`.
+        """
+        keys = ', '.join(self.key_columns)
+        conditions = ' and '.join(f'{column} = %({column})s' for column in filters)
+        query = f"""
+            select * from (
+                select distinct on ({keys}) {keys}, {', '.join(self.value_columns)}, load_date, is_removed
+                  from {self.schema}.{self.table}
+                 where {conditions} and load_date <= %(as_of)s
+                 order by {keys}, load_date desc
+            ) history
+             where not is_removed
+        """
+        df = self.db.select_pandas(query, {**filters, 'as_of': as_of})
+        return df.drop(columns=['is_removed'])
+
+
+def standings_history(db: Database, schema: str) -> SnapshotHistory:
+    """History of the competitions standings, one version per team and season."""
+    return SnapshotHistory(
+        db, schema, 'competitions_standings_history',
+        key_columns=['competition_id', 'season', 'team_id'],
+        value_columns=['position', 'team_short_name', 'team_tla', 'team_crest', 'played_games', 'form',
+                       'won', 'draw', 'lost', 'points', 'goals_for', 'goals_against', 'goal_difference'],
+    )
+
+
+def squads_history(db: Database, schema: str) -> SnapshotHistory:
+    """History of the squads, one version per player and team. Players leaving a squad get a tombstone."""
+    return SnapshotHistory(
+        db, schema, 'team_players_history',
+        key_columns=['competition_id', 'team_id', 'player_id'],
+        value_columns=['name', 'position', 'date_of_birth', 'nationality'],
+        scope_columns=['competition_id', 'team_id'],
+    )
+
+
+def standings_as_of(db: Database, schema: str, competition_id: int, season: int, as_of: datetime.date) -> pd.DataFrame:
+    """
+    Returns the standings of a competition season as they were at the end of a date.
+
+    Args:
+        db (Database): The database holding the history.
+        schema (str): The schema of the history table.
+        competition_id (int): The competition.
+        season (int): The season (starting year).
+        as_of (datetime.date): The date.
+
+    Returns:
+        pd.DataFrame: The standings, ordered by position.
+    """
+    df = standings_history(db, schema).as_of(as_of, {'competition_id': int(competition_id), 'season': int(season)})
+    return df.sort_values('position', ignore_index=True)
+
+
+def squad_as_of(db: Database, schema: str, competition_id: int, team_id: int, as_of: datetime.date) -> pd.DataFrame:
+    """
+    Returns the squad of a team, as loaded for a competition, as it was at the end of a date.
+
+    Args:
+        db (Database): The database holding the history.
+        schema (str): The schema of the history table.
+        competition_id (int): The competition the squad was loaded for.
+        team_id (int): The team.
+        as_of (datetime.date): The date.
+
+    Returns:
+        pd.DataFrame: One row per player.
+    """
+    return squads_history(db, schema).as_of(as_of, {'competition_id': int(competition_id), 'team_id': int(team_id)})
@@ -3,21 +3,29 @@ This module provides classes for interacting with and processing team data
 from a football API, including fetching matches details and integrating them into a database.
 """
 from utils.football_api import FootballAPIBase
-from typing import Dict, Any
+from typing import Dict, Any, Iterator, List
 import pandas as pd
 import json
 import os
 import datetime
 import time
 
+from utils.parallel import ShardPool, pages
 from utils.processor import Processor
 from utils.database import Database
 from utils.queries import create_queries 
-from contracts.matches_contract import MatchesTodayResponse
+from utils.flatten import flatten_matches
+from utils.partitions import ensure_partitions
+from contracts.matches_contract import MatchesTodayResponse, Match
 
 
 pd.set_option('display.max_colwidth', None)
 
+# Channel notified with the ids of the matches written by the loaders
+MATCHES_CHANNEL = 'matches_updates'
+# Postgres rejects a notification payload of this many bytes or more
+NOTIFY_MAX_BYTES = 8000
+
 class MatchesAPI(FootballAPIBase):
     """
     Handles API interactions for fetching team-related data.
@@ -44,6 +52,164 @@ class MatchesAPI(FootballAPIBase):
         """
         return self._make_request(f"matches")
 
+    def get_matches(self, date_from: datetime.date, date_to: datetime.date, competition_ids: List[int] = None) -> Dict[str, Any]:
+        """
+        Retrieves the matches played or scheduled inside a date window.
+
+        Args:
+            date_from (datetime.date): The first day of the window (inclusive).
+            date_to (datetime.date): The last day of the window (inclusive).
+            competition_ids (List[int], optional): The competitions to filter by. Defaults to None (all competitions of your tier).
+
+        Returns:
+            Dict[str, Any]: A dictionary containing the match data for the window.
+        """
+        params = {"dateFrom": date_from.isoformat(), "dateTo": date_to.isoformat()}
+        if competition_ids:
+            params["competitions"] = ','.join(str(competition_id) for competition_id in competition_ids)
+        return self._make_request("matches", params=params)
+
+
+def write_match_referees(db: Database, schema: str, referees: pd.DataFrame, load_timestamp: str, table: str = 'match_referees') -> None:
+    """
+    Upserts the referees of the loaded matches into the referees child table.
+
+    The table is shared by every matches table, so its rows are upserted by (match_id, referee_id)
+    instead of truncated.
+
+    Args:
+        db (Database): The database to write to.
+        schema (str): The schema of the table.
+        referees (pd.DataFrame): The referees rows (see `flatten_matches`).
+        load_timestamp (str): The load timestamp of the matches.
+        table (str, optional): The referees table. Defaults to 'match_referees'.
+    """
+    if referees.empty:
+        return
+
+    query = getattr(create_queries, table.upper()).format(schema=schema, table=table)
+    db.validate_table_exists(schema, table, query)
+
+    referees = referees.drop_duplicates(subset=['match_id', 'referee_id']).assign(load_timestamp=load_timestamp)
+    db.upsert_pandas_bulk(referees, f'{schema}.{table}', conflict_columns=['match_id', 'referee_id'])
+
+
+def notify_match_changes(db: Database, table_name: str, ids: List[int] = (), deleted_ids: List[int] = (), reload: bool = False) -> None:
+    """
+    Notifies the dashboard listeners about the matches written to a table.
+
+    The payload is a JSON object with the table name, the ids of the inserted or updated matches,
+    the ids of the deleted matches and a `reload` flag (set when the whole table was replaced).
+    Large id lists are split into several notifications, each below `NOTIFY_MAX_BYTES` once encoded.
+
+    Args:
+        db (Database): The database the matches were written to.
+        table_name (str): The table (schema.table) that was written.
+        ids (List[int], optional): Ids of the matches inserted or updated. Defaults to ().
+        deleted_ids (List[int], optional): Ids of the matches deleted. Defaults to ().
+        reload (bool, optional): Whether the table was fully replaced. Defaults to False.
+    """
+    ids = [int(match_id) for match_id in ids]
+    deleted_ids = [int(match_id) for match_id in deleted_ids]
+
+    if reload:
+        db.notify(MATCHES_CHANNEL, json.dumps({"table": table_name, "ids": [], "deleted_ids": [], "reload": True}))
+        return
+
+    for payload in _notify_payloads(table_name, ids, deleted_ids):
+        db.notify(MATCHES_CHANNEL, json.dumps(payload))
+
+
+def _notify_payloads(table_name: str, ids: List[int], deleted_ids: List[int]) -> Iterator[Dict[str, Any]]:
+    """Fills the payloads with the ids, in order, starting a new one when the next id would reach `NOTIFY_MAX_BYTES`."""
+    def empty():
+        return {"table": table_name, "ids": [], "deleted_ids": [], "reload": False}
+
+    payload = empty()
+    base_size = size = len(json.dumps(payload).encode())
+    for key, values in (("ids", ids), ("deleted_ids", deleted_ids)):
+        for match_id in values:
+            # The id and, after the first one of the list, its ", " separator
+            added = len(str(match_id)) + (2 if payload[key] else 0)
+            if size + added >= NOTIFY_MAX_BYTES and (payload["ids"] or payload["deleted_ids"]):
+                yield payload
+                payload, size = empty(), base_size
+                added = len(str(match_id))
+            payload[key].append(match_id)
+            size += added
+    if payload["ids"] or payload["deleted_ids"]:
+        yield payload
+
+
+def filter_advanced_matches(matches: List[Match], loaded_versions: Dict[int, datetime.datetime]) -> List[Match]:
+    """
+    Keeps only the matches that were never loaded, or whose `lastUpdated` is newer than their loaded version.
+
+    Args:
+        matches (List[Match]): The matches returned by the API.
+        loaded_versions (Dict[int, datetime.datetime]): The `last_updated` already loaded, per match id.
+
+    Returns:
+        List[Match]: The matches that are new or changed since they were loaded.
+    """
+    return [
+        match for match in matches
+        if match.id not in loaded_versions or match.last_updated > loaded_versions[match.id]
+    ]
+
+
+def behind_watermarks(matches: List[Match], watermarks: Dict[int, datetime.datetime]) -> List[int]:
+    """
+    Returns the ids of the matches whose `lastUpdated` didn't move past the high-water mark of their
+    competition. Only these can already be loaded with their current version; the others are new or changed.
+
+    Args:
+        matches (List[Match]): The matches returned by the API.
+        watermarks (Dict[int, datetime.datetime]): The greatest `lastUpdated` already seen, per competition id.
+
+    Returns:
+        List[int]: The match ids whose loaded version must be checked.
+    """
+    return [
+        match.id for match in matches
+        if match.competition.id in watermarks and match.last_updated <= watermarks[match.competition.id]
+    ]
+
+
+def compute_watermarks(matches: List[Match]) -> Dict[int, datetime.datetime]:
+    """
+    Computes the new high-water mark (greatest `lastUpdated`) of each competition.
+
+    Args:
+        matches (List[Match]): The matches returned by the API.
+
+    Returns:
+        Dict[int, datetime.datetime]: The greatest `lastUpdated` per competition id.
+    """
+    watermarks = {}
+    for match in matches:
+        competition_id = match.competition.id
+        if competition_id not in watermarks or match.last_updated > watermarks[competition_id]:
+            watermarks[competition_id] = match.last_updated
+    return watermarks
+
+def transform_matches_today(response: Dict[str, Any]) -> Dict[str, pd.DataFrame]:
+    """
+    Validates today's matches (or a page of them) and flattens them (a shard of the processing pool,
+    see `utils.parallel`).
+
+    Args:
+        response (Dict[str, Any]): The response of `MatchesAPI.get_matches_today`, or a page of it.
+
+    Returns:
+        Dict[str, pd.DataFrame]: The rows of the matches (with their `date_from`) and of the referees.
+    """
+    match_data = MatchesTodayResponse(**response)
+    flat_matches = flatten_matches(match_data.matches)
+    flat_matches['matches']['date_from'] = match_data.filters.date_from
+    return flat_matches
+
+
 class MatchesProcessor(Processor):
     """
     Processes and integrates team data from the API into the database.
@@ -92,7 +258,7 @@ class MatchesProcessor(Processor):
         The method performs the following steps:
         - Fetches match data using the API.
         - Converts the data into a pandas DataFrame.
-        - Transforms relevant columns into JSON format.
+        - Flattens the nested fields into typed columns (referees go to their own table).
         - Adds a load timestamp column.
         - Loads the final DataFrame into the database.
 
@@ -102,28 +268,17 @@ class MatchesProcessor(Processor):
         """
         self.logger.info(f"Start Processing - {self.table}")
 
-        matches_data = []
-        
         self.logger.info(f'Retrieving data for matches today.')
-        match_data = MatchesTodayResponse(**self.api_connection.get_matches_today())
-        # Convertendo para dicionário e depois criando o DataFrame
-        matches_dict = [comp.model_dump() for comp in match_data.matches]
-        df = pd.DataFrame(matches_dict)
-        df['date_from'] = match_data.filters.date_from
-
-        matches_data.append(df)
-
-        final_matches_df = pd.concat(matches_data)
-        
-        # Converte as colunas 'area' e 'current_season' para JSON (se não forem nulas)
-        final_matches_df['area'] = final_matches_df['area'].apply(lambda x: json.dumps(x) if isinstance(x, dict) else None)
-        final_matches_df['competition'] = final_matches_df['competition'].apply(lambda x: json.dumps(x) if isinstance(x, dict) else None)
-        final_matches_df['season'] = final_matches_df['season'].apply(lambda x: json.dumps(x, default=str) if isinstance(x, dict) else None)
-        final_matches_df['home_team'] = final_matches_df['home_team'].apply(lambda x: json.dumps(x) if isinstance(x, dict) else None)
-        final_matches_df['away_team'] = final_matches_df['away_team'].apply(lambda x: json.dumps(x) if isinstance(x, dict) else None)
-        final_matches_df['score'] = final_matches_df['score'].apply(lambda x: json.dumps(x) if isinstance(x, dict) else None)
-        final_matches_df['odds'] = final_matches_df['odds'].apply(lambda x: json.dumps(x) if isinstance(x, dict) else None)
-        final_matches_df['referees'] = final_matches_df['referees'].apply(lambda x: json.dumps([element for element in x if isinstance(element, dict)], default=str) if isinstance(x, list) else None)
+        response = self._fetch(self.api_connection.get_matches_today)
+        # One shard per page of matches: validated and flattened into typed columns and the referees child table in the pool
+        with self.stage('transform') as stage, ShardPool(self.workers) as pool:
+            flat_pages = [shard.result() for shard in pool.map(transform_matches_today, ((page,) for page in pages(response)))]
+            flat_matches = {
+                table: pd.concat([flat[table] for flat in flat_pages], ignore_index=True)
+                for table in ('matches', 'match_referees')
+            }
+            final_matches_df = flat_matches['matches']
+            stage.rows = len(final_matches_df)
         
         load_timesamp = datetime.datetime.now(datetime.timezone.utc).isoformat() 
         
@@ -138,31 +293,254 @@ class MatchesProcessor(Processor):
         # df_with_metadata.to_csv('matches_today', index=False)
         self.logger.info(f"Writing to Database - {self.table}:")
         self._write_to_db(df_with_metadata)
+        if self.write_postgres:
+            write_match_referees(self.db, self.schema, flat_matches['match_referees'], load_timesamp)
+        self._land(flat_matches['match_referees'].assign(load_timestamp=load_timesamp), 'match_referees')
 
-    def _write_to_db(self, df: pd.DataFrame) -> None:
+    def _write_to_db(self, df: pd.DataFrame, table: str = None) -> None:
         """
-        Writes the processed DataFrame to the database.
-
-        This method executes the necessary SQL queries to insert the data into the specified 
-        database table after validating that the table exists and truncating the existing data.
+        Writes the processed DataFrame to the database and notifies the dashboard that the table was replaced.
 
         Args:
             df (pd.DataFrame): The DataFrame to write to the database.
+            table (str, optional): The table to write to. Defaults to the table of the processor.
 
         Raises:
             Exception: If there is an issue with the database connection or query execution.
         """
+        super()._write_to_db(df, table)
+        if self.write_postgres:
+            notify_match_changes(self.db, f'{self.schema}.{table or self.table}', reload=True)
+
+
+class MatchesSyncProcessor(Processor):
+    """
+    Keeps the historical matches table current by syncing only what changed in a recent date window.
+
+    A high-water mark (the greatest `lastUpdated` already seen) is stored per competition. Each run
+    requests the matches between `lookback_days` ago and `lookahead_days` ahead in a single API call
+    and upserts only the new or changed matches: a match whose `lastUpdated` went past the high-water
+    mark of its competition, or that isn't loaded with the same `last_updated` yet (e.g. a fixture
+    entering the window with an old `lastUpdated`).
+
+    Attributes:
+        api_connection (MatchesAPI): The API connection used for fetching data.
+        schema (str): Database schema to use.
+        table (str): Database table to upsert the matches into.
+        watermark_table (str): Database table holding the high-water mark of each competition.
+        lookback_days (int): How many days before today the window starts.
+        lookahead_days (int): How many days after today the window ends.
+
+    Methods:
+        - process: Fetches the window, filters the advanced matches and upserts them into the database.
+    """
+    # The API does not accept windows larger than 10 days on the matches endpoint
+    MAX_WINDOW_DAYS = 10
+
+    def __init__(self, api_connection: MatchesAPI, schema = 'RAW', table = None,
+                 watermark_table = 'matches_sync_watermarks', lookback_days: int = 3, lookahead_days: int = 1):
+        """
+        Initializes the MatchesSyncProcessor.
+
+        Args:
+            api_connection (MatchesAPI): The API connection used for fetching data.
+            schema (str, optional): The schema to use in the database. Defaults to 'RAW'.
+            table (str, optional): The table to upsert data into. Defaults to None.
+            watermark_table (str, optional): The table holding the high-water marks. Defaults to 'matches_sync_watermarks'.
+            lookback_days (int, optional): Days before today included in the window. Defaults to 3.
+            lookahead_days (int, optional): Days after today included in the window. Defaults to 1.
 
-        query = getattr(create_queries, self.table.upper()).format(
-            schema=self.schema,
-            table=self.table
+        Raises:
+            ValueError: If the window is larger than the API allows.
+        """
+        super().__init__(api_connection, self.__class__.__name__)
+
+        if lookback_days + lookahead_days + 1 > self.MAX_WINDOW_DAYS:
+            raise ValueError(f"The sync window can't be larger than {self.MAX_WINDOW_DAYS} days.")
+
+        if schema:
+            self.schema = schema
+        if table:
+            self.table = table
+
+        self.watermark_table = watermark_table
+        self.lookback_days = lookback_days
+        self.lookahead_days = lookahead_days
+
+        self.db = Database(
+            db_name=os.getenv('PG_DB'),
+            user=os.getenv('PG_USER'),
+            password=os.getenv('PG_PASS'),
+            host=os.getenv('PG_HOST'),
+            port=5432
         )
-        # Verificar e criar a tabela se necessário
-        self.db.validate_table_exists(self.schema, self.table, query)
+
+    def process(self) -> None:
+        """
+        Syncs the matches of the recent window into the database.
+
+        The method performs the following steps:
+        - Reads the competitions and their high-water marks.
+        - Fetches the matches of the window with a single API request.
+        - Keeps only the matches that are new or whose `lastUpdated` went forward (the ones behind the
+          high-water mark are checked against their loaded version).
+        - Upserts them (an existing row is only replaced by a newer version) and lands them in the other sinks (see `utils.sinks`).
+        - Moves the high-water marks forward.
+
+        Without the postgres sink (see `utils.sinks`), the database is only read for the competitions: no
+        table is created or written and the high-water marks aren't used, so every match of the window is landed.
+
+        Example:
+            sync_processor = MatchesSyncProcessor(api_connection=matches_api, schema='raw', table='matches')
+            sync_processor.process()
+        """
+        self.logger.info(f"Start Processing - {self.table}")
+
+        if self.write_postgres:
+            self._validate_tables()
+
+        competition_ids_result = self.db.select(table=f'{self.schema}.competitions', columns='distinct id')
+        competition_ids = [row[0] for row in competition_ids_result]
+        watermarks = self._read_watermarks() if self.write_postgres else {}
+
+        today = datetime.datetime.now(datetime.timezone.utc).date()
+        date_from = today - datetime.timedelta(days=self.lookback_days)
+        date_to = today + datetime.timedelta(days=self.lookahead_days)
+
+        self.logger.info(f'Retrieving matches from {date_from} to {date_to} for competitions: {competition_ids}')
+        response = self._fetch(self.api_connection.get_matches, date_from, date_to, competition_ids)
+        if not response.get('matches'):
+            self.logger.info("No matches found in the window, nothing to sync.")
+            return
+
+        match_data = self._validate(MatchesTodayResponse, response)
+        loaded_versions = self._read_loaded_versions(behind_watermarks(match_data.matches, watermarks))
+        advanced_matches = filter_advanced_matches(match_data.matches, loaded_versions)
+        self.logger.info(f"{len(advanced_matches)} of {len(match_data.matches)} matches changed since the last sync.")
+
+        if advanced_matches:
+            with self.stage('transform') as stage:
+                flat_matches = flatten_matches(advanced_matches)
+                load_timestamp = datetime.datetime.now(datetime.timezone.utc).isoformat()
+                df = flat_matches['matches']
+                df['load_timestamp'] = load_timestamp
+                stage.rows = len(df)
+
+            self.logger.info(f"Writing to Database - {self.table}:")
+            self._upsert_matches(df, flat_matches['match_referees'], load_timestamp)
+
+        if self.write_postgres:
+            self._write_watermarks(compute_watermarks(match_data.matches))
+
+    def _upsert_matches(self, df: pd.DataFrame, referees: pd.DataFrame, load_timestamp: str) -> None:
+        """
+        Upserts flattened matches (an existing row is only replaced by a newer version) with their referees,
+        notifies the dashboard and lands them in the other sinks (see `utils.sinks`). Without the postgres
+        sink, they are only landed.
+
+        Args:
+            df (pd.DataFrame): The matches (see `flatten_matches`), with their `load_timestamp`.
+            referees (pd.DataFrame): The referees of the matches.
+            load_timestamp (str): The load timestamp of the matches.
+        """
+        if self.write_postgres:
+            with self.stage('serialize') as stage:
+                records = self.db._to_records(df)
+                stage.rows = len(records)
+
+            with self.stage('load') as stage:
+                ensure_partitions(self.db, self.schema, self.table, df)
+                self._delete_rescheduled(df)
+                stage.rows = self.db.upsert_pandas_bulk(
+                    df,
+                    f'{self.schema}.{self.table}',
+                    conflict_columns=['id', 'utc_date'],
+                    update_condition='target.last_updated < EXCLUDED.last_updated',
+                    records=records
+                )
+                notify_match_changes(self.db, f'{self.schema}.{self.table}', ids=df['id'].tolist())
+                write_match_referees(self.db, self.schema, referees, load_timestamp)
+            self._record_profile(df)
+        self._land(df)
+        self._land(referees.assign(load_timestamp=load_timestamp), 'match_referees')
+
+    def _validate_tables(self) -> None:
+        """
+        Creates the matches and watermark tables (and their indexes) if they don't exist yet.
+        """
+        for table in (self.table, self.watermark_table):
+            self._validate_table(table)
+
+    def _delete_rescheduled(self, df: pd.DataFrame) -> None:
+        """
+        Deletes the previous version of the matches whose date changed.
+
+        The table is partitioned by `utc_date`, which is part of the primary key, so a rescheduled
+        match would otherwise be inserted again instead of replacing its previous version.
+
+        Args:
+            df (pd.DataFrame): The matches about to be upserted.
+        """
         self.db.execute_query(
-            create_queries.TRUNCATE_TABLE.format(
-                schema=self.schema,
-                table=self.table
+            f"""
+            DELETE FROM {self.schema}.{self.table} AS target
+             USING unnest(%s::bigint[], %s::timestamptz[], %s::timestamptz[]) AS incoming(id, utc_date, last_updated)
+             WHERE target.id = incoming.id AND target.utc_date <> incoming.utc_date
+               AND target.last_updated < incoming.last_updated
+            """,
+            (
+                df['id'].astype(int).tolist(),
+                [str(utc_date) for utc_date in df['utc_date']],
+                [str(last_updated) for last_updated in df['last_updated']],
             )
         )
-        self.db.insert_pandas_bulk(df,f'{self.schema}.{self.table}')
+
+    def _read_watermarks(self) -> Dict[int, datetime.datetime]:
+        """
+        Reads the high-water mark of each competition.
+
+        Returns:
+            Dict[int, datetime.datetime]: The greatest `lastUpdated` already loaded, per competition id.
+        """
+        rows = self.db.select(table=f'{self.schema}.{self.watermark_table}', columns='competition_id, last_updated')
+        return {competition_id: last_updated for competition_id, last_updated in rows}
+
+    def _read_loaded_versions(self, match_ids: List[int]) -> Dict[int, datetime.datetime]:
+        """
+        Reads the `last_updated` of the loaded version of some matches.
+
+        Args:
+            match_ids (List[int]): The match ids.
+
+        Returns:
+            Dict[int, datetime.datetime]: The `last_updated` of the loaded matches, per match id.
+        """
+        if not match_ids:
+            return {}
+        rows = self.db.execute_query(
+            f"SELECT id, max(last_updated) FROM {self.schema}.{self.table} WHERE id = ANY(%s::bigint[]) GROUP BY id",
+            ([int(match_id) for match_id in match_ids],)
+        )
+        return {match_id: last_updated for match_id, last_updated in rows}
+
+    def _write_watermarks(self, watermarks: Dict[int, datetime.datetime]) -> None:
+        """
+        Moves the high-water marks forward. A watermark never goes backwards.
+
+        Args:
+            watermarks (Dict[int, datetime.datetime]): The greatest `lastUpdated` seen in this run, per competition id.
+        """
+        if not watermarks:
+            return
+
+        synced_at = datetime.datetime.now(datetime.timezone.utc).isoformat()
+        df = pd.DataFrame(
+            [(competition_id, last_updated, synced_at) for competition_id, last_updated in watermarks.items()],
+            columns=['competition_id', 'last_updated', 'synced_at']
+        )
+        self.db.upsert_pandas_bulk(
+            df,
+            f'{self.schema}.{self.watermark_table}',
+            conflict_columns=['competition_id'],
+            update_condition='target.last_updated < EXCLUDED.last_updated'
+        )
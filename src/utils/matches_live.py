@@ -0,0 +1,251 @@
+"""
+This module provides a long-running poller that keeps today's matches current while games are being played.
+
+It refreshes the matches of the day on an adaptive interval (fast while games are live, slow otherwise),
+diffs each poll against the last snapshot kept in memory and writes only the matches that changed.
+"""
+from typing import Dict, List, Set, Tuple
+import datetime
+import os
+import time
+import pandas as pd
+
+from utils.processor import Processor
+from utils.database import Database
+from utils.queries import create_queries
+from utils.matches_api import MatchesAPI, notify_match_changes, write_match_referees
+from utils.flatten import flatten_matches
+from contracts.matches_contract import MatchesTodayResponse, Match
+
+
+LIVE_STATUSES = {'IN_PLAY', 'PAUSED'}
+UPCOMING_STATUSES = {'SCHEDULED', 'TIMED'}
+
+
+def match_state(match: Match) -> Tuple:
+    """
+    Extracts the part of a match that changes while it is being played.
+
+    Args:
+        match (Match): The match to extract the state from.
+
+    Returns:
+        Tuple: Status, winner and full/half time scores of the match.
+    """
+    score = match.score
+    return (
+        match.status,
+        score.winner,
+        score.full_time.home,
+        score.full_time.away,
+        score.half_time.home,
+        score.half_time.away,
+    )
+
+
+def diff_matches(snapshot: Dict[int, Tuple], matches: List[Match]) -> Tuple[List[Match], List[Match], Set[int]]:
+    """
+    Compares a poll against the last snapshot.
+
+    Args:
+        snapshot (Dict[int, Tuple]): The state of each match in the previous poll, by match id.
+        matches (List[Match]): The matches returned by the current poll.
+
+    Returns:
+        Tuple[List[Match], List[Match], Set[int]]: The matches that are new, the matches whose state changed
+        and the ids of the matches that are not returned anymore.
+    """
+    new_matches = [match for match in matches if match.id not in snapshot]
+    changed_matches = [match for match in matches if match.id in snapshot and snapshot[match.id] != match_state(match)]
+    removed_ids = set(snapshot) - {match.id for match in matches}
+    return new_matches, changed_matches, removed_ids
+
+
+def next_poll_interval(matches: List[Match], now: datetime.datetime, live_interval: float, idle_interval: float) -> float:
+    """
+    Chooses how long to wait before the next poll.
+
+    Polls every `live_interval` seconds while any match is live. Otherwise waits `idle_interval` seconds,
+    or less if the next kick-off happens before that.
+
+    Args:
+        matches (List[Match]): The matches returned by the current poll.
+        now (datetime.datetime): The current (timezone aware) time.
+        live_interval (float): Seconds between polls while games are live.
+        idle_interval (float): Seconds between polls when no game is live.
+
+    Returns:
+        float: The number of seconds to wait.
+    """
+    if any(match.status in LIVE_STATUSES for match in matches):
+        return live_interval
+
+    upcoming_kickoffs = [
+        (match.utc_date - now).total_seconds()
+        for match in matches
+        if match.status in UPCOMING_STATUSES and match.utc_date > now
+    ]
+    if upcoming_kickoffs:
+        return max(live_interval, min(idle_interval, min(upcoming_kickoffs)))
+    return idle_interval
+
+
+class MatchesLivePoller(Processor):
+    """
+    Polls today's matches and writes only what changed since the previous poll.
+
+    Attributes:
+        api_connection (MatchesAPI): The API connection used for fetching data.
+        schema (str): Database schema to use.
+        table (str): Database table holding today's matches.
+        live_interval (float): Seconds between polls while games are live.
+        idle_interval (float): Seconds between polls when no game is live.
+        max_polls (int): Stops after this number of polls. None runs forever.
+
+    Methods:
+        - process: Runs the polling loop.
+        - poll: Runs a single poll and returns how long to wait for the next one.
+    """
+    # Rate limit of the API: 10 requests per minute
+    MIN_INTERVAL = 6
+    # Columns rewritten when the state of a match changes
+    STATE_COLUMNS = ['id', 'status', 'score_winner', 'full_time_home', 'full_time_away',
+                     'half_time_home', 'half_time_away', 'last_updated']
+
+    def __init__(self, api_connection: MatchesAPI, schema = 'RAW', table = None,
+                 live_interval: float = 20, idle_interval: float = 300, max_polls: int = None):
+        """
+        Initializes the MatchesLivePoller.
+
+        Args:
+            api_connection (MatchesAPI): The API connection used for fetching data.
+            schema (str, optional): The schema to use in the database. Defaults to 'RAW'.
+            table (str, optional): The table to write the matches into. Defaults to None.
+            live_interval (float, optional): Seconds between polls while games are live. Defaults to 20.
+            idle_interval (float, optional): Seconds between polls when no game is live. Defaults to 300.
+            max_polls (int, optional): Stops after this number of polls. Defaults to None (runs forever).
+
+        Raises:
+            ValueError: If the intervals would exceed the API rate limit or are inverted.
+        """
+        super().__init__(api_connection, self.__class__.__name__)
+
+        if live_interval < self.MIN_INTERVAL:
+            raise ValueError(f"The live interval can't be lower than {self.MIN_INTERVAL} seconds (API rate limit).")
+        if idle_interval < live_interval:
+            raise ValueError("The idle interval can't be lower than the live interval.")
+
+        if schema:
+            self.schema = schema
+        if table:
+            self.table = table
+
+        self.live_interval = live_interval
+        self.idle_interval = idle_interval
+        self.max_polls = max_polls
+        self.snapshot: Dict[int, Tuple] = {}
+
+        self.db = Database(
+            db_name=os.getenv('PG_DB'),
+            user=os.getenv('PG_USER'),
+            password=os.getenv('PG_PASS'),
+            host=os.getenv('PG_HOST'),
+            port=5432
+        )
+
+    def process(self) -> None:
+        """
+        Runs the polling loop until `max_polls` is reached (or forever).
+        """
+        self.logger.info(f"Start Polling - {self.table}")
+
+        if self.write_postgres:
+            query = getattr(create_queries, self.table.upper()).format(
+                schema=self.schema,
+                table=self.table
+            )
+            self.db.validate_table_exists(self.schema, self.table, query)
+
+        polls = 0
+        while self.max_polls is None or polls < self.max_polls:
+            try:
+                interval = self.poll()
+            except Exception as e:
+                self.logger.error(f"Poll failed, retrying in {self.idle_interval} seconds. \nReason: {e}")
+                interval = self.idle_interval
+            polls += 1
+            if self.max_polls is None or polls < self.max_polls:
+                self.logger.info(f"Next poll in {interval:.0f} seconds.")
+                time.sleep(interval)
+
+    def poll(self) -> float:
+        """
+        Fetches today's matches, writes the differences against the snapshot and updates it.
+
+        Returns:
+            float: The number of seconds to wait before the next poll.
+        """
+        match_data = self._validate(MatchesTodayResponse, self._fetch(self.api_connection.get_matches_today))
+        with self.stage('transform') as stage:
+            new_matches, changed_matches, removed_ids = diff_matches(self.snapshot, match_data.matches)
+            stage.rows = len(new_matches) + len(changed_matches) + len(removed_ids)
+
+        self.logger.info(f"Poll: {len(new_matches)} new, {len(changed_matches)} changed, {len(removed_ids)} removed matches.")
+        with self.stage('load') as stage:
+            self._write_changes(new_matches, changed_matches, removed_ids, match_data.filters.date_from)
+            stage.rows = len(new_matches) + len(changed_matches) + len(removed_ids)
+
+        self.snapshot = {match.id: match_state(match) for match in match_data.matches}
+
+        return next_poll_interval(
+            match_data.matches,
+            datetime.datetime.now(datetime.timezone.utc),
+            self.live_interval,
+            self.idle_interval
+        )
+
+    def _write_changes(self, new_matches: List[Match], changed_matches: List[Match], removed_ids: Set[int], date_from: datetime.date) -> None:
+        """
+        Writes the differences of a poll to the database, and lands the written matches in the other sinks.
+
+        New matches are upserted as full rows, changed matches only get their status and score updated
+        and matches that left the day (e.g. after midnight) are deleted. The dashboard is then notified
+        with the ids of the written matches. Without the postgres sink, the database is skipped (see
+        `utils.sinks`): the full rows of the new and changed matches are only landed, the removals aren't.
+
+        Args:
+            new_matches (List[Match]): Matches that were not in the snapshot.
+            changed_matches (List[Match]): Matches whose status or score changed.
+            removed_ids (Set[int]): Ids of the matches that are not returned anymore.
+            date_from (datetime.date): The day the matches belong to.
+        """
+        table_name = f'{self.schema}.{self.table}'
+        load_timestamp = datetime.datetime.now(datetime.timezone.utc).isoformat()
+
+        new = flatten_matches(new_matches)
+        new['matches']['date_from'] = date_from
+        new['matches']['load_timestamp'] = load_timestamp
+        changed = flatten_matches(changed_matches)['matches'].assign(date_from=date_from, load_timestamp=load_timestamp)
+
+        if self.write_postgres:
+            if new_matches:
+                self.db.upsert_pandas_bulk(new['matches'], table_name, conflict_columns=['id'])
+                write_match_referees(self.db, self.schema, new['match_referees'], load_timestamp)
+
+            if changed_matches:
+                self.db.update_pandas_bulk(changed[self.STATE_COLUMNS + ['load_timestamp']], table_name, key_columns=['id'])
+
+            if removed_ids:
+                self.db.delete(table_name, f"id in ({', '.join(str(match_id) for match_id in removed_ids)})")
+
+            if new_matches or changed_matches or removed_ids:
+                notify_match_changes(
+                    self.db,
+                    table_name,
+                    ids=[match.id for match in new_matches + changed_matches],
+                    deleted_ids=sorted(removed_ids)
+                )
+
+        if new_matches or changed_matches:
+            self._land(pd.concat([df for df in (new['matches'], changed) if not df.empty], ignore_index=True))
+            self._land(new['match_referees'].assign(load_timestamp=load_timestamp), 'match_referees')
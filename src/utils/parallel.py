@@ -0,0 +1,206 @@
+"""
+This module validates and transforms the API responses in a pool of processes, so the CPU-bound part
+of a large load (pydantic and the flattening) isn't limited to one core.
+
+The work is split in shards, one response (e.g. the teams of a competition, a replayed response) or one
+page of a large response (see `pages`) per task. A transform is a module-level function taking the
+shard and returning its tables (name -> DataFrame). In the workers, the tables are encoded as Arrow IPC
+streams, one buffer per table, so only a few large buffers cross the process boundary instead of
+pickling every Python object of the DataFrames; a table Arrow can't represent is pickled as it is.
+
+The number of workers is set by the `PROCESSOR_WORKERS` environment variable. It defaults to 1: the
+shards are then transformed in the process, in order and without any encoding, as the daily loads are
+a few responses. The replay (see `utils.replay`) defaults to one worker per CPU.
+
+pyarrow is only imported when a pool is used.
+"""
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+import collections
+import functools
+import multiprocessing
+import os
+import pickle
+import pandas as pd
+
+# Matches validated and flattened per task when a response is split in pages
+PAGE_SIZE = 2_000
+# Imported by the fork server before the workers are forked from it
+PRELOAD = ['pandas', 'pyarrow', 'pydantic']
+
+
+def workers_from_env(value: str = None) -> int:
+    """
+    The workers of the processing pool (see the module docstring).
+
+    Args:
+        value (str, optional): The number of workers, or `auto` for one per CPU. Defaults to the
+            `PROCESSOR_WORKERS` variable.
+
+    Returns:
+        int: The number of workers (1 transforms in the process).
+    """
+    if value is None:
+        value = os.getenv('PROCESSOR_WORKERS', '1')
+    if value.strip().lower() == 'auto':
+        return os.cpu_count() or 1
+    return max(1, int(value))
+
+
+def pages(response: Dict[str, Any], key: str = 'matches', size: int = PAGE_SIZE) -> List[Dict[str, Any]]:
+    """
+    Splits a response in pages of its `key` list, each one a valid response of the same contract.
+
+    Args:
+        response (Dict[str, Any]): The response (e.g. of the matches endpoint).
+        key (str, optional): The list to split. Defaults to 'matches'.
+        size (int, optional): Items per page. Defaults to `PAGE_SIZE`.
+
+    Returns:
+        List[Dict[str, Any]]: The pages (the response itself when it fits in one).
+    """
+    items = response.get(key) or []
+    if len(items) <= size:
+        return [response]
+    return [{**response, key: items[start:start + size]} for start in range(0, len(items), size)]
+
+
+def encode_tables(tables: Dict[str, pd.DataFrame]) -> Dict[str, Tuple[str, bytes]]:
+    """
+    Encodes tables to cross a process boundary: Arrow IPC streams, or pickles when Arrow can't
+    represent a column (e.g. mixed Python objects).
+
+    Args:
+        tables (Dict[str, pd.DataFrame]): The tables.
+
+    Returns:
+        Dict[str, Tuple[str, bytes]]: The format (`arrow` or `pickle`) and buffer of each table.
+    """
+    import pyarrow as pa
+
+    encoded = {}
+    for name, df in tables.items():
+        try:
+            table = pa.Table.from_pandas(df)
+        except (pa.ArrowException, TypeError, ValueError):
+            encoded[name] = ('pickle', pickle.dumps(df, protocol=pickle.HIGHEST_PROTOCOL))
+            continue
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        encoded[name] = ('arrow', sink.getvalue().to_pybytes())
+    return encoded
+
+
+def decode_tables(encoded: Dict[str, Tuple[str, bytes]]) -> Dict[str, pd.DataFrame]:
+    """
+    Decodes the tables of `encode_tables`.
+
+    Args:
+        encoded (Dict[str, Tuple[str, bytes]]): The format and buffer of each table.
+
+    Returns:
+        Dict[str, pd.DataFrame]: The tables.
+    """
+    import pyarrow as pa
+
+    tables = {}
+    for name, (kind, buffer) in encoded.items():
+        if kind == 'pickle':
+            tables[name] = pickle.loads(buffer)
+        else:
+            tables[name] = pa.ipc.open_stream(buffer).read_all().to_pandas()
+    return tables
+
+
+def _encoded(transform: Callable[..., Dict[str, pd.DataFrame]], *args) -> Dict[str, Tuple[str, bytes]]:
+    """Runs a transform in a worker and encodes its tables."""
+    return encode_tables(transform(*args))
+
+
+class Shard:
+    """A shard of a `ShardPool`; `result` waits for its tables."""
+    def __init__(self, future: Future = None, call: Callable[[], Dict[str, pd.DataFrame]] = None):
+        self._future = future
+        self._call = call
+
+    def result(self) -> Dict[str, pd.DataFrame]:
+        """
+        The tables of the shard.
+
+        Raises:
+            Exception: What the transform raised (e.g. a `ValidationError`).
+        """
+        if self._future is None:
+            return self._call()
+        return decode_tables(self._future.result())
+
+
+class ShardPool:
+    """
+    Transforms shards in a pool of processes, or in the process with a single worker (see the module
+    docstring). Used as a context manager: the workers are started on enter and stopped on exit.
+
+    Example:
+        with ShardPool(self.workers) as pool:
+            shards = [pool.submit(transform_teams, response, competition_id) for ...]
+            teams_data = [shard.result() for shard in shards]
+    """
+    def __init__(self, workers: int = None):
+        self.workers = workers if workers is not None else workers_from_env()
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def __enter__(self) -> 'ShardPool':
+        if self.workers > 1:
+            # Not forked: the process already runs threads (pyarrow, telemetry) a fork could copy mid-lock.
+            # The fork server imports the heavy libraries once, the workers are forked from it with them.
+            context = multiprocessing.get_context('forkserver')
+            context.set_forkserver_preload(PRELOAD)
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=exc_info[0] is not None)
+            self._executor = None
+
+    def submit(self, transform: Callable[..., Dict[str, pd.DataFrame]], *args) -> Shard:
+        """
+        Submits a shard to the workers. In the process, it is only transformed by its `result` (as in
+        `map`), so the caller times and handles the transform where it collects the results.
+
+        Args:
+            transform (Callable): A module-level function returning the tables of the shard.
+            *args: The shard (picklable, e.g. the response and its competition).
+
+        Returns:
+            Shard: The shard.
+        """
+        if self._executor is not None:
+            return Shard(self._executor.submit(_encoded, transform, *args))
+        return Shard(call=functools.partial(transform, *args))
+
+    def map(self, transform: Callable[..., Dict[str, pd.DataFrame]], shards: Iterable[tuple]) -> Iterator[Shard]:
+        """
+        Transforms shards, yielding them in order. At most 4 shards per worker are pending at a time, so
+        a slow consumer (e.g. the database) doesn't pile up the results in memory. A shard that failed
+        only raises from its `result`, the next ones are still yielded.
+
+        Args:
+            transform (Callable): A module-level function returning the tables of a shard.
+            shards (Iterable[tuple]): The arguments of each shard.
+
+        Yields:
+            Shard: The shards, in the order of `shards`.
+        """
+        if self._executor is None:
+            for args in shards:
+                yield Shard(call=functools.partial(transform, *args))
+            return
+        pending = collections.deque()
+        for args in shards:
+            pending.append(self.submit(transform, *args))
+            if len(pending) >= self.workers * 4:
+                yield pending.popleft()
+        while pending:
+            yield pending.popleft()
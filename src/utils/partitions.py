@@ -0,0 +1,269 @@
+"""
+This module manages the partitions of the partitioned tables of the DDL registry (`create_queries`).
+
+Each partitioned table has a `<TABLE>_PARTITION` template in `create_queries` and a partitioning scheme
+registered in `PARTITIONED_TABLES`, which tells which partitions a load needs and when a partition
+holds only data older than a retention cutoff. Partitions are created at load time and expired
+partitions are detached (kept as standalone tables renamed `<partition>_detached_<YYYYMMDD>`, so they
+can be archived or dropped cheaply, and a later load of their range gets a new partition).
+"""
+from typing import Dict, List
+import datetime
+import logging
+import pandas as pd
+
+from utils.database import Database
+from utils.queries import create_queries
+
+
+class MonthlyRangePartitions:
+    """
+    One partition per month of a timestamp column, named `<table>_<YYYY>_<MM>`.
+
+    Attributes:
+        column (str): The partition key column.
+    """
+    def __init__(self, column: str):
+        self.column = column
+
+    def partitions(self, df: pd.DataFrame) -> Dict[str, Dict]:
+        """
+        Returns the partitions needed by the rows of a load.
+
+        Args:
+            df (pd.DataFrame): The rows to be loaded.
+
+        Returns:
+            Dict[str, Dict]: The template parameters of each partition, by partition suffix.
+        """
+        months = pd.to_datetime(df[self.column], utc=True).dt.strftime('%Y-%m').unique()
+        partitions = {}
+        for month in sorted(months):
+            start = datetime.date.fromisoformat(f'{month}-01')
+            end = (start + datetime.timedelta(days=32)).replace(day=1)
+            # The months are in UTC: the bounds carry the offset, or Postgres would read them in the session TimeZone
+            partitions[start.strftime('%Y_%m')] = {'start': f'{start.isoformat()} 00:00:00+00', 'end': f'{end.isoformat()} 00:00:00+00'}
+        return partitions
+
+    def end(self, suffix: str) -> datetime.date:
+        """Returns the (exclusive) upper bound of a partition."""
+        start = datetime.datetime.strptime(suffix, '%Y_%m').date()
+        return (start + datetime.timedelta(days=32)).replace(day=1)
+
+
+class SeasonListPartitions:
+    """
+    One partition per season (starting year), named `<table>_<season>`.
+
+    A season is only considered over at the end of the year after it started, as seasons
+    usually span two years.
+
+    Attributes:
+        column (str): The partition key column.
+    """
+    def __init__(self, column: str):
+        self.column = column
+
+    def partitions(self, df: pd.DataFrame) -> Dict[str, Dict]:
+        return {str(int(season)): {'season': int(season)} for season in sorted(df[self.column].unique())}
+
+    def end(self, suffix: str) -> datetime.date:
+        return datetime.date(int(suffix) + 2, 1, 1)
+
+
+class CompetitionYearPartitions:
+    """
+    One partition per competition and year of a date column, named `<table>_<competition_id>_<year>`.
+
+    Attributes:
+        column (str): The date column, second part of the (competition_id, date) range key.
+    """
+    def __init__(self, column: str):
+        self.column = column
+
+    def partitions(self, df: pd.DataFrame) -> Dict[str, Dict]:
+        keys = zip(df['competition_id'], pd.to_datetime(df[self.column]).dt.year)
+        return {
+            f'{int(competition_id)}_{int(year)}': {'competition_id': int(competition_id), 'year': int(year), 'next_year': int(year) + 1}
+            for competition_id, year in sorted(set(keys))
+        }
+
+    def end(self, suffix: str) -> datetime.date:
+        return datetime.date(int(suffix.rsplit('_', 1)[1]) + 1, 1, 1)
+
+
+# Seasons the standings loader reloads: the current one and the ones before it (see competitions_api)
+STANDINGS_RELOADED_SEASONS = 3
+
+# Partitioning scheme of each partitioned table of the DDL registry
+PARTITIONED_TABLES = {
+    'matches': MonthlyRangePartitions('utc_date'),
+    'competitions_standings': SeasonListPartitions('season'),
+    'competitions_standings_history': CompetitionYearPartitions('load_date'),
+    'team_players_history': CompetitionYearPartitions('load_date'),
+}
+
+
+def ensure_partitions(db: Database, schema: str, table: str, df: pd.DataFrame) -> List[str]:
+    """
+    Creates the partitions a load needs, if they aren't attached yet. Does nothing for tables that aren't partitioned.
+
+    A standalone table with the name of a missing partition (detached before the detached partitions were
+    renamed) is renamed as detached first, or the partition would never be created.
+
+    Args:
+        db (Database): The database to use.
+        schema (str): The schema of the table.
+        table (str): The table being loaded.
+        df (pd.DataFrame): The rows to be loaded.
+
+    Returns:
+        List[str]: The partitions needed by the load.
+    """
+    scheme = PARTITIONED_TABLES.get(table)
+    if scheme is None or df.empty:
+        return []
+
+    template = getattr(create_queries, f'{table.upper()}_PARTITION')
+    attached = set(list_partitions(db, schema, table))
+    partitions = []
+    for suffix, params in scheme.partitions(df).items():
+        partition = f'{table}_{suffix}'
+        partitions.append(partition)
+        if partition in attached:
+            continue
+        if db.execute_query("select to_regclass(%s)", (f'{schema}.{partition}',))[0][0] is not None:
+            logging.warning(f"{schema}.{partition} exists but isn't a partition of {schema}.{table}, renaming it as detached")
+            _rename_detached(db, schema, partition)
+        db.execute_query(template.format(schema=schema, table=table, partition=partition, **params))
+    return partitions
+
+
+def _rename_detached(db: Database, schema: str, partition: str) -> str:
+    """Renames a detached partition to `<partition>_detached_<YYYYMMDD>`, freeing its name for a new partition."""
+    detached = f"{partition}_detached_{datetime.datetime.now(datetime.timezone.utc):%Y%m%d}"
+    db.execute_query(f"ALTER TABLE {schema}.{partition} RENAME TO {detached};")
+    return detached
+
+
+def list_partitions(db: Database, schema: str, table: str) -> List[str]:
+    """
+    Lists the partitions currently attached to a table.
+
+    Args:
+        db (Database): The database to use.
+        schema (str): The schema of the table.
+        table (str): The partitioned table.
+
+    Returns:
+        List[str]: The partition names.
+    """
+    query = """
+        select child.relname
+          from pg_inherits
+          join pg_class parent on parent.oid = pg_inherits.inhparent
+          join pg_class child on child.oid = pg_inherits.inhrelid
+          join pg_namespace namespace on namespace.oid = parent.relnamespace
+         where namespace.nspname = %s and parent.relname = %s
+         order by child.relname
+    """
+    return [row[0] for row in db.execute_query(query, (schema.lower(), table))]
+
+
+def expired_partitions(table: str, partitions: List[str], older_than: datetime.date) -> List[str]:
+    """
+    Selects the partitions holding only data older than a cutoff.
+
+    Args:
+        table (str): The partitioned table.
+        partitions (List[str]): The partition names.
+        older_than (datetime.date): The retention cutoff.
+
+    Returns:
+        List[str]: The partitions whose upper bound is not after the cutoff.
+    """
+    scheme = PARTITIONED_TABLES[table]
+    prefix = f'{table}_'
+    expired = []
+    for partition in partitions:
+        if not partition.startswith(prefix):
+            continue
+        try:
+            end = scheme.end(partition[len(prefix):])
+        except ValueError:
+            # Not created by the scheme (e.g. a partition attached by hand)
+            continue
+        if end <= older_than:
+            expired.append(partition)
+    return expired
+
+
+def detach_expired_partitions(db: Database, schema: str, table: str, older_than: datetime.date, drop: bool = False) -> List[str]:
+    """
+    Detaches the partitions holding only data older than a cutoff.
+
+    Detaching only changes the catalog, so it's cheap no matter the size of the partition. The detached
+    tables stay in the schema as `<partition>_detached_<YYYYMMDD>` (and can be archived) unless `drop` is set.
+
+    Args:
+        db (Database): The database to use.
+        schema (str): The schema of the table.
+        table (str): The partitioned table.
+        older_than (datetime.date): The retention cutoff.
+        drop (bool, optional): Whether to drop the detached partitions. Defaults to False.
+
+    Returns:
+        List[str]: The detached partitions.
+
+    Raises:
+        ValueError: If the cutoff would detach partitions the loads still write to (see `check_retention`).
+    """
+    check_retention(table, older_than)
+    detached = expired_partitions(table, list_partitions(db, schema, table), older_than)
+    for partition in detached:
+        logging.info(f"Detaching partition {schema}.{partition} from {schema}.{table}")
+        db.execute_query(f"ALTER TABLE {schema}.{table} DETACH PARTITION {schema}.{partition};")
+        if drop:
+            db.execute_query(f"DROP TABLE {schema}.{partition};")
+        else:
+            _rename_detached(db, schema, partition)
+    return detached
+
+
+def check_retention(table: str, older_than: datetime.date, today: datetime.date = None) -> None:
+    """
+    Checks that a retention cutoff keeps the partitions the loads still write to: the standings loader
+    reloads the last `STANDINGS_RELOADED_SEASONS` seasons, so their partitions must not be detached.
+
+    Args:
+        table (str): The partitioned table.
+        older_than (datetime.date): The retention cutoff.
+        today (datetime.date, optional): The reference date. Defaults to today (UTC).
+
+    Raises:
+        ValueError: If the cutoff is too recent for the table.
+    """
+    if table != 'competitions_standings':
+        return
+    today = today or datetime.datetime.now(datetime.timezone.utc).date()
+    first_season = today.year - STANDINGS_RELOADED_SEASONS + 1
+    if PARTITIONED_TABLES[table].end(str(first_season)) <= older_than:
+        raise ValueError(f"A retention up to {older_than} would detach the standings of season {first_season}, "
+                         f"which the standings loader still reloads; keep data from before "
+                         f"{PARTITIONED_TABLES[table].end(str(first_season))}")
+
+
+def retention_cutoff(months: int, today: datetime.date = None) -> datetime.date:
+    """
+    Returns the first day of the month `months` months before the current one.
+
+    Args:
+        months (int): The number of months to keep.
+        today (datetime.date, optional): The reference date. Defaults to today (UTC).
+
+    Returns:
+        datetime.date: The retention cutoff.
+    """
+    today = today or datetime.datetime.now(datetime.timezone.utc).date()
+    month_index = today.year * 12 + today.month - 1 - months
+    return datetime.date(month_index // 12, month_index % 12 + 1, 1)
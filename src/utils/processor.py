@@ -1,20 +1,197 @@
+from typing import Any, Callable, Iterator, Optional
 import abc
+import contextlib
+import datetime
 import logging
-import logfire
+import time
+import pandas as pd
 
-#logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
-# Configuração Logfire
-logfire.configure()
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s', handlers=[logfire.LogfireLoggingHandler()])
+from utils import parallel, sinks, telemetry
+from utils.queries import create_queries
+from utils.partitions import ensure_partitions
+from utils.table_profiles import record_profile
 
 class Processor(abc.ABC):
     def __init__(self, api_connection, processor_name) -> None:
+        # Logging and logfire are configured once per process, by the first processor (see utils.telemetry)
+        telemetry.configure_telemetry()
         self.api_connection = api_connection
         self.processor_name = processor_name
         self.logger = logging.getLogger(processor_name)
+        # Without the postgres sink the loads only go to the other sinks (see utils.sinks)
+        self.write_postgres = sinks.postgres_enabled()
+        # Processes validating and transforming the responses (see utils.parallel)
+        self.workers = parallel.workers_from_env()
 
     
     @abc.abstractmethod
     def process(self) -> None:
         """Processing logic comes here"""
-        pass
\ No newline at end of file
+        pass
+
+    @contextlib.contextmanager
+    def stage(self, name: str, table: str = None) -> Iterator[telemetry.StageRecord]:
+        """
+        Runs a processing stage (one of `telemetry.STAGES`) inside a span and records its duration.
+        The rows and bytes of the stage are set on the yielded record. When the stage ends, the record
+        is passed to `on_stage_end`.
+
+        Args:
+            name (str): The stage.
+            table (str, optional): The table being processed. Defaults to the table of the processor.
+
+        Yields:
+            telemetry.StageRecord: The record of the stage.
+
+        Example:
+            with self.stage('transform') as stage:
+                df = flatten_competitions(competitions_data.competitions)
+                stage.rows = len(df)
+        """
+        record = telemetry.StageRecord(self.processor_name, table or getattr(self, 'table', None), name)
+        with telemetry.span('{processor} {stage} {table}', processor=record.processor, stage=name, table=record.table) as span:
+            start = time.perf_counter()
+            try:
+                yield record
+            except Exception as e:
+                record.error = type(e).__name__
+                raise
+            finally:
+                record.seconds = time.perf_counter() - start
+                record.timestamp = datetime.datetime.now(datetime.timezone.utc).isoformat()
+                span.set_attributes({key: value for key, value in (('rows', record.rows), ('bytes', record.bytes)) if value is not None})
+                self.on_stage_end(record)
+
+    def on_stage_end(self, record: telemetry.StageRecord) -> None:
+        """
+        Hook called after every stage, failed ones included. Sends the record to the metrics backends
+        (see `utils.telemetry`); subclasses can override it (calling super) to observe the stages.
+
+        Args:
+            record (telemetry.StageRecord): The record of the stage.
+        """
+        telemetry.emit(record)
+
+    def _response_bytes(self) -> Optional[int]:
+        """Size of the last response of the API connection, when it keeps it (see `FootballAPIBase`)."""
+        size = getattr(self.api_connection, 'last_response_bytes', None)
+        return size if isinstance(size, int) else None
+
+    def _fetch(self, request: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Calls the API inside a `fetch` stage.
+
+        Args:
+            request (Callable): A method of the API connection (e.g. `self.api_connection.get_competitions`).
+            *args, **kwargs: Its arguments.
+
+        Returns:
+            Any: The response.
+        """
+        with self.stage('fetch') as stage:
+            response = request(*args, **kwargs)
+            stage.bytes = self._response_bytes()
+        return response
+
+    def _validate(self, contract: Callable[..., Any], response: dict) -> Any:
+        """
+        Validates a response against its contract inside a `validate` stage.
+
+        Args:
+            contract (Callable): The pydantic model of the response.
+            response (dict): The response.
+
+        Returns:
+            Any: The validated response.
+        """
+        with self.stage('validate') as stage:
+            data = contract(**response)
+            stage.bytes = self._response_bytes()
+        return data
+
+    def _validate_table(self, table: str = None) -> None:
+        """
+        Creates a table from its DDL in `create_queries` (the constant named after the table) when it
+        doesn't exist yet, together with its indexes (`<TABLE>_INDEXES`), if any.
+        Expects the subclass to set `self.db` and `self.schema`.
+
+        Args:
+            table (str, optional): The table to validate. Defaults to the table of the processor.
+        """
+        table = table or self.table
+        query = getattr(create_queries, table.upper()).format(
+            schema=self.schema,
+            table=table
+        )
+        # Verify and create the table if necessary
+        self.db.validate_table_exists(self.schema, table, query)
+
+        # Indexes backing the dashboard filters (competition/season/team)
+        indexes_query = getattr(create_queries, f'{table.upper()}_INDEXES', None)
+        if indexes_query:
+            self.db.execute_query(indexes_query.format(schema=self.schema, table=table))
+
+    def _write_to_db(self, df: pd.DataFrame, table: str = None) -> None:
+        """
+        Replaces the content of a table with the processed DataFrame, and lands it in the other sinks.
+
+        The rows are converted for the driver first (`serialize` stage). Then (`load` stage) the table is
+        validated (see `_validate_table`), the partitions needed by the rows are created when it is
+        partitioned, and the rows replace its content. The load is profiled afterwards (see `_record_profile`).
+        Without the postgres sink, the database is skipped (see `utils.sinks`).
+
+        Args:
+            df (pd.DataFrame): The DataFrame to write to the database.
+            table (str, optional): The table to write to. Defaults to the table of the processor.
+        """
+        table = table or self.table
+        if self.write_postgres:
+            with self.stage('serialize', table) as stage:
+                records = self.db._to_records(df)
+                stage.rows = len(records)
+
+            with self.stage('load', table) as stage:
+                self._validate_table(table)
+                ensure_partitions(self.db, self.schema, table, df)
+
+                self.db.execute_query(
+                    create_queries.TRUNCATE_TABLE.format(
+                        schema=self.schema,
+                        table=table
+                    )
+                )
+                self.db.insert_pandas_bulk(df, f'{self.schema}.{table}', records=records)
+                stage.rows = len(records)
+            self._record_profile(df, table)
+        self._land(df, table)
+
+    def _land(self, df: pd.DataFrame, table: str = None) -> None:
+        """
+        Writes a load to the sinks of the process other than Postgres (see `utils.sinks`), each one in
+        a `load` stage.
+
+        Args:
+            df (pd.DataFrame): The rows of the load, with their `load_timestamp`.
+            table (str, optional): The table of the load. Defaults to the table of the processor.
+        """
+        table = table or self.table
+        for sink in sinks.get_sinks():
+            with self.stage('load', table) as stage:
+                stage.rows = sink.write(df, self.schema, table)
+
+    def _record_profile(self, df: pd.DataFrame, table: str = None) -> None:
+        """
+        Stores the column statistics of a load in `meta.table_profiles` (see `utils.table_profiles`).
+        A failure is only logged, the profile must never fail a load.
+
+        Args:
+            df (pd.DataFrame): The rows loaded, with their `load_timestamp`.
+            table (str, optional): The loaded table. Defaults to the table of the processor.
+        """
+        table = table or self.table
+        if df.empty or 'load_timestamp' not in df.columns:
+            return
+        try:
+            record_profile(self.db, self.schema, table, df, str(df['load_timestamp'].iloc[0]))
+        except Exception as e:
+            self.logger.warning(f"Could not profile the load of {self.schema}.{table}: {e}")
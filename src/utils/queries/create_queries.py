@@ -2,14 +2,22 @@ COMPETITIONS = """
 CREATE TABLE {schema}.{table} (
     id SERIAL PRIMARY KEY,
     name VARCHAR(255) NOT NULL,
-    area JSONB NOT NULL,
     code VARCHAR(50),
     type VARCHAR(50),
     emblem VARCHAR(255),
     plan VARCHAR(50),
-    current_season JSONB NOT NULL,
+    area_id INTEGER NOT NULL,
+    area_name VARCHAR(255),
+    area_code VARCHAR(50),
+    area_flag VARCHAR(255),
+    current_season_id INTEGER NOT NULL,
+    current_season_start_date DATE,
+    current_season_end_date DATE,
+    current_season_current_matchday INTEGER,
+    current_season_winner_id INTEGER,
     number_of_available_seasons INT NOT NULL,
     last_updated TIMESTAMP NOT NULL,
+    raw_json JSONB,
     load_timestamp TIMESTAMP NOT NULL
 );
 """
@@ -17,7 +25,6 @@ CREATE TABLE {schema}.{table} (
 TEAMS = """
 CREATE TABLE {schema}.{table} (
     id SERIAL PRIMARY KEY,
-    area JSONB NOT NULL,
     competition_id INTEGER NOT NULL,
     team_id INTEGER NOT NULL,
     name VARCHAR(255) NOT NULL,
@@ -26,24 +33,81 @@ CREATE TABLE {schema}.{table} (
     crest VARCHAR(255) NOT NULL,
     address VARCHAR(255) NOT NULL,
     website VARCHAR(255),
-    founded FLOAT,
+    founded INTEGER,
     club_colors VARCHAR(255),
     venue VARCHAR(255),
-    running_competitions JSONB,
-    coach JSONB,
-    squad JSONB,
-    staff JSONB,
+    area_id INTEGER,
+    area_name VARCHAR(255),
+    area_code VARCHAR(50),
+    area_flag VARCHAR(255),
+    coach_id INTEGER,
+    coach_name VARCHAR(255),
+    coach_first_name VARCHAR(255),
+    coach_last_name VARCHAR(255),
+    coach_date_of_birth DATE,
+    coach_nationality VARCHAR(255),
+    coach_contract_start VARCHAR(20),
+    coach_contract_end VARCHAR(20),
     last_updated TIMESTAMP NOT NULL,
+    raw_json JSONB,
     load_timestamp TIMESTAMP NOT NULL,
     UNIQUE (competition_id, team_id)
 );
 """
 
+TEAM_PLAYERS = """
+CREATE TABLE {schema}.{table} (
+    competition_id INTEGER NOT NULL,
+    team_id INTEGER NOT NULL,
+    player_id INTEGER NOT NULL,
+    name VARCHAR(255) NOT NULL,
+    position VARCHAR(255),
+    date_of_birth DATE,
+    nationality VARCHAR(255),
+    load_timestamp TIMESTAMP NOT NULL,
+    PRIMARY KEY (competition_id, team_id, player_id)
+);
+"""
+
+TEAM_STAFF = """
+CREATE TABLE {schema}.{table} (
+    competition_id INTEGER NOT NULL,
+    team_id INTEGER NOT NULL,
+    staff_id INTEGER,
+    name VARCHAR(255),
+    first_name VARCHAR(255),
+    last_name VARCHAR(255),
+    date_of_birth DATE,
+    nationality VARCHAR(255),
+    contract_start VARCHAR(20),
+    contract_end VARCHAR(20),
+    load_timestamp TIMESTAMP NOT NULL
+);
+"""
+
+TEAM_RUNNING_COMPETITIONS = """
+CREATE TABLE {schema}.{table} (
+    competition_id INTEGER NOT NULL,
+    team_id INTEGER NOT NULL,
+    running_competition_id INTEGER NOT NULL,
+    name VARCHAR(255),
+    code VARCHAR(50),
+    type VARCHAR(50),
+    emblem VARCHAR(255),
+    load_timestamp TIMESTAMP NOT NULL,
+    PRIMARY KEY (competition_id, team_id, running_competition_id)
+);
+"""
+
 COMPETITIONS_STANDINGS = """
 CREATE TABLE {schema}.{table} (
-    id SERIAL PRIMARY KEY,
+    id SERIAL,
     position INTEGER NOT NULL,
-    team JSONB NOT NULL,
+    team_id INTEGER NOT NULL,
+    team_name VARCHAR(255),
+    team_short_name VARCHAR(255),
+    team_tla VARCHAR(50),
+    team_crest VARCHAR(255),
     played_games INTEGER NOT NULL,
     form VARCHAR(255),
     won INTEGER NOT NULL,
@@ -55,34 +119,65 @@ CREATE TABLE {schema}.{table} (
     goal_difference INTEGER NOT NULL,
     competition_id INTEGER NOT NULL,
     season INTEGER NOT NULL,
-    season_info JSONB,
+    season_id INTEGER,
+    season_start_date DATE,
+    season_end_date DATE,
+    season_current_matchday INTEGER,
+    season_winner_id INTEGER,
+    raw_json JSONB,
     load_timestamp TIMESTAMP NOT NULL,
+    PRIMARY KEY (id, season),
     UNIQUE (competition_id, position, season)
-);
+) PARTITION BY LIST (season);
+"""
+
+COMPETITIONS_STANDINGS_INDEXES = """
+CREATE INDEX IF NOT EXISTS {table}_competition_season_idx ON {schema}.{table} (competition_id, season);
+CREATE INDEX IF NOT EXISTS {table}_team_id_idx ON {schema}.{table} (team_id);
+"""
+
+COMPETITIONS_STANDINGS_PARTITION = """
+CREATE TABLE IF NOT EXISTS {schema}.{partition} PARTITION OF {schema}.{table}
+    FOR VALUES IN ({season});
 """
 
 COMPETITIONS_TOP_SCORERS = """
 CREATE TABLE {schema}.{table} (
     id SERIAL PRIMARY KEY,
-    player JSONB NOT NULL,                
-    team JSONB NOT NULL,                   
+    player_id INTEGER NOT NULL,
+    player_name VARCHAR(255) NOT NULL,
+    player_first_name VARCHAR(255),
+    player_last_name VARCHAR(255),
+    player_date_of_birth DATE,
+    player_nationality VARCHAR(255),
+    player_section VARCHAR(255),
+    player_position VARCHAR(255),
+    player_shirt_number INTEGER,
+    player_last_updated TIMESTAMP WITH TIME ZONE,
+    team_id INTEGER,
+    team_name VARCHAR(255),
+    team_short_name VARCHAR(255),
+    team_tla VARCHAR(50),
+    team_crest VARCHAR(255),
     played_matches INT,                   
     goals INT,                            
-    assists FLOAT,                          
-    penalties FLOAT,                      
+    assists INT,                          
+    penalties INT,                      
     competition_id INT NOT NULL,          
     season INT NOT NULL,                  
-    season_info JSONB NOT NULL,            
+    season_id INTEGER,
+    season_start_date DATE,
+    season_end_date DATE,
+    season_current_matchday INTEGER,
+    season_winner_id INTEGER,
+    raw_json JSONB,
     load_timestamp TIMESTAMP WITH TIME ZONE NOT NULL,
-    UNIQUE (competition_id, season, player)
+    UNIQUE (competition_id, season, player_id)
 );
 """
 
 MATCHES_TODAY = """
 CREATE TABLE {schema}.{table} (
-    area JSONB, 
-    competition JSONB, 
-    season JSONB, 
     id BIGINT PRIMARY KEY,
     utc_date TIMESTAMP WITH TIME ZONE,
     status VARCHAR(50),
@@ -90,11 +185,37 @@ CREATE TABLE {schema}.{table} (
     stage VARCHAR(50),
     which_group VARCHAR(50), 
     last_updated TIMESTAMP WITH TIME ZONE,
-    home_team JSONB, 
-    away_team JSONB, 
-    score JSONB, 
-    odds JSONB,
-    referees JSONB, 
+    area_id INTEGER,
+    area_name VARCHAR(255),
+    area_code VARCHAR(50),
+    area_flag VARCHAR(255),
+    competition_id INTEGER NOT NULL,
+    competition_name VARCHAR(255),
+    competition_code VARCHAR(50),
+    competition_type VARCHAR(50),
+    competition_emblem VARCHAR(255),
+    season_id INTEGER,
+    season_start_date DATE,
+    season_end_date DATE,
+    season_current_matchday INTEGER,
+    season_winner_id INTEGER,
+    home_team_id INTEGER,
+    home_team_name VARCHAR(255),
+    home_team_short_name VARCHAR(255),
+    home_team_tla VARCHAR(50),
+    home_team_crest VARCHAR(255),
+    away_team_id INTEGER,
+    away_team_name VARCHAR(255),
+    away_team_short_name VARCHAR(255),
+    away_team_tla VARCHAR(50),
+    away_team_crest VARCHAR(255),
+    score_winner VARCHAR(50),
+    score_duration VARCHAR(50),
+    full_time_home INTEGER,
+    full_time_away INTEGER,
+    half_time_home INTEGER,
+    half_time_away INTEGER,
+    raw_json JSONB,
     date_from DATE,
     load_timestamp TIMESTAMP WITH TIME ZONE
 );
@@ -102,9 +223,6 @@ CREATE TABLE {schema}.{table} (
 
 TEAMS_UPCOMING_MATCHES = """
 CREATE TABLE {schema}.{table} (
-    area JSONB, 
-    competition JSONB, 
-    season JSONB, 
     id BIGINT PRIMARY KEY,
     utc_date TIMESTAMP WITH TIME ZONE,
     status VARCHAR(50),
@@ -112,17 +230,215 @@ CREATE TABLE {schema}.{table} (
     stage VARCHAR(50),
     which_group VARCHAR(50), 
     last_updated TIMESTAMP WITH TIME ZONE,
-    home_team JSONB, 
-    away_team JSONB, 
-    score JSONB, 
-    odds JSONB,
-    referees JSONB, 
+    area_id INTEGER,
+    area_name VARCHAR(255),
+    area_code VARCHAR(50),
+    area_flag VARCHAR(255),
+    competition_id INTEGER NOT NULL,
+    competition_name VARCHAR(255),
+    competition_code VARCHAR(50),
+    competition_type VARCHAR(50),
+    competition_emblem VARCHAR(255),
+    season_id INTEGER,
+    season_start_date DATE,
+    season_end_date DATE,
+    season_current_matchday INTEGER,
+    season_winner_id INTEGER,
+    home_team_id INTEGER,
+    home_team_name VARCHAR(255),
+    home_team_short_name VARCHAR(255),
+    home_team_tla VARCHAR(50),
+    home_team_crest VARCHAR(255),
+    away_team_id INTEGER,
+    away_team_name VARCHAR(255),
+    away_team_short_name VARCHAR(255),
+    away_team_tla VARCHAR(50),
+    away_team_crest VARCHAR(255),
+    score_winner VARCHAR(50),
+    score_duration VARCHAR(50),
+    full_time_home INTEGER,
+    full_time_away INTEGER,
+    half_time_home INTEGER,
+    half_time_away INTEGER,
+    raw_json JSONB,
     date_from DATE,
     date_to DATE,
     load_timestamp TIMESTAMP WITH TIME ZONE
 );
 """
-  
+
+MATCHES = """
+CREATE TABLE {schema}.{table} (
+    id BIGINT NOT NULL,
+    utc_date TIMESTAMP WITH TIME ZONE NOT NULL,
+    status VARCHAR(50),
+    matchday INT, 
+    stage VARCHAR(50),
+    which_group VARCHAR(50), 
+    last_updated TIMESTAMP WITH TIME ZONE,
+    area_id INTEGER,
+    area_name VARCHAR(255),
+    area_code VARCHAR(50),
+    area_flag VARCHAR(255),
+    competition_id INTEGER NOT NULL,
+    competition_name VARCHAR(255),
+    competition_code VARCHAR(50),
+    competition_type VARCHAR(50),
+    competition_emblem VARCHAR(255),
+    season_id INTEGER,
+    season_start_date DATE,
+    season_end_date DATE,
+    season_current_matchday INTEGER,
+    season_winner_id INTEGER,
+    home_team_id INTEGER,
+    home_team_name VARCHAR(255),
+    home_team_short_name VARCHAR(255),
+    home_team_tla VARCHAR(50),
+    home_team_crest VARCHAR(255),
+    away_team_id INTEGER,
+    away_team_name VARCHAR(255),
+    away_team_short_name VARCHAR(255),
+    away_team_tla VARCHAR(50),
+    away_team_crest VARCHAR(255),
+    score_winner VARCHAR(50),
+    score_duration VARCHAR(50),
+    full_time_home INTEGER,
+    full_time_away INTEGER,
+    half_time_home INTEGER,
+    half_time_away INTEGER,
+    raw_json JSONB,
+    load_timestamp TIMESTAMP WITH TIME ZONE,
+    PRIMARY KEY (id, utc_date)
+) PARTITION BY RANGE (utc_date);
+"""
+
+MATCHES_INDEXES = """
+CREATE INDEX IF NOT EXISTS {table}_competition_date_idx ON {schema}.{table} (competition_id, utc_date);
+CREATE INDEX IF NOT EXISTS {table}_home_team_idx ON {schema}.{table} (home_team_id, utc_date);
+CREATE INDEX IF NOT EXISTS {table}_away_team_idx ON {schema}.{table} (away_team_id, utc_date);
+"""
+
+MATCHES_PARTITION = """
+CREATE TABLE IF NOT EXISTS {schema}.{partition} PARTITION OF {schema}.{table}
+    FOR VALUES FROM ('{start}') TO ('{end}');
+"""
+
+MATCH_REFEREES = """
+CREATE TABLE {schema}.{table} (
+    match_id BIGINT NOT NULL,
+    referee_id INTEGER NOT NULL,
+    name VARCHAR(255),
+    type VARCHAR(50),
+    nationality VARCHAR(255),
+    load_timestamp TIMESTAMP WITH TIME ZONE,
+    PRIMARY KEY (match_id, referee_id)
+);
+"""
+
+MATCHES_SYNC_WATERMARKS = """
+CREATE TABLE {schema}.{table} (
+    competition_id INTEGER PRIMARY KEY,
+    last_updated TIMESTAMP WITH TIME ZONE NOT NULL,
+    synced_at TIMESTAMP WITH TIME ZONE NOT NULL
+);
+"""
+
+COMPETITIONS_STANDINGS_HISTORY = """
+CREATE TABLE {schema}.{table} (
+    competition_id INTEGER NOT NULL,
+    season INTEGER NOT NULL,
+    team_id INTEGER NOT NULL,
+    load_date DATE NOT NULL,
+    position INTEGER,
+    team_short_name VARCHAR(255),
+    team_tla VARCHAR(50),
+    team_crest VARCHAR(255),
+    played_games INTEGER,
+    form VARCHAR(255),
+    won INTEGER,
+    draw INTEGER,
+    lost INTEGER,
+    points INTEGER,
+    goals_for INTEGER,
+    goals_against INTEGER,
+    goal_difference INTEGER,
+    is_removed BOOLEAN NOT NULL DEFAULT FALSE,
+    load_timestamp TIMESTAMP WITH TIME ZONE NOT NULL,
+    PRIMARY KEY (competition_id, load_date, season, team_id)
+) PARTITION BY RANGE (competition_id, load_date);
+"""
+
+COMPETITIONS_STANDINGS_HISTORY_INDEXES = """
+CREATE INDEX IF NOT EXISTS {table}_as_of_idx ON {schema}.{table} (competition_id, season, team_id, load_date DESC);
+"""
+
+TEAM_PLAYERS_HISTORY = """
+CREATE TABLE {schema}.{table} (
+    competition_id INTEGER NOT NULL,
+    team_id INTEGER NOT NULL,
+    player_id INTEGER NOT NULL,
+    load_date DATE NOT NULL,
+    name VARCHAR(255),
+    position VARCHAR(255),
+    date_of_birth DATE,
+    nationality VARCHAR(255),
+    is_removed BOOLEAN NOT NULL DEFAULT FALSE,
+    load_timestamp TIMESTAMP WITH TIME ZONE NOT NULL,
+    PRIMARY KEY (competition_id, load_date, team_id, player_id)
+) PARTITION BY RANGE (competition_id, load_date);
+"""
+
+TEAM_PLAYERS_HISTORY_INDEXES = """
+CREATE INDEX IF NOT EXISTS {table}_as_of_idx ON {schema}.{table} (competition_id, team_id, player_id, load_date DESC);
+"""
+
+COMPETITIONS_STANDINGS_HISTORY_PARTITION = """
+CREATE TABLE IF NOT EXISTS {schema}.{partition} PARTITION OF {schema}.{table}
+    FOR VALUES FROM ({competition_id}, '{year}-01-01') TO ({competition_id}, '{next_year}-01-01');
+"""
+
+TEAM_PLAYERS_HISTORY_PARTITION = COMPETITIONS_STANDINGS_HISTORY_PARTITION
+
+TEAM_RATINGS = """
+CREATE TABLE {schema}.{table} (
+    match_id BIGINT NOT NULL,
+    team_id INTEGER NOT NULL,
+    match_date TIMESTAMP WITH TIME ZONE NOT NULL,
+    competition_id INTEGER NOT NULL,
+    opponent_id INTEGER NOT NULL,
+    rating_before DOUBLE PRECISION NOT NULL,
+    rating_after DOUBLE PRECISION NOT NULL,
+    matches_played INTEGER NOT NULL,
+    load_timestamp TIMESTAMP NOT NULL,
+    PRIMARY KEY (match_id, team_id)
+);
+"""
+
+TEAM_RATINGS_INDEXES = """
+CREATE INDEX IF NOT EXISTS {table}_team_date_idx ON {schema}.{table} (team_id, match_date);
+"""
+
+TABLE_PROFILES = """
+CREATE TABLE {schema}.{table} (
+    schema_name TEXT NOT NULL,
+    table_name TEXT NOT NULL,
+    load_timestamp TIMESTAMP NOT NULL,
+    column_name TEXT NOT NULL,
+    data_type TEXT,
+    row_count INTEGER NOT NULL,
+    null_count INTEGER NOT NULL,
+    null_percentage NUMERIC(6, 3) NOT NULL,
+    distinct_count INTEGER,
+    min_value TEXT,
+    max_value TEXT,
+    PRIMARY KEY (schema_name, table_name, load_timestamp, column_name)
+);
+"""
+
+TABLE_PROFILES_INDEXES = """
+CREATE INDEX IF NOT EXISTS {table}_latest_idx ON {schema}.{table} (schema_name, table_name, load_timestamp DESC);
+"""
+
 TRUNCATE_TABLE = """
 truncate table {schema}.{table};
 """
\ No newline at end of file
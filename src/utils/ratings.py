@@ -0,0 +1,255 @@
+"""
+This module keeps Elo ratings for every team across competitions, computed from the finished matches.
+
+The ratings live in arrays indexed by team (a team id maps to a slot), and are updated incrementally:
+each run only applies the finished matches that weren't rated yet, starting from the latest rating of
+each team. Every rated match stores the rating of both teams before and after it (`team_ratings`), so
+the rating of a team at any match date can be read back and the state rebuilt from the table.
+"""
+from typing import Dict
+import datetime
+import logging
+import os
+import numpy as np
+import pandas as pd
+
+from utils.database import Database
+from utils.processor import Processor
+
+RATING_COLUMNS = ['match_id', 'team_id', 'match_date', 'competition_id', 'opponent_id',
+                  'rating_before', 'rating_after', 'matches_played']
+
+
+def goal_difference_multiplier(goal_difference: np.ndarray) -> np.ndarray:
+    """Weights the rating change by the margin of victory, as the World Football Elo ratings do."""
+    goal_difference = np.abs(goal_difference)
+    return np.where(goal_difference <= 1, 1.0, np.where(goal_difference == 2, 1.5, (11 + goal_difference) / 8))
+
+
+class EloRatings:
+    """
+    Elo ratings of the teams, in arrays indexed by team slot.
+
+    Attributes:
+        k (float): The update factor.
+        home_advantage (float): Rating points added to the home team when computing the expected result.
+        initial_rating (float): The rating of a team never seen before.
+
+    Methods:
+        - update: Applies finished matches to the ratings.
+        - state: Returns the current rating of each team.
+    """
+    def __init__(self, k: float = 20.0, home_advantage: float = 65.0, initial_rating: float = 1500.0):
+        self.k = k
+        self.home_advantage = home_advantage
+        self.initial_rating = initial_rating
+        self.slots: Dict[int, int] = {}
+        self.ratings = np.empty(0, dtype='float64')
+        self.matches_played = np.empty(0, dtype='int64')
+
+    @classmethod
+    def from_state(cls, state: pd.DataFrame, **kwargs) -> 'EloRatings':
+        """
+        Restores the ratings from a state (see `state`).
+
+        Args:
+            state (pd.DataFrame): One row per team, with `team_id`, `rating` and `matches_played`.
+
+        Returns:
+            EloRatings: The restored ratings.
+        """
+        ratings = cls(**kwargs)
+        if not state.empty:
+            slots = ratings._slots(state['team_id'].to_numpy())
+            ratings.ratings[slots] = state['rating'].to_numpy(dtype='float64')
+            ratings.matches_played[slots] = state['matches_played'].to_numpy(dtype='int64')
+        return ratings
+
+    def _slots(self, team_ids: np.ndarray) -> np.ndarray:
+        """Returns the slot of each team, adding the teams never seen before with the initial rating."""
+        new_team_ids = [team_id for team_id in pd.unique(np.asarray(team_ids, dtype='int64')).tolist() if team_id not in self.slots]
+        if new_team_ids:
+            for team_id in new_team_ids:
+                self.slots[team_id] = len(self.slots)
+            self.ratings = np.concatenate([self.ratings, np.full(len(new_team_ids), self.initial_rating)])
+            self.matches_played = np.concatenate([self.matches_played, np.zeros(len(new_team_ids), dtype='int64')])
+        # Slots are given in order, so the slot of a team is its position among the known teams
+        return pd.Index(list(self.slots)).get_indexer(np.asarray(team_ids, dtype='int64'))
+
+    def update(self, matches: pd.DataFrame) -> pd.DataFrame:
+        """
+        Applies finished matches to the ratings, in the order of their date.
+
+        Args:
+            matches (pd.DataFrame): Matches with `id`, `utc_date`, `competition_id`, `home_team_id`, `away_team_id`,
+                `full_time_home` and `full_time_away`.
+
+        Returns:
+            pd.DataFrame: Two rows per match (one per team) with the `RATING_COLUMNS`.
+        """
+        if matches.empty:
+            return pd.DataFrame(columns=RATING_COLUMNS)
+
+        matches = matches.sort_values(['utc_date', 'id'], ignore_index=True)
+        home = self._slots(matches['home_team_id'].to_numpy())
+        away = self._slots(matches['away_team_id'].to_numpy())
+        goal_difference = matches['full_time_home'].to_numpy(dtype='int64') - matches['full_time_away'].to_numpy(dtype='int64')
+        # 1 for a home win, 0.5 for a draw and 0 for an away win
+        score = (np.sign(goal_difference) + 1) / 2
+        weight = self.k * goal_difference_multiplier(goal_difference)
+
+        # Each match depends on the ratings left by the previous ones, so only this loop is sequential.
+        # It runs on plain floats, which are much faster than NumPy scalars one at a time.
+        n = len(matches)
+        ratings = self.ratings.tolist()
+        home_before, away_before, change = [0.0] * n, [0.0] * n, [0.0] * n
+        for i, (home_slot, away_slot, match_score, match_weight) in enumerate(zip(home.tolist(), away.tolist(), score.tolist(), weight.tolist())):
+            home_rating, away_rating = ratings[home_slot], ratings[away_slot]
+            expected = 1 / (1 + 10 ** ((away_rating - home_rating - self.home_advantage) / 400))
+            delta = match_weight * (match_score - expected)
+            home_before[i], away_before[i], change[i] = home_rating, away_rating, delta
+            ratings[home_slot] = home_rating + delta
+            ratings[away_slot] = away_rating - delta
+        self.ratings = np.asarray(ratings, dtype='float64')
+        home_before, away_before, change = np.asarray(home_before), np.asarray(away_before), np.asarray(change)
+
+        # Matches played by each team after each match (home rows first, then away rows)
+        slots = np.concatenate([home, away])
+        by_match = np.argsort(np.tile(np.arange(n), 2), kind='stable')
+        played = np.empty(2 * n, dtype='int64')
+        played[by_match] = (
+            pd.Series(slots[by_match]).groupby(slots[by_match]).cumcount().to_numpy()
+            + 1 + self.matches_played[slots[by_match]]
+        )
+        np.add.at(self.matches_played, slots, 1)
+        played_home, played_away = played[:n], played[n:]
+
+        def side(team: str, opponent: str, before: np.ndarray, after: np.ndarray, played: np.ndarray) -> pd.DataFrame:
+            return pd.DataFrame({
+                'match_id': matches['id'].to_numpy(),
+                'team_id': matches[team].to_numpy(),
+                'match_date': matches['utc_date'].array,
+                'competition_id': matches['competition_id'].to_numpy(),
+                'opponent_id': matches[opponent].to_numpy(),
+                'rating_before': before,
+                'rating_after': after,
+                'matches_played': played,
+            })
+
+        return pd.concat([
+            side('home_team_id', 'away_team_id', home_before, home_before + change, played_home),
+            side('away_team_id', 'home_team_id', away_before, away_before - change, played_away),
+        ], ignore_index=True)
+
+    def state(self) -> pd.DataFrame:
+        """
+        Returns the current ratings.
+
+        Returns:
+            pd.DataFrame: One row per team, with `team_id`, `rating` and `matches_played`, best rated first.
+        """
+        state = pd.DataFrame({
+            'team_id': np.fromiter(self.slots.keys(), dtype='int64', count=len(self.slots)),
+            'rating': self.ratings,
+            'matches_played': self.matches_played,
+        })
+        return state.sort_values('rating', ascending=False, ignore_index=True)
+
+
+class TeamRatingsProcessor(Processor):
+    """
+    Rates the finished matches of the matches table that weren't rated yet.
+
+    Attributes:
+        schema (str): Database schema to use.
+        table (str): The ratings table (one row per match and team).
+        matches_table (str): The matches table to read.
+
+    Methods:
+        - process: Rates the new finished matches.
+    """
+    def __init__(self, schema = 'RAW', table = 'team_ratings', matches_table = 'matches'):
+        super().__init__(None, self.__class__.__name__)
+        self.schema = schema
+        self.table = table
+        self.matches_table = matches_table
+
+        self.db = Database(
+            db_name=os.getenv('PG_DB'),
+            user=os.getenv('PG_USER'),
+            password=os.getenv('PG_PASS'),
+            host=os.getenv('PG_HOST'),
+            port=5432
+        )
+
+    def process(self) -> None:
+        """
+        Updates the ratings with the finished matches that weren't rated yet.
+
+        The method performs the following steps:
+        - Restores the latest rating of each team from the ratings table.
+        - Reads the finished matches without ratings.
+        - Applies them to the ratings, in the order of their date.
+        - Appends the rating of both teams before and after each match.
+
+        Example:
+            TeamRatingsProcessor(schema='raw').process()
+        """
+        self.logger.info(f"Start Processing - {self.table}")
+        self._validate_table()
+
+        # The matches come from the database instead of the API
+        with self.stage('fetch') as stage:
+            state = self._read_state()
+            matches = self._read_unrated_matches()
+            stage.rows = len(matches)
+        ratings = EloRatings.from_state(state)
+
+        self.logger.info(f"{len(matches)} finished matches to rate.")
+        if matches.empty:
+            return
+
+        with self.stage('transform') as stage:
+            df = ratings.update(matches)
+            df['load_timestamp'] = datetime.datetime.now(datetime.timezone.utc).isoformat()
+            stage.rows = len(df)
+
+        with self.stage('serialize') as stage:
+            records = self.db._to_records(df)
+            stage.rows = len(records)
+
+        self.logger.info(f"Writing to Database - {self.table}:")
+        with self.stage('load') as stage:
+            stage.rows = self.db.upsert_pandas_bulk(df, f'{self.schema}.{self.table}', conflict_columns=['match_id', 'team_id'], records=records)
+        self._record_profile(df)
+
+    def _read_state(self) -> pd.DataFrame:
+        """
+        Reads the latest rating of each team: the rating after the last match rated for the team
+        (matches rated in a later run, e.g. results arriving late, come last).
+        """
+        query = f"""
+            select distinct on (team_id) team_id, rating_after as rating, matches_played
+              from {self.schema}.{self.table}
+             order by team_id, load_timestamp desc, match_date desc, match_id desc
+        """
+        return self.db.select_pandas(query)
+
+    def _read_unrated_matches(self) -> pd.DataFrame:
+        """
+        Reads every finished match without ratings, however old: a result arriving or corrected late
+        is still rated (after the matches already rated).
+        """
+        query = f"""
+            select matches.id, matches.utc_date, matches.competition_id, matches.home_team_id, matches.away_team_id,
+                   matches.full_time_home, matches.full_time_away
+              from {self.schema}.{self.matches_table} matches
+             where matches.status in ('FINISHED', 'AWARDED')
+               and matches.full_time_home is not null and matches.full_time_away is not null
+               and matches.home_team_id is not null and matches.away_team_id is not null
+               and not exists (select 1 from {self.schema}.{self.table} ratings where ratings.match_id = matches.id)
+             order by matches.utc_date, matches.id
+        """
+        matches = self.db.select_pandas(query)
+        logging.info(f"Unrated finished matches: {len(matches)}")
+        return matches
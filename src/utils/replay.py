@@ -0,0 +1,265 @@
+"""
+This module rebuilds the tables from the archived API responses (see `utils.archive`) instead of calling
+the API, e.g. after a change to a contract or to a transformation.
+
+The responses go through the same contracts and flattening as in the processors, in a pool of processes
+(one per CPU by default, see `utils.parallel`) and without any rate limit, and are loaded by the processors' own writers
+(so the other sinks, the profiles and the notifications work as in a normal load). What is replayed
+depends on the table:
+- Tables replaced by every load (competitions, teams, standings, top scorers, upcoming and today's
+  matches): the latest response of each request (endpoint and parameters) is kept, and they replace
+  the content of the table together, as one load.
+- The matches history (`matches`): every distinct response body, oldest first, upserted in batches.
+  A match only replaces a version with an older `lastUpdated`, so the latest version always wins.
+
+The rows get the time their response was fetched as `load_timestamp`. A response that no longer passes
+its contract is logged and skipped. The histories of standings and squads are not appended by a replay.
+"""
+from typing import Any, Callable, Dict, List, Optional
+import dataclasses
+import json
+import logging
+import os
+import re
+import pandas as pd
+
+from contracts.competitions_contract import CompetitionsResponse
+from contracts.competitions_standings_contract import CompetitionStandingsResponse
+from contracts.competitions_top_scorers_contract import TopScorersResponse
+from contracts.matches_contract import MatchesTodayResponse
+from contracts.teams_contract import TeamsResponse
+from utils.archive import ResponseArchive
+from utils.flatten import flatten_competitions, flatten_matches, flatten_standings, flatten_teams, flatten_top_scorers
+from utils.parallel import ShardPool
+
+logger = logging.getLogger(__name__)
+
+
+def _competitions(response: CompetitionsResponse, groups: Dict[str, str]) -> Dict[str, pd.DataFrame]:
+    return {'competitions': flatten_competitions(response.competitions)}
+
+
+def _standings(response: CompetitionStandingsResponse, groups: Dict[str, str]) -> Dict[str, pd.DataFrame]:
+    return {'competitions_standings': flatten_standings(response, int(groups['competition_id']))}
+
+
+def _top_scorers(response: TopScorersResponse, groups: Dict[str, str]) -> Dict[str, pd.DataFrame]:
+    return {'competitions_top_scorers': flatten_top_scorers(response, int(groups['competition_id']))}
+
+
+def _teams(response: TeamsResponse, groups: Dict[str, str]) -> Dict[str, pd.DataFrame]:
+    # The teams table first: the child tables are only meaningful with their teams loaded
+    return flatten_teams(response.teams, int(groups['competition_id']))
+
+
+def _team_matches(response: MatchesTodayResponse, groups: Dict[str, str]) -> Dict[str, pd.DataFrame]:
+    flat = flatten_matches(response.matches)
+    flat['matches']['date_from'] = response.filters.date_from
+    flat['matches']['date_to'] = response.filters.date_to
+    return {'teams_upcoming_matches': flat['matches'], 'match_referees': flat['match_referees']}
+
+
+def _matches_today(response: MatchesTodayResponse, groups: Dict[str, str]) -> Dict[str, pd.DataFrame]:
+    flat = flatten_matches(response.matches)
+    flat['matches']['date_from'] = response.filters.date_from
+    return {'matches_today': flat['matches'], 'match_referees': flat['match_referees']}
+
+
+def _matches(response: MatchesTodayResponse, groups: Dict[str, str]) -> Dict[str, pd.DataFrame]:
+    return flatten_matches(response.matches)
+
+
+@dataclasses.dataclass(frozen=True)
+class Replay:
+    """
+    How the responses of a request type are replayed.
+
+    Attributes:
+        endpoint (str): Regular expression matching the archived endpoints (named groups go to `transform`).
+        contract (type): The contract validating each response.
+        transform (Callable): Flattens a validated response into its tables (name -> DataFrame).
+        date_window (bool, optional): Only the requests with (True) or without (False) a `dateFrom`
+            parameter. Defaults to None (both).
+        history (bool): Every distinct response is upserted (True), or the latest of each request replaces
+            the table (False). Defaults to False.
+    """
+    endpoint: str
+    contract: type
+    transform: Callable[[Any, Dict[str, str]], Dict[str, pd.DataFrame]]
+    date_window: Optional[bool] = None
+    history: bool = False
+
+
+REPLAYS = {
+    'competitions': Replay(r'competitions', CompetitionsResponse, _competitions),
+    'competitions_standings': Replay(r'competitions/(?P<competition_id>\d+)/standings', CompetitionStandingsResponse, _standings),
+    'competitions_top_scorers': Replay(r'competitions/(?P<competition_id>\d+)/scorers', TopScorersResponse, _top_scorers),
+    'teams': Replay(r'competitions/(?P<competition_id>\d+)/teams', TeamsResponse, _teams),
+    'teams_upcoming_matches': Replay(r'teams/(?P<team_id>\d+)/matches', MatchesTodayResponse, _team_matches),
+    'matches_today': Replay(r'matches', MatchesTodayResponse, _matches_today, date_window=False),
+    'matches': Replay(r'matches', MatchesTodayResponse, _matches, date_window=True, history=True),
+}
+
+
+def select_entries(archive: ResponseArchive, request_type: str) -> List[Dict[str, Any]]:
+    """
+    Picks the archived responses a request type replays (see the module docstring).
+
+    Args:
+        archive (ResponseArchive): The archive.
+        request_type (str): One of `REPLAYS`.
+
+    Returns:
+        List[Dict[str, Any]]: The index entries to replay, oldest first.
+    """
+    replay = REPLAYS[request_type]
+    pattern = re.compile(replay.endpoint)
+    entries = [
+        entry for entry in archive.entries()
+        if pattern.fullmatch(entry['endpoint'])
+        and (replay.date_window is None or ('dateFrom' in entry['params']) == replay.date_window)
+    ]
+    entries.sort(key=lambda entry: entry['fetched_at'])
+
+    selected = {}
+    for entry in entries:
+        if replay.history:
+            # The same body only needs to be processed once
+            selected.setdefault(entry['sha256'], entry)
+        else:
+            selected[(entry['endpoint'], json.dumps(entry['params'], sort_keys=True))] = entry
+    return sorted(selected.values(), key=lambda entry: entry['fetched_at'])
+
+
+def transform_entry(root: str, request_type: str, entry: Dict[str, Any]) -> Dict[str, pd.DataFrame]:
+    """
+    Validates and flattens one archived response (a shard of the processing pool, see `utils.parallel`).
+
+    Args:
+        root (str): The archive directory.
+        request_type (str): One of `REPLAYS`.
+        entry (Dict[str, Any]): The index entry of the response.
+
+    Returns:
+        Dict[str, pd.DataFrame]: The tables of the response, with their `load_timestamp`.
+
+    Raises:
+        ValueError: If the response can't be read or fails its contract.
+    """
+    replay = REPLAYS[request_type]
+    try:
+        response = replay.contract(**ResponseArchive(root).load(entry['sha256']))
+        tables = replay.transform(response, re.fullmatch(replay.endpoint, entry['endpoint']).groupdict())
+    except Exception as e:
+        # Only the message crosses the process boundary (some exceptions can't be pickled)
+        raise ValueError(f"{entry['endpoint']} {entry['params']} ({entry['sha256'][:12]}): {type(e).__name__}: {e}") from None
+    for df in tables.values():
+        df['load_timestamp'] = entry['fetched_at']
+    return tables
+
+
+def _processor(request_type: str, schema: str):
+    """The processor whose writers load the replayed tables (it never calls the API)."""
+    from utils.competitions_api import CompetitionsDetailsProcessor, CompetitionsProcessor
+    from utils.matches_api import MatchesProcessor, MatchesSyncProcessor
+    from utils.teams_api import TeamsProcessor, TeamUpcomingMatchesProcessor
+
+    if request_type == 'competitions':
+        return CompetitionsProcessor(None, schema=schema, table='competitions')
+    elif request_type in ('competitions_standings', 'competitions_top_scorers'):
+        return CompetitionsDetailsProcessor(None, schema=schema, table=request_type)
+    elif request_type == 'teams':
+        return TeamsProcessor(None, competition_ids=[], schema=schema, table='teams')
+    elif request_type == 'teams_upcoming_matches':
+        return TeamUpcomingMatchesProcessor(None, schema=schema, table='teams_upcoming_matches')
+    elif request_type == 'matches_today':
+        return MatchesProcessor(None, schema=schema, table='matches_today')
+    return MatchesSyncProcessor(None, schema=schema, table='matches')
+
+
+def _write_tables(processor, tables: Dict[str, List[pd.DataFrame]]) -> Dict[str, int]:
+    """Replaces the tables of a replay, each with all of its replayed rows as one load."""
+    from utils.matches_api import write_match_referees
+
+    rows = {}
+    for table, frames in tables.items():
+        df = pd.concat(frames, ignore_index=True)
+        if table == 'match_referees':
+            if processor.write_postgres:
+                write_match_referees(processor.db, processor.schema, df, df['load_timestamp'].max())
+            processor._land(df, table)
+        else:
+            processor._write_to_db(df, table)
+        rows[table] = len(df)
+    return rows
+
+
+def replay(request_type: str, source: str, schema: str = 'raw', workers: int = None,
+           batch_rows: int = 50_000) -> Dict[str, int]:
+    """
+    Rebuilds the tables of a request type from the archived responses (see the module docstring).
+
+    Args:
+        request_type (str): One of `REPLAYS` (the request types of main.py).
+        source (str): The archive directory (`RESPONSE_ARCHIVE_DIR` of the runs that archived them).
+        schema (str, optional): The schema of the tables. Defaults to 'raw'.
+        workers (int, optional): Processes validating and flattening the responses. Defaults to the CPU count.
+        batch_rows (int, optional): Matches upserted at a time by the matches history. Defaults to 50000.
+
+    Returns:
+        Dict[str, int]: The rows loaded per table.
+
+    Raises:
+        ValueError: If the request type can't be replayed.
+        FileNotFoundError: If the source isn't an archive.
+    """
+    if request_type not in REPLAYS:
+        raise ValueError(f"{request_type} can't be replayed, only {', '.join(REPLAYS)}")
+    if not os.path.isdir(os.path.join(source, 'index')):
+        raise FileNotFoundError(f"{source} is not a response archive (no index directory)")
+
+    entries = select_entries(ResponseArchive(source), request_type)
+    logger.info(f"Replaying {len(entries)} archived responses of {request_type} from {source}")
+    if not entries:
+        return {}
+
+    processor = _processor(request_type, schema)
+    if REPLAYS[request_type].history and processor.write_postgres:
+        processor._validate_tables()
+
+    rows, tables, buffered, failed = {}, {}, 0, 0
+    with ShardPool(workers or os.cpu_count()) as pool:
+        for shard in pool.map(transform_entry, ((source, request_type, entry) for entry in entries)):
+            try:
+                result = shard.result()
+            except ValueError as e:
+                failed += 1
+                logger.error(f"Skipping a response that fails its contract: {e}")
+                continue
+            for table, df in result.items():
+                tables.setdefault(table, []).append(df)
+            if REPLAYS[request_type].history:
+                buffered += len(result['matches'])
+                if buffered >= batch_rows:
+                    _upsert_history(processor, tables, rows)
+                    tables, buffered = {}, 0
+
+    if REPLAYS[request_type].history:
+        _upsert_history(processor, tables, rows)
+    elif tables:
+        rows = _write_tables(processor, tables)
+    logger.info(f"Replay of {request_type} done: {rows} rows loaded, {failed} responses skipped")
+    return rows
+
+
+def _upsert_history(processor, tables: Dict[str, List[pd.DataFrame]], rows: Dict[str, int]) -> None:
+    """Upserts a batch of replayed matches into the matches history."""
+    if not tables:
+        return
+    df = pd.concat(tables['matches'], ignore_index=True)
+    if df.empty:
+        return
+    referees = pd.concat(tables['match_referees'], ignore_index=True)
+    processor._upsert_matches(df, referees, df['load_timestamp'].max())
+    rows['matches'] = rows.get('matches', 0) + len(df)
+    rows['match_referees'] = rows.get('match_referees', 0) + len(referees)
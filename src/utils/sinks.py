@@ -0,0 +1,313 @@
+"""
+This module lets the processors write each load to other sinks than Postgres, and imports them back.
+
+The sinks of the process are set by the `PROCESSOR_SINKS` environment variable, a comma separated list of:
+- `postgres`: the tables of the database (the default, when the variable is absent).
+- `parquet:<dir>`: a landing directory of Parquet files, one file per load and partition:
+      <dir>/<table>/competition=<id>/season=<year>/load_date=<yyyy-mm-dd>/part-<timestamp>-<id>.parquet
+  The partition levels a table doesn't have a column for are left out (e.g. the competitions table
+  only has `load_date`). The files keep every column of the table, so they can be read as they are
+  (e.g. by DuckDB: `select * from read_parquet('<dir>/matches/**/*.parquet')`) or imported into
+  Postgres again with `import_partition`.
+
+Without `postgres`, the processors skip the writes to the database (tables, histories, notifications)
+and only land the loads, e.g. `PROCESSOR_SINKS=parquet:/data/landing`. The processors that need the
+database to decide what to fetch (e.g. the competition ids) still read it.
+
+pyarrow is only imported by the Parquet sink and the import.
+"""
+from typing import Dict, List
+import abc
+import datetime
+import glob
+import logging
+import os
+import threading
+import uuid
+import pandas as pd
+
+from utils.database import Database
+from utils.partitions import ensure_partitions
+from utils.queries import create_queries
+
+DEFAULT_PARTITION = '__HIVE_DEFAULT_PARTITION__'
+# Tables whose loads only have the new or changed rows, with the key they are upserted by; the loads
+# of the other tables have all the rows of their partition
+INCREMENTAL_KEYS = {
+    'matches': ['id', 'utc_date'],
+    'match_referees': ['match_id', 'referee_id'],
+}
+
+
+class Sink(abc.ABC):
+    @abc.abstractmethod
+    def write(self, df: pd.DataFrame, schema: str, table: str) -> int:
+        """
+        Writes one load of a table.
+
+        Args:
+            df (pd.DataFrame): The rows of the load, with their `load_timestamp`.
+            schema (str): The schema of the table.
+            table (str): The table.
+
+        Returns:
+            int: The rows written.
+        """
+        pass
+
+
+def _partition_value(value) -> str:
+    if value is None or pd.isna(value):
+        return DEFAULT_PARTITION
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def partition_keys(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Computes the landing partition of every row: its competition, season (year) and load date.
+
+    Args:
+        df (pd.DataFrame): The rows of a load.
+
+    Returns:
+        pd.DataFrame: The `competition`, `season` and `load_date` of each row (as strings), only for
+        the levels the table has a column for.
+    """
+    keys = pd.DataFrame(index=df.index)
+    if 'competition_id' in df.columns:
+        keys['competition'] = df['competition_id'].map(_partition_value)
+    if 'season' in df.columns:
+        keys['season'] = df['season'].map(_partition_value)
+    elif 'season_start_date' in df.columns:
+        keys['season'] = pd.to_datetime(df['season_start_date'], errors='coerce').dt.year.map(_partition_value)
+    if 'load_timestamp' in df.columns:
+        keys['load_date'] = pd.to_datetime(df['load_timestamp'], utc=True, errors='coerce').dt.date.map(_partition_value)
+    else:
+        keys['load_date'] = datetime.datetime.now(datetime.timezone.utc).date().isoformat()
+    return keys
+
+
+class ParquetSink(Sink):
+    """
+    Writes each load as Parquet files (zstd) in a landing directory, partitioned by table, competition,
+    season and load date (see the module docstring).
+
+    A file is written under a temporary name and renamed, so readers never see a partial file.
+    """
+    def __init__(self, root: str, compression: str = 'zstd'):
+        self.root = root
+        self.compression = compression
+
+    def write(self, df: pd.DataFrame, schema: str, table: str) -> int:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if df.empty:
+            return 0
+        df = df.reset_index(drop=True)
+        stamp = datetime.datetime.now(datetime.timezone.utc).strftime('%Y%m%dT%H%M%S%f')
+        keys = partition_keys(df)
+        for values, rows in keys.groupby(list(keys.columns), sort=False).groups.items():
+            values = values if isinstance(values, tuple) else (values,)
+            directory = os.path.join(self.root, table, *(f'{key}={value}' for key, value in zip(keys.columns, values)))
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(directory, f'part-{stamp}-{uuid.uuid4().hex[:8]}.parquet')
+            pq.write_table(pa.Table.from_pandas(df.loc[rows], preserve_index=False), path + '.tmp',
+                           compression=self.compression)
+            os.replace(path + '.tmp', path)
+        logging.info(f"{len(df)} rows of {table} landed in {os.path.join(self.root, table)}")
+        return len(df)
+
+
+def postgres_enabled(value: str = None) -> bool:
+    """
+    Whether the processors write to Postgres (see the module docstring).
+
+    Args:
+        value (str, optional): The list of sinks. Defaults to the `PROCESSOR_SINKS` variable.
+    """
+    if value is None:
+        value = os.getenv('PROCESSOR_SINKS', 'postgres')
+    return 'postgres' in (entry.strip() for entry in value.split(','))
+
+
+def sinks_from_env(value: str = None) -> List[Sink]:
+    """
+    Builds the sinks other than Postgres listed in `PROCESSOR_SINKS` (see the module docstring).
+
+    Args:
+        value (str, optional): The list of sinks. Defaults to the `PROCESSOR_SINKS` variable.
+
+    Returns:
+        List[Sink]: The sinks.
+
+    Raises:
+        ValueError: If a sink is unknown.
+    """
+    if value is None:
+        value = os.getenv('PROCESSOR_SINKS', 'postgres')
+
+    sinks = []
+    for entry in filter(None, (entry.strip() for entry in value.split(','))):
+        kind, _, path = entry.partition(':')
+        if kind == 'postgres':
+            continue
+        elif kind == 'parquet' and path:
+            sinks.append(ParquetSink(path))
+        else:
+            raise ValueError(f"Unknown sink: {entry}")
+    return sinks
+
+
+_sinks: List[Sink] = None
+_sinks_lock = threading.Lock()
+
+
+def get_sinks() -> List[Sink]:
+    """The sinks of the process other than Postgres, built once from the environment."""
+    global _sinks
+    with _sinks_lock:
+        if _sinks is None:
+            _sinks = sinks_from_env()
+        return _sinks
+
+
+def partition_table(path: str) -> str:
+    """
+    The table of a landing path: the last directory of the path that isn't a partition (`key=value`).
+
+    Args:
+        path (str): A landing directory, e.g. /data/landing/matches/competition=2021.
+
+    Returns:
+        str: The table, e.g. `matches`.
+    """
+    for part in reversed(os.path.normpath(os.path.abspath(path)).split(os.sep)):
+        if part and '=' not in part:
+            return part
+    raise ValueError(f"No table in the landing path {path}")
+
+
+def partition_filters(path: str) -> Dict[str, str]:
+    """
+    The partition levels of a landing path (`key=value` directories), e.g. {'competition': '2021'}.
+
+    Args:
+        path (str): A landing directory.
+
+    Returns:
+        Dict[str, str]: The value of each level of the path.
+    """
+    parts = os.path.normpath(os.path.abspath(path)).split(os.sep)
+    return dict(part.split('=', 1) for part in parts if '=' in part)
+
+
+def latest_loads(files: List[str]) -> List[str]:
+    """
+    Keeps the file of the latest load of each partition (below the load date): a load of a replaced
+    table has all the rows of its partition, so the older loads are superseded.
+
+    Args:
+        files (List[str]): The Parquet files of a landing directory.
+
+    Returns:
+        List[str]: The latest file of each partition, in the order of `files`.
+    """
+    latest = {}
+    for file in files:
+        directory = os.path.dirname(file)
+        if os.path.basename(directory).startswith('load_date='):
+            directory = os.path.dirname(directory)
+        # The files are named part-<UTC timestamp>-<id>, so the latest load has the greatest name
+        if directory not in latest or os.path.basename(file) > os.path.basename(latest[directory]):
+            latest[directory] = file
+    return [file for file in files if file in latest.values()]
+
+
+def _scope_delete(db: Database, schema: str, table: str, filters: Dict[str, str], columns: List[str]) -> None:
+    """Deletes the rows of the competition and season of a landing path (the whole table without them)."""
+    conditions, params = [], []
+    for key, value in filters.items():
+        if key == 'competition':
+            column = 'competition_id'
+        elif key == 'season':
+            column = 'season' if 'season' in columns else 'extract(year from season_start_date)'
+        else:
+            # A load date only selects the load to import, the table holds the rows of every load
+            continue
+        if value == DEFAULT_PARTITION:
+            conditions.append(f'{column} IS NULL')
+        else:
+            conditions.append(f'{column} = %s')
+            params.append(value)
+    if conditions:
+        db.execute_query(f"DELETE FROM {schema}.{table} WHERE {' AND '.join(conditions)}", params)
+    else:
+        db.execute_query(create_queries.TRUNCATE_TABLE.format(schema=schema, table=table))
+
+
+def import_partition(db: Database, path: str, schema: str = 'raw', table: str = None, truncate: bool = False,
+                     batch_rows: int = 50_000) -> int:
+    """
+    Bulk-imports the Parquet files of a landing partition (any level, e.g. a whole table, a competition
+    or a load date) into Postgres.
+
+    Most tables are replaced by each load, so only the latest load of each partition is imported. The
+    loads of the incremental tables (`INCREMENTAL_KEYS`) are all imported, oldest first, and upserted by
+    their key so the latest version of a row wins. The table is created from its DDL when it doesn't
+    exist, and the partitions needed by the rows when it is partitioned. The files are read in batches
+    of `batch_rows` rows, and imported in one transaction.
+
+    Args:
+        db (Database): The database to import into.
+        path (str): The landing directory.
+        schema (str, optional): The schema of the table. Defaults to 'raw'.
+        table (str, optional): The table. Defaults to the table of the path (see `partition_table`).
+        truncate (bool, optional): Delete the rows of the competition and season of the path first (the whole
+            table for a path without them), as a load of the processors replaces them. Defaults to False.
+        batch_rows (int, optional): Rows inserted at a time. Defaults to 50000.
+
+    Returns:
+        int: The rows imported.
+
+    Raises:
+        FileNotFoundError: If there is no Parquet file under the path.
+    """
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+
+    table = table or partition_table(path)
+    files = sorted(glob.glob(os.path.join(path, '**', '*.parquet'), recursive=True),
+                   key=lambda file: (os.path.basename(file), file))
+    if not files:
+        raise FileNotFoundError(f"No Parquet file in {path}")
+    keys = INCREMENTAL_KEYS.get(table)
+    if keys is None:
+        files = latest_loads(files)
+
+    # Columns that were all null in some loads are promoted to the type of the other loads
+    arrow_schema = pa.unify_schemas([pq.read_schema(file) for file in files], promote_options='permissive')
+
+    query = getattr(create_queries, table.upper()).format(schema=schema, table=table)
+    db.validate_table_exists(schema, table, query)
+
+    rows = 0
+    with db.transaction():
+        if truncate:
+            _scope_delete(db, schema, table, partition_filters(path), arrow_schema.names)
+        for file in files:
+            for batch in ds.dataset(file, schema=arrow_schema, format='parquet').to_batches(batch_size=batch_rows):
+                df = batch.to_pandas()
+                ensure_partitions(db, schema, table, df)
+                if keys is None:
+                    db.insert_pandas_bulk(df, f'{schema}.{table}')
+                else:
+                    # A row can only be upserted once per statement
+                    df = df.drop_duplicates(subset=keys, keep='last')
+                    db.upsert_pandas_bulk(df, f'{schema}.{table}', conflict_columns=keys)
+                rows += len(df)
+    logging.info(f"{rows} rows of {len(files)} files imported from {path} into {schema}.{table}")
+    return rows
@@ -0,0 +1,206 @@
+"""
+This module rebuilds league tables from the stored match results, for any competition, season and
+cut-off (a date or a matchday), without calling the API.
+
+The computation is vectorized: every finished match becomes two team rows (home and away), which are
+aggregated with a single group-by over (competition_id, season, team_id). Several competitions and
+seasons can be computed at once. The output has the columns of the `competitions_standings` table.
+
+Teams are ranked by points, goal difference and goals scored (then by name). Competitions breaking ties
+by head-to-head results (e.g. La Liga, Serie A) may differ from the official table on ties.
+"""
+from typing import List, Sequence
+import datetime
+import numpy as np
+import pandas as pd
+
+from contracts.matches_contract import Match
+from utils.database import Database
+from utils.flatten import flatten_matches
+
+# Stages counted in a league table (cups only have a table for their league/group phase)
+LEAGUE_STAGES = ('REGULAR_SEASON', 'LEAGUE_STAGE')
+FINISHED_STATUSES = ('FINISHED', 'AWARDED')
+
+# Columns read from the matches table
+MATCH_COLUMNS = [
+    'competition_id', 'season_start_date', 'utc_date', 'status', 'matchday', 'stage',
+    'home_team_id', 'home_team_name', 'home_team_short_name', 'home_team_tla', 'home_team_crest',
+    'away_team_id', 'away_team_name', 'away_team_short_name', 'away_team_tla', 'away_team_crest',
+    'full_time_home', 'full_time_away',
+]
+
+STANDINGS_COLUMNS = [
+    'competition_id', 'season', 'position', 'team_id', 'team_name', 'team_short_name', 'team_tla', 'team_crest',
+    'played_games', 'form', 'won', 'draw', 'lost', 'points', 'goals_for', 'goals_against', 'goal_difference',
+]
+
+TEAM_COLUMNS = ['team_id', 'team_name', 'team_short_name', 'team_tla', 'team_crest']
+
+
+def _team_rows(matches: pd.DataFrame, selected: np.ndarray, season: np.ndarray, utc_date: np.ndarray) -> pd.DataFrame:
+    """
+    Turns each selected match into one row per team (home rows first, then away rows), with the goals
+    scored and conceded by the team, sorted by team and latest match first. Only numeric columns are
+    stacked; `source` points at the stacked team details (see `_team_details`).
+    """
+    def stacked(home: str, away: str) -> np.ndarray:
+        return np.concatenate([matches[home].to_numpy()[selected], matches[away].to_numpy()[selected]]).astype('int64')
+
+    competition_id = np.tile(matches['competition_id'].to_numpy()[selected], 2)
+    season = np.tile(season, 2)
+    utc_date = np.tile(utc_date, 2)
+    team_id = stacked('home_team_id', 'away_team_id')
+    # np.lexsort sorts by the last key first
+    order = np.lexsort((-utc_date, team_id, season, competition_id))
+
+    goals_for = stacked('full_time_home', 'full_time_away')[order]
+    goals_against = stacked('full_time_away', 'full_time_home')[order]
+    outcome = np.sign(goals_for - goals_against)
+    return pd.DataFrame({
+        'competition_id': competition_id[order],
+        'season': season[order],
+        'team_id': team_id[order],
+        'goals_for': goals_for,
+        'goals_against': goals_against,
+        'won': (outcome > 0).astype('int64'),
+        'draw': (outcome == 0).astype('int64'),
+        'lost': (outcome < 0).astype('int64'),
+        'result': np.select([outcome > 0, outcome == 0], ['W', 'D'], default='L'),
+        'source': order,
+    })
+
+
+def _team_details(matches: pd.DataFrame, selected: np.ndarray, source: np.ndarray) -> dict:
+    """Reads the team details (name, short name, tla, crest) of the given stacked team rows."""
+    return {
+        column: np.concatenate([
+            matches[f'home_{column}'].to_numpy()[selected], matches[f'away_{column}'].to_numpy()[selected]
+        ])[source]
+        for column in TEAM_COLUMNS[1:]
+    }
+
+
+def _form(rows: pd.DataFrame, keys: List[str], form_length: int) -> pd.Series:
+    """Joins the latest results of each team (rows sorted latest first) into strings like "W,D,L"."""
+    rank = rows.groupby(keys, sort=False).cumcount()
+    recent = rows[rank < form_length].assign(rank=rank[rank < form_length])
+    wide = recent.pivot(index=keys, columns='rank', values='result').fillna('')
+    form = wide[0]
+    for position in range(1, wide.shape[1]):
+        form = form.str.cat(wide[position], sep=',')
+    return form.str.rstrip(',').rename('form')
+
+
+def compute_standings(matches: pd.DataFrame, as_of: datetime.datetime = None, matchday: int = None,
+                      stages: Sequence[str] = LEAGUE_STAGES, form_length: int = 5) -> pd.DataFrame:
+    """
+    Computes the league tables of every competition and season present in the matches.
+
+    Args:
+        matches (pd.DataFrame): Matches with the `MATCH_COLUMNS` (e.g. rows of the matches table).
+        as_of (datetime.datetime, optional): Only count the matches played up to this moment. Defaults to None.
+        matchday (int, optional): Only count the matches up to this matchday. Defaults to None.
+        stages (Sequence[str], optional): Stages to count. Defaults to `LEAGUE_STAGES`; None counts every stage.
+        form_length (int, optional): Number of results in the form. Defaults to 5.
+
+    Returns:
+        pd.DataFrame: One row per team, competition and season, with the `STANDINGS_COLUMNS`, ordered by position.
+            The form lists the latest results first, comma separated (e.g. "W,D,L"), as the API does.
+    """
+    mask = (
+        matches['status'].isin(FINISHED_STATUSES)
+        & matches['full_time_home'].notna()
+        & matches['full_time_away'].notna()
+    ).to_numpy()
+    utc_date = pd.to_datetime(matches['utc_date'], utc=True)
+    if as_of is not None:
+        as_of = pd.Timestamp(as_of)
+        as_of = as_of.tz_localize('UTC') if as_of.tzinfo is None else as_of
+        mask &= (utc_date <= as_of).to_numpy()
+    if matchday is not None:
+        mask &= (matches['matchday'] <= matchday).to_numpy()
+    if stages is not None:
+        mask &= matches['stage'].isin(stages).to_numpy()
+    selected = np.flatnonzero(mask)
+    if not len(selected):
+        return pd.DataFrame(columns=STANDINGS_COLUMNS)
+
+    # Few distinct start dates: each one is converted once
+    season_codes, season_starts = pd.factorize(matches['season_start_date'].to_numpy()[selected])
+    season = pd.DatetimeIndex(pd.to_datetime(season_starts)).year.to_numpy()[season_codes]
+
+    # Sorted latest match first, so the team details and the form come from the most recent matches
+    rows = _team_rows(matches, selected, season, utc_date.array.asi8[selected])
+    keys = ['competition_id', 'season', 'team_id']
+
+    grouped = rows.groupby(keys, sort=False)
+    standings = grouped[['won', 'draw', 'lost', 'goals_for', 'goals_against']].sum()
+    standings['played_games'] = grouped.size()
+    standings = standings.join(_form(rows, keys, form_length)).reset_index()
+    standings = standings.assign(**_team_details(matches, selected, grouped['source'].first().to_numpy()))
+
+    standings['points'] = standings['won'] * 3 + standings['draw']
+    standings['goal_difference'] = standings['goals_for'] - standings['goals_against']
+
+    standings = standings.sort_values(
+        ['competition_id', 'season', 'points', 'goal_difference', 'goals_for', 'team_name'],
+        ascending=[True, True, False, False, False, True],
+        ignore_index=True
+    )
+    standings['position'] = standings.groupby(['competition_id', 'season']).cumcount() + 1
+    return standings[STANDINGS_COLUMNS]
+
+
+def standings_from_matches(matches: List[Match], **kwargs) -> pd.DataFrame:
+    """
+    Computes the league tables from validated matches (see `compute_standings` for the arguments).
+
+    Args:
+        matches (List[Match]): The validated matches.
+
+    Returns:
+        pd.DataFrame: The league tables.
+    """
+    if not matches:
+        return pd.DataFrame(columns=STANDINGS_COLUMNS)
+    return compute_standings(flatten_matches(matches)['matches'], **kwargs)
+
+
+def recompute_standings(db: Database, schema: str, competition_id: int, season: int,
+                        as_of: datetime.datetime = None, matchday: int = None, table: str = 'matches') -> pd.DataFrame:
+    """
+    Rebuilds the league table of a competition season from the matches stored in the database.
+
+    Args:
+        db (Database): The database holding the matches.
+        schema (str): The schema of the matches table.
+        competition_id (int): The competition.
+        season (int): The season (starting year).
+        as_of (datetime.datetime, optional): Only count the matches played up to this moment. Defaults to None.
+        matchday (int, optional): Only count the matches up to this matchday ("the table on matchday N"). Defaults to None.
+        table (str, optional): The matches table. Defaults to 'matches'.
+
+    Returns:
+        pd.DataFrame: The league table, ordered by position.
+
+    Example:
+        recompute_standings(db, 'raw', competition_id=2021, season=2024, matchday=10)
+    """
+    conditions = ['competition_id = %(competition_id)s', 'extract(year from season_start_date) = %(season)s']
+    params = {'competition_id': int(competition_id), 'season': int(season)}
+    if as_of is not None:
+        # Also prunes the monthly partitions after the cut-off
+        conditions.append('utc_date <= %(as_of)s')
+        params['as_of'] = as_of
+    if matchday is not None:
+        conditions.append('matchday <= %(matchday)s')
+        params['matchday'] = int(matchday)
+
+    query = f"""
+        select {', '.join(MATCH_COLUMNS)}
+          from {schema}.{table}
+         where {' and '.join(conditions)}
+    """
+    matches = db.select_pandas(query, params)
+    return compute_standings(matches, as_of=as_of, matchday=matchday)
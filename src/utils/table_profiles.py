@@ -0,0 +1,168 @@
+"""
+This module profiles every load while it is still in memory and keeps the profiles in `meta.table_profiles`,
+one row per table, load and column (null count and percentage, distinct count, min and max).
+
+Profiling the DataFrame a processor already holds costs a few vectorized passes over it, and the stored
+profiles let the dashboard and alerting read the state of a table (and its drift between loads) without
+scanning it.
+"""
+from typing import Optional
+import logging
+import pandas as pd
+
+from utils.database import Database
+from utils.queries import create_queries
+
+PROFILE_SCHEMA = 'meta'
+PROFILE_TABLE = 'table_profiles'
+
+PROFILE_COLUMNS = ['column_name', 'data_type', 'row_count', 'null_count', 'null_percentage',
+                   'distinct_count', 'min_value', 'max_value']
+
+
+def _distinct_count(series: pd.Series) -> int:
+    try:
+        return int(series.nunique(dropna=True))
+    except TypeError:
+        # Unhashable values (e.g. dicts or lists not yet serialized)
+        return int(series.dropna().astype(str).nunique())
+
+
+def _min_max(series: pd.Series):
+    values = series.dropna()
+    if values.empty or pd.api.types.is_bool_dtype(values):
+        return None, None
+    try:
+        return str(values.min()), str(values.max())
+    except TypeError:
+        # Mixed or unordered types
+        return None, None
+
+
+def profile_dataframe(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Computes the statistics of every column of a DataFrame.
+
+    Args:
+        df (pd.DataFrame): The DataFrame about to be loaded.
+
+    Returns:
+        pd.DataFrame: One row per column, with the `PROFILE_COLUMNS`.
+    """
+    row_count = len(df)
+    null_counts = df.isna().sum()
+
+    records = []
+    for column in df.columns:
+        min_value, max_value = _min_max(df[column])
+        records.append({
+            'column_name': column,
+            'data_type': str(df[column].dtype),
+            'row_count': row_count,
+            'null_count': int(null_counts[column]),
+            'null_percentage': float(null_counts[column]) / row_count * 100 if row_count else 0.0,
+            'distinct_count': _distinct_count(df[column]),
+            'min_value': min_value,
+            'max_value': max_value,
+        })
+    return pd.DataFrame(records, columns=PROFILE_COLUMNS)
+
+
+def profile_drift(current: pd.DataFrame, previous: pd.DataFrame, null_threshold: float = 10.0) -> pd.DataFrame:
+    """
+    Compares the profile of a load with the profile of the previous load of the same table.
+
+    Args:
+        current (pd.DataFrame): The profile of the load.
+        previous (pd.DataFrame): The profile of the previous load.
+        null_threshold (float, optional): Change of the null percentage, in percentage points, considered a drift. Defaults to 10.
+
+    Returns:
+        pd.DataFrame: One row per column of either load, with the null percentage and distinct count of both
+        loads, their change and a `drifted` flag (null percentage moved beyond the threshold, or the column
+        appeared or disappeared).
+    """
+    columns = ['column_name', 'null_percentage', 'distinct_count']
+    drift = current[columns].merge(previous[columns], on='column_name', how='outer', suffixes=('', '_previous'))
+    drift['null_percentage_change'] = drift['null_percentage'] - drift['null_percentage_previous']
+    drift['distinct_count_change'] = drift['distinct_count'] - drift['distinct_count_previous']
+    drift['drifted'] = (
+        (drift['null_percentage_change'].abs() > null_threshold)
+        | drift['null_percentage'].isna()
+        | drift['null_percentage_previous'].isna()
+    )
+    return drift
+
+
+def _validate_table(db: Database) -> None:
+    db.validate_table_exists(
+        PROFILE_SCHEMA, PROFILE_TABLE,
+        create_queries.TABLE_PROFILES.format(schema=PROFILE_SCHEMA, table=PROFILE_TABLE)
+    )
+    db.execute_query(create_queries.TABLE_PROFILES_INDEXES.format(schema=PROFILE_SCHEMA, table=PROFILE_TABLE))
+
+
+def read_profile(db: Database, schema: str, table: str, before: str = None) -> pd.DataFrame:
+    """
+    Reads the profile of the latest load of a table.
+
+    Args:
+        db (Database): The database holding the profiles.
+        schema (str): The schema of the profiled table.
+        table (str): The profiled table.
+        before (str, optional): Only consider loads before this timestamp (e.g. to get the previous load). Defaults to None.
+
+    Returns:
+        pd.DataFrame: The profile (`load_timestamp` + `PROFILE_COLUMNS`), empty if the table was never profiled.
+    """
+    query = f"""
+        select load_timestamp, {', '.join(PROFILE_COLUMNS)}
+          from {PROFILE_SCHEMA}.{PROFILE_TABLE}
+         where schema_name = %(schema)s and table_name = %(table)s
+           and load_timestamp = (
+               select max(load_timestamp)
+                 from {PROFILE_SCHEMA}.{PROFILE_TABLE}
+                where schema_name = %(schema)s and table_name = %(table)s
+                  and (%(before)s::timestamp is null or load_timestamp < %(before)s::timestamp)
+           )
+    """
+    return db.select_pandas(query, {'schema': schema.lower(), 'table': table, 'before': before})
+
+
+def record_profile(db: Database, schema: str, table: str, df: pd.DataFrame, load_timestamp: str,
+                   null_threshold: float = 10.0) -> Optional[pd.DataFrame]:
+    """
+    Profiles a load, stores the profile and logs the columns that drifted since the previous load.
+
+    Args:
+        db (Database): The database holding the profiles.
+        schema (str): The schema of the loaded table.
+        table (str): The loaded table.
+        df (pd.DataFrame): The rows of the load.
+        load_timestamp (str): The ISO timestamp of the load.
+        null_threshold (float, optional): See `profile_drift`. Defaults to 10.
+
+    Returns:
+        Optional[pd.DataFrame]: The drift against the previous load, or None if it's the first profiled load.
+    """
+    _validate_table(db)
+
+    profile = profile_dataframe(df)
+    db.upsert_pandas_bulk(
+        profile.assign(schema_name=schema.lower(), table_name=table, load_timestamp=load_timestamp),
+        f'{PROFILE_SCHEMA}.{PROFILE_TABLE}',
+        conflict_columns=['schema_name', 'table_name', 'load_timestamp', 'column_name']
+    )
+
+    previous = read_profile(db, schema, table, before=load_timestamp)
+    if previous.empty:
+        return None
+
+    drift = profile_drift(profile, previous, null_threshold)
+    for row in drift[drift['drifted']].itertuples(index=False):
+        logging.warning(
+            f"Profile drift on {schema}.{table}.{row.column_name}: "
+            f"nulls {row.null_percentage_previous}% -> {row.null_percentage}%, "
+            f"distinct {row.distinct_count_previous} -> {row.distinct_count}"
+        )
+    return drift
@@ -11,19 +11,53 @@ Classes:
 from utils.football_api import FootballAPIBase
 from typing import Dict, Any
 import pandas as pd
-import json
 import os
 import datetime
 import time
 
+from utils.parallel import ShardPool
 from utils.processor import Processor
 from utils.database import Database
-from utils.queries import create_queries 
+from utils.flatten import flatten_matches, flatten_teams
+from utils.history import squads_history
 from contracts.teams_contract import TeamsResponse
 from contracts.matches_contract import MatchesTodayResponse
+from utils.matches_api import notify_match_changes, write_match_referees
 
 pd.set_option('display.max_colwidth', None)
 
+
+def transform_teams(response: Dict[str, Any], competition_id: int) -> Dict[str, pd.DataFrame]:
+    """
+    Validates the teams of a competition and flattens them (a shard of the processing pool, see `utils.parallel`).
+
+    Args:
+        response (Dict[str, Any]): The response of `TeamsAPI.get_teams`.
+        competition_id (int): The competition the teams were retrieved for.
+
+    Returns:
+        Dict[str, pd.DataFrame]: The rows of the `teams` table and of its child tables.
+    """
+    return flatten_teams(TeamsResponse(**response).teams, competition_id)
+
+
+def transform_team_matches(response: Dict[str, Any]) -> Dict[str, pd.DataFrame]:
+    """
+    Validates the upcoming matches of a team and flattens them (a shard of the processing pool, see `utils.parallel`).
+
+    Args:
+        response (Dict[str, Any]): The response of `TeamsAPI.get_team_upcoming_matches`.
+
+    Returns:
+        Dict[str, pd.DataFrame]: The rows of the `teams_upcoming_matches` table and of the referees.
+    """
+    team_matches_data = MatchesTodayResponse(**response)
+    flat_matches = flatten_matches(team_matches_data.matches)
+    df = flat_matches['matches']
+    df['date_from'] = team_matches_data.filters.date_from
+    df['date_to'] = team_matches_data.filters.date_to
+    return {'teams_upcoming_matches': df, 'match_referees': flat_matches['match_referees']}
+
 class TeamsAPI(FootballAPIBase):
     """
     Handles API interactions for fetching team-related data.
@@ -81,8 +115,9 @@ class TeamsProcessor(Processor):
 
     Methods:
         - process: Fetches, transforms, and loads team data into the database.
-        - _write_to_db: Writes processed data to the database.
     """
+    # Child tables written together with the teams
+    CHILD_TABLES = ('team_players', 'team_staff', 'team_running_competitions')
 
     def __init__(self, api_connection: TeamsAPI, competition_ids: list, schema = 'RAW', table = None):
         """
@@ -119,69 +154,38 @@ class TeamsProcessor(Processor):
         """
         self.logger.info(f"Start Processing - {self.table}")
 
-        teams_data = []
-
         competition_ids_result = self.db.select(table=f'{self.schema}.competitions', columns='distinct id')
         competition_ids = [row[0] for row in competition_ids_result]
 
         self.logger.info(f"Competition IDs to be retrieved: {competition_ids}")
         
-        for competition_id in competition_ids:
-            self.logger.info(f'Retrieving data for competition id: {competition_id}')
-            team_data = TeamsResponse(**self.api_connection.get_teams(competition_id))
-            # Converting into dict and then creating the Dataframe
-            teams_dict = [comp.model_dump() for comp in team_data.teams]
-            df = pd.DataFrame(teams_dict)
-            df['competition_id'] = competition_id
-
-            teams_data.append(df)
-
-        final_competition_teams_df = pd.concat(teams_data)
-        
-        # Convert area and season coluns into json format (if they are not null)
-        final_competition_teams_df['area'] = final_competition_teams_df['area'].apply(lambda x: json.dumps(x) if isinstance(x, dict) else None)
-        final_competition_teams_df['squad'] = final_competition_teams_df['squad'].apply(lambda x: json.dumps([element for element in x if isinstance(element, dict)], default=str) if isinstance(x, list) else None)
-        final_competition_teams_df['staff'] = final_competition_teams_df['staff'].apply(lambda x: json.dumps([element for element in x if isinstance(element, dict)], default=str) if isinstance(x, list) else None)
-        final_competition_teams_df['running_competitions'] = final_competition_teams_df['running_competitions'].apply(lambda x: json.dumps([element for element in x if isinstance(element, dict)]) if isinstance(x, list) else None)
-        final_competition_teams_df['coach'] = final_competition_teams_df['coach'].apply(lambda x: json.dumps(x, default=str) if isinstance(x, dict) else None)
-        final_competition_teams_df.rename(columns={'id': 'team_id'}, inplace=True)
+        # One shard per competition: the teams are validated and flattened into typed columns and the
+        # squad/staff/running competitions child tables in the pool while the next competitions are fetched
+        with ShardPool(self.workers) as pool:
+            shards = []
+            for competition_id in competition_ids:
+                self.logger.info(f'Retrieving data for competition id: {competition_id}')
+                shards.append(pool.submit(transform_teams, self._fetch(self.api_connection.get_teams, competition_id), competition_id))
+
+            with self.stage('transform') as stage:
+                teams_data = [shard.result() for shard in shards]
+                stage.rows = sum(len(tables['teams']) for tables in teams_data)
 
         load_timesamp = datetime.datetime.now(datetime.timezone.utc).isoformat() 
-        
-        metadata = {
-            "load_timestamp": [load_timesamp] * len(final_competition_teams_df),
-        }
 
-        metadata_df = pd.DataFrame(metadata, index=final_competition_teams_df.index)
+        # The teams table first: the child tables are only meaningful with their teams loaded
+        for table in (self.table, *self.CHILD_TABLES):
+            key = 'teams' if table == self.table else table
+            df = pd.concat([tables[key] for tables in teams_data], ignore_index=True)
+            df['load_timestamp'] = load_timesamp
 
-        df_with_metadata = pd.concat([final_competition_teams_df, metadata_df], axis=1)
-    
-        # Verifying the Dataframe
-        # self.logger.info(df_with_metadata)
-        self.logger.info(f"Writing to Database - {self.table}:")
-        self._write_to_db(df_with_metadata)
-
-    def _write_to_db(self, df: pd.DataFrame) -> None:
-        """
-        Writes the processed DataFrame to the database.
-
-        Args:
-            df (pd.DataFrame): The DataFrame to write to the database.
-        """
+            self.logger.info(f"Writing to Database - {table}:")
+            self._write_to_db(df, table)
 
-        query = getattr(create_queries, self.table.upper()).format(
-            schema=self.schema,
-            table=self.table
-        )
-        # Verify and create the table if necessary
-        self.db.validate_table_exists(self.schema, self.table, query)
-        self.db.execute_query(
-            create_queries.TRUNCATE_TABLE.format(
-                schema=self.schema,
-                table=self.table
-            )
-        )
-        self.db.insert_pandas_bulk(df,f'{self.schema}.{self.table}')
+            # The raw table only keeps the last load, the history keeps the squad changes
+            if table == 'team_players' and self.write_postgres:
+                self.logger.info(f"Appending changes to the history - {table}:")
+                squads_history(self.db, self.schema).append(df, load_timesamp)
 
 class TeamUpcomingMatchesProcessor(Processor):
     """
@@ -226,37 +230,27 @@ class TeamUpcomingMatchesProcessor(Processor):
         """
         self.logger.info(f"Start Processing - {self.table}")
 
-        teams_matches_data = []
-
         teams_ids_result = self.db.select(table=f'{self.schema}.teams', columns='distinct team_id')
         teams_ids = [row[0] for row in teams_ids_result]
         # teams_ids = [86]
 
         self.logger.info(f"Team IDs to be retrieved: {teams_ids}")
         
-        for team_id in teams_ids:
-            self.logger.info(f'Retrieving data for team id: {team_id}')
-            team_matches_data = MatchesTodayResponse(**self.api_connection.get_team_upcoming_matches(team_id))
-            # Converting into dict and then creating the dataframe
-            teams_matches_dict = [comp.model_dump() for comp in team_matches_data.matches]
-            df = pd.DataFrame(teams_matches_dict)
-            df['date_from'] = team_matches_data.filters.date_from
-            df['date_to'] = team_matches_data.filters.date_to
-
-            teams_matches_data.append(df)
+        # One shard per team: the matches are validated and flattened into typed columns and the referees child table in the pool
+        with ShardPool(self.workers) as pool:
+            shards = []
+            for team_id in teams_ids:
+                self.logger.info(f'Retrieving data for team id: {team_id}')
+                shards.append(pool.submit(transform_team_matches, self._fetch(self.api_connection.get_team_upcoming_matches, team_id)))
+
+            with self.stage('transform') as stage:
+                flat_matches = [shard.result() for shard in shards]
+                teams_matches_data = [flat['teams_upcoming_matches'] for flat in flat_matches]
+                stage.rows = sum(len(df) for df in teams_matches_data)
 
         final_teams_matches_df = pd.concat(teams_matches_data)
+        referees = pd.concat([flat['match_referees'] for flat in flat_matches], ignore_index=True)
         
-        # Convert area and season coluns into json format (if they are not null)
-        final_teams_matches_df['area'] = final_teams_matches_df['area'].apply(lambda x: json.dumps(x) if isinstance(x, dict) else None)
-        final_teams_matches_df['competition'] = final_teams_matches_df['competition'].apply(lambda x: json.dumps(x) if isinstance(x, dict) else None)
-        final_teams_matches_df['season'] = final_teams_matches_df['season'].apply(lambda x: json.dumps(x, default=str) if isinstance(x, dict) else None)
-        final_teams_matches_df['home_team'] = final_teams_matches_df['home_team'].apply(lambda x: json.dumps(x) if isinstance(x, dict) else None)
-        final_teams_matches_df['away_team'] = final_teams_matches_df['away_team'].apply(lambda x: json.dumps(x) if isinstance(x, dict) else None)
-        final_teams_matches_df['score'] = final_teams_matches_df['score'].apply(lambda x: json.dumps(x) if isinstance(x, dict) else None)
-        final_teams_matches_df['odds'] = final_teams_matches_df['odds'].apply(lambda x: json.dumps(x) if isinstance(x, dict) else None)
-        final_teams_matches_df['referees'] = final_teams_matches_df['referees'].apply(lambda x: json.dumps([element for element in x if isinstance(element, dict)], default=str) if isinstance(x, list) else None)
-
         load_timesamp = datetime.datetime.now(datetime.timezone.utc).isoformat() 
         
         metadata = {
@@ -266,29 +260,25 @@ class TeamUpcomingMatchesProcessor(Processor):
         metadata_df = pd.DataFrame(metadata, index=final_teams_matches_df.index)
 
         df_with_metadata = pd.concat([final_teams_matches_df, metadata_df], axis=1)
-    
-        df_with_metadata.to_csv('teams_matches', index=False)
+
         self.logger.info(f"Writing to Database - {self.table}:")
         self._write_to_db(df_with_metadata)
+        if self.write_postgres:
+            write_match_referees(self.db, self.schema, referees, load_timesamp)
+        self._land(referees.drop_duplicates(subset=['match_id', 'referee_id']).assign(load_timestamp=load_timesamp), 'match_referees')
 
-    def _write_to_db(self, df: pd.DataFrame) -> None:
+    def _write_to_db(self, df: pd.DataFrame, table: str = None) -> None:
         """
-        Writes the processed DataFrame to the database.
+        Writes the processed DataFrame to the database and notifies the dashboard that the table was replaced.
+
+        A match between two of the teams is in the upcoming matches of both, it is only written once
+        (the table is keyed by the match id).
 
         Args:
             df (pd.DataFrame): The DataFrame to write to the database.
+            table (str, optional): The table to write to. Defaults to the table of the processor.
         """
-
-        query = getattr(create_queries, self.table.upper()).format(
-            schema=self.schema,
-            table=self.table
-        )
-        # Verify and create the table if necessary
-        self.db.validate_table_exists(self.schema, self.table, query)
-        self.db.execute_query(
-            create_queries.TRUNCATE_TABLE.format(
-                schema=self.schema,
-                table=self.table
-            )
-        )
-        self.db.insert_pandas_bulk(df,f'{self.schema}.{self.table}')
\ No newline at end of file
+        df = df.drop_duplicates(subset='id', keep='last').reset_index(drop=True)
+        super()._write_to_db(df, table)
+        if self.write_postgres:
+            notify_match_changes(self.db, f'{self.schema}.{table or self.table}', reload=True)
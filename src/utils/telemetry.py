@@ -0,0 +1,287 @@
+"""
+This module collects the metrics of the processing stages (fetch, validate, transform, serialize, load)
+and sends them to one or more backends, independently of logfire being reachable.
+
+Every stage run by a processor (see `Processor.stage`) produces a `StageRecord`: its duration, rows and
+bytes. The records go to the backends configured by the `PROCESSOR_METRICS` environment variable, a
+comma separated list of:
+- `logfire`: logfire metrics (histogram of the durations, counters of rows and bytes).
+- `jsonl:<path>`: one JSON line per stage appended to a local file.
+- `prometheus:<path>`: a Prometheus textfile (node_exporter textfile collector) with the last run of
+  each stage of each processor.
+
+Without the variable, the logfire metrics are sent when telemetry is enabled, and nothing else.
+
+Telemetry (logfire tracing, its logging handler and the requests/psycopg instrumentation) is configured
+once per process by `configure_telemetry`, and only when enabled: `TELEMETRY_ENABLED=true`, or a
+`LOGFIRE_TOKEN` set when the variable is absent. logfire is only imported then; otherwise the spans of
+the stages are no-ops and the logs go to the console.
+"""
+from typing import Dict, List, Optional, Tuple
+import abc
+import dataclasses
+import datetime
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+
+# The processors transforming in a processing pool (teams, upcoming and today's matches, see `utils.parallel`)
+# validate each response with its flattening, in their `transform` stage: they have no `validate` stage.
+STAGES = ('fetch', 'validate', 'transform', 'serialize', 'load')
+
+
+@dataclasses.dataclass
+class StageRecord:
+    """
+    One run of a processing stage.
+
+    Attributes:
+        processor (str): The processor name.
+        table (str): The table being processed.
+        stage (str): One of `STAGES`.
+        seconds (float): Duration of the stage.
+        rows (int): Rows (or items) produced by the stage, when known.
+        bytes (int): Bytes handled by the stage (e.g. the response size of a fetch), when known.
+        error (str): The exception type, if the stage failed.
+        timestamp (str): When the stage ended (ISO, UTC).
+    """
+    processor: str
+    table: Optional[str]
+    stage: str
+    seconds: float = 0.0
+    rows: Optional[int] = None
+    bytes: Optional[int] = None
+    error: Optional[str] = None
+    timestamp: Optional[str] = None
+
+
+_configured: Optional[bool] = None
+_configure_lock = threading.Lock()
+
+
+def telemetry_enabled() -> bool:
+    """Whether logfire telemetry is enabled (see the module docstring)."""
+    value = os.getenv('TELEMETRY_ENABLED')
+    if value is not None:
+        return value.strip().lower() in ('1', 'true', 'yes')
+    return bool(os.getenv('LOGFIRE_TOKEN'))
+
+
+def configure_telemetry() -> bool:
+    """
+    Configures the logging of the process and, when telemetry is enabled, logfire with the requests
+    and psycopg instrumentation. Only the first call does something.
+
+    Returns:
+        bool: Whether telemetry is enabled.
+    """
+    global _configured
+    with _configure_lock:
+        if _configured is None:
+            handlers = None
+            if telemetry_enabled():
+                import logfire
+                logfire.configure()
+                logfire.instrument_requests()
+                logfire.instrument_psycopg()
+                handlers = [logfire.LogfireLoggingHandler()]
+            else:
+                # logfire's pydantic plugin (an entry point) would otherwise import it with the first contract
+                os.environ.setdefault('PYDANTIC_DISABLE_PLUGINS', 'logfire-plugin')
+            logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s', handlers=handlers)
+            _configured = telemetry_enabled()
+        return _configured
+
+
+class _NoopSpan:
+    """Stands for a logfire span when telemetry is disabled."""
+    def __enter__(self) -> '_NoopSpan':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        pass
+
+    def set_attributes(self, attributes: dict) -> None:
+        pass
+
+
+def span(name: str, **attributes):
+    """
+    A logfire span when telemetry is enabled, a no-op otherwise.
+
+    Args:
+        name (str): The span message template (e.g. '{processor} {stage}').
+        **attributes: The attributes of the span.
+    """
+    if configure_telemetry():
+        import logfire
+        return logfire.span(name, **attributes)
+    return _NoopSpan()
+
+
+class MetricsBackend(abc.ABC):
+    @abc.abstractmethod
+    def record(self, record: StageRecord) -> None:
+        """Sends the record of a stage."""
+        pass
+
+
+class LogfireMetrics(MetricsBackend):
+    """Stage durations as a logfire histogram, rows and bytes as counters."""
+    def __init__(self):
+        import logfire
+        self.duration = logfire.metric_histogram('processor.stage.duration', unit='s', description='Duration of the processing stages')
+        self.rows = logfire.metric_counter('processor.stage.rows', unit='1', description='Rows produced by the processing stages')
+        self.bytes = logfire.metric_counter('processor.stage.bytes', unit='By', description='Bytes handled by the processing stages')
+
+    def record(self, record: StageRecord) -> None:
+        attributes = {'processor': record.processor, 'table': record.table or '', 'stage': record.stage,
+                      'error': record.error or ''}
+        self.duration.record(record.seconds, attributes)
+        if record.rows:
+            self.rows.add(record.rows, attributes)
+        if record.bytes:
+            self.bytes.add(record.bytes, attributes)
+
+
+class JsonLinesMetrics(MetricsBackend):
+    """Appends every record as a JSON line to a local file."""
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def record(self, record: StageRecord) -> None:
+        line = json.dumps(dataclasses.asdict(record))
+        with self._lock:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as file:
+                file.write(line + '\n')
+
+
+class PrometheusTextfileMetrics(MetricsBackend):
+    """
+    Writes the last run of each stage of each processor as gauges in a Prometheus textfile.
+
+    Stages called several times in a run (e.g. one fetch per competition) are summed. The series of
+    the other processors already in the file are kept, so every processor can share the same file.
+    The file is replaced atomically, as the textfile collector requires.
+    """
+    PREFIX = 'football_processor_stage'
+    METRICS = {
+        'seconds': 'Duration of the stage in the last run of the processor, in seconds.',
+        'rows': 'Rows produced by the stage in the last run of the processor.',
+        'bytes': 'Bytes handled by the stage in the last run of the processor.',
+        'calls': 'Times the stage ran in the last run of the processor.',
+        'errors': 'Times the stage failed in the last run of the processor.',
+        'last_timestamp_seconds': 'Unix time the stage last ended.',
+    }
+    LINE = re.compile(r'^(\w+)\{(.*)\} (\S+)$')
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._series: Dict[Tuple[str, str], float] = self._read()
+        self._started = set()
+
+    def _read(self) -> Dict[Tuple[str, str], float]:
+        series = {}
+        try:
+            with open(self.path, encoding='utf-8') as file:
+                for line in file:
+                    match = self.LINE.match(line.strip())
+                    if match:
+                        series[(match.group(1), match.group(2))] = float(match.group(3))
+        except FileNotFoundError:
+            pass
+        return series
+
+    def record(self, record: StageRecord) -> None:
+        labels = f'processor="{record.processor}",stage="{record.stage}",table="{record.table or ""}"'
+        ended_at = datetime.datetime.fromisoformat(record.timestamp).timestamp() if record.timestamp else 0.0
+        with self._lock:
+            if labels not in self._started:
+                # First time in this run: the values of the previous run are replaced
+                for metric in self.METRICS:
+                    self._series[(f'{self.PREFIX}_{metric}', labels)] = 0.0
+                self._started.add(labels)
+            values = {'seconds': record.seconds, 'rows': record.rows or 0, 'bytes': record.bytes or 0,
+                      'calls': 1, 'errors': 1 if record.error else 0}
+            for metric, value in values.items():
+                self._series[(f'{self.PREFIX}_{metric}', labels)] += value
+            self._series[(f'{self.PREFIX}_last_timestamp_seconds', labels)] = ended_at
+            self._write()
+
+    def _write(self) -> None:
+        lines = []
+        for metric, description in self.METRICS.items():
+            name = f'{self.PREFIX}_{metric}'
+            lines += [f'# HELP {name} {description}', f'# TYPE {name} gauge']
+            lines += [f'{name}{{{labels}}} {value:g}' for (series, labels), value in sorted(self._series.items()) if series == name]
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as file:
+            file.write('\n'.join(lines) + '\n')
+        os.replace(tmp_path, self.path)
+
+
+def backends_from_env(value: str = None) -> List[MetricsBackend]:
+    """
+    Builds the backends listed in `PROCESSOR_METRICS` (see the module docstring).
+
+    Args:
+        value (str, optional): The list of backends. Defaults to the `PROCESSOR_METRICS` variable.
+
+    Returns:
+        List[MetricsBackend]: The backends.
+
+    Raises:
+        ValueError: If a backend is unknown.
+    """
+    if value is None:
+        value = os.getenv('PROCESSOR_METRICS', 'logfire' if telemetry_enabled() else '')
+
+    backends = []
+    for entry in filter(None, (entry.strip() for entry in value.split(','))):
+        kind, _, path = entry.partition(':')
+        if kind == 'logfire':
+            backends.append(LogfireMetrics())
+        elif kind == 'jsonl' and path:
+            backends.append(JsonLinesMetrics(path))
+        elif kind == 'prometheus' and path:
+            backends.append(PrometheusTextfileMetrics(path))
+        else:
+            raise ValueError(f"Unknown metrics backend: {entry}")
+    return backends
+
+
+_backends: Optional[List[MetricsBackend]] = None
+_backends_lock = threading.Lock()
+
+
+def get_backends() -> List[MetricsBackend]:
+    """The backends of the process, built once from the environment."""
+    global _backends
+    with _backends_lock:
+        if _backends is None:
+            _backends = backends_from_env()
+        return _backends
+
+
+def emit(record: StageRecord, backends: List[MetricsBackend] = None) -> None:
+    """
+    Sends the record of a stage to the backends. A failing backend is only logged, metrics must
+    never fail a load.
+
+    Args:
+        record (StageRecord): The record.
+        backends (List[MetricsBackend], optional): Defaults to the backends of the process (see `get_backends`).
+    """
+    for backend in get_backends() if backends is None else backends:
+        try:
+            backend.record(record)
+        except Exception as e:
+            logging.warning(f"Could not send the metrics of {record.processor}.{record.stage} to {type(backend).__name__}: {e}")
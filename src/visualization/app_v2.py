@@ -13,6 +13,9 @@ pages = {
     ],
     "API Summary":[
         st.Page("pages/football_api_data_overview.py", title="API Data Summary"),   
+    ],
+    "Admin": [
+        st.Page("pages/admin.py", title="Query Cache"),
     ]
 }
 
@@ -0,0 +1,40 @@
+import streamlit as st
+
+from utils.data_access import get_query_stats, clear_caches
+
+def admin_summary():
+    st.title("Admin - Query Cache")
+
+    df_stats = get_query_stats().to_frame()
+
+    if df_stats.empty:
+        st.markdown("**No queries were executed since the app started.**")
+    else:
+        total_calls = int(df_stats["calls"].sum())
+        total_hits = int(df_stats["hits"].sum())
+
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Queries", total_calls)
+        col2.metric("Cache Hit Rate", f"{total_hits / total_calls * 100:.1f}%")
+        col3.metric("Avg Latency", f"{df_stats['avg_ms'].mean():.1f} ms")
+
+        st.dataframe(df_stats.sort_values("calls", ascending=False),
+                     use_container_width=True,
+                     hide_index=True,
+                     column_config={
+                            "query": "Query",
+                            "calls": "Calls",
+                            "hits": "Hits",
+                            "misses": "Misses",
+                            "hit_rate": st.column_config.NumberColumn("Hit Rate", format="%.1f%%"),
+                            "avg_ms": st.column_config.NumberColumn("Avg (ms)", format="%.1f"),
+                            "max_ms": st.column_config.NumberColumn("Max (ms)", format="%.1f"),
+                            "last_ms": st.column_config.NumberColumn("Last (ms)", format="%.1f"),
+                     },
+        )
+
+    if st.button("Clear caches"):
+        clear_caches()
+        st.rerun()
+
+admin_summary()
@@ -1,72 +1,71 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
 
-from utils.gpt_prompt import generate_gpt_prompt, get_gpt_report
-from utils.database import get_connection
+from utils.gpt_prompt import show_gpt_report
+from utils.profiling import list_profiled_tables, load_profiles, profile_table
 
 def data_quality_summary():
-    def get_columns(table_name):
-        """
-        Retorna os nomes das colunas para uma tabela específica no schema 'raw'.
-        """
-        conn = get_connection()
-        query = f"""
-            SELECT column_name
-            FROM information_schema.columns
-            WHERE table_schema = 'raw' AND table_name = '{table_name.split('.')[1]}';
-        """
-        with conn.cursor() as cur:
-            cur.execute(query)
-            columns = [row[0] for row in cur.fetchall()]
-        conn.close()
-        return columns
-
-    def get_null_percentage(table_name, columns):
-        """
-        Retorna a porcentagem de nulos para cada coluna da tabela fornecida.
-        """
-        conn = get_connection()
-        # Gerando a parte da query para contar os nulos por coluna
-        column_checks = ", ".join([f"COUNT(CASE WHEN {col} IS NULL THEN 1 END) AS {col}_nulls" for col in columns])
-        query = f"""
-            SELECT COUNT(*) AS total_rows, {column_checks}
-            FROM {table_name};
-        """
-        with conn.cursor() as cur:
-            cur.execute(query)
-            result = cur.fetchone()
-
-        conn.close()
-        total_rows = result[0]
-        null_percentages = {columns[i]: (result[i+1] / total_rows) * 100 for i in range(len(columns))}
-        return null_percentages
-
-    def validate_data_quality(table_name):
-        """
-        Valida a qualidade dos dados para a tabela, calculando a porcentagem de nulos por coluna.
-        """
-        columns = get_columns(table_name)
-        null_percentages = get_null_percentage(table_name, columns)
-        
-        # Criando o DataFrame para exibição
-        df_results = pd.DataFrame(list(null_percentages.items()), columns=["column", "null_percentage"])
-        
-        return df_results
-        
     st.title("Data Quality")
+    tables = [f"raw.{table}" for table in list_profiled_tables()]
     table_name = st.selectbox("Choose the table name:", 
-                                options=["raw.teams","raw.competitions"], 
+                                options=tables, 
                                 key="raw.teams")
 
     if table_name:    
-        df_results = validate_data_quality(table_name)
+        profile = profile_table(table_name.split('.')[1])
+        df_results = profile["columns"]
+
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Rows", f"{profile['rows']:,}")
+        col2.metric("Columns", len(df_results))
+        col3.metric("Sample", f"{profile['sample_percent']}%" if profile["sample_percent"] else "Full scan")
+
+        st.subheader("Column Profile")
+        st.dataframe(df_results, use_container_width=True, hide_index=True,
+                     column_config={
+                            "column": "Column",
+                            "data_type": "Type",
+                            "null_percentage": st.column_config.NumberColumn("% Nulls", format="%.2f%%"),
+                            "distinct": "Distinct",
+                            "min": "Min",
+                            "max": "Max",
+                     },
+        )
+
+        if not profile["json_keys"].empty:
+            st.subheader("JSONB Key Coverage")
+            st.dataframe(profile["json_keys"], use_container_width=True, hide_index=True,
+                         column_config={
+                                "column": "Column",
+                                "key": "Key",
+                                "rows": "Rows",
+                                "coverage_percentage": st.column_config.NumberColumn("% Coverage", format="%.2f%%"),
+                         },
+            )
+
+        df_load_profiles = load_profiles(table_name.split('.')[1])
+        if not df_load_profiles.empty:
+            st.subheader("Last Load Profile")
+            st.markdown(f"**Load:** {df_load_profiles['load_timestamp'].iloc[0]} "
+                        f"({int(df_load_profiles['row_count'].iloc[0]):,} rows)")
+            st.dataframe(df_load_profiles[["column_name", "null_percentage", "null_percentage_previous",
+                                           "null_percentage_change", "distinct_count", "distinct_count_previous"]],
+                         use_container_width=True, hide_index=True,
+                         column_config={
+                                "column_name": "Column",
+                                "null_percentage": st.column_config.NumberColumn("% Nulls", format="%.2f%%"),
+                                "null_percentage_previous": st.column_config.NumberColumn("% Nulls (previous load)", format="%.2f%%"),
+                                "null_percentage_change": st.column_config.NumberColumn("Change", format="%+.2f"),
+                                "distinct_count": "Distinct",
+                                "distinct_count_previous": "Distinct (previous load)",
+                         },
+            )
 
         # Filtra as colunas que têm nulos
-        df_results_filtered = df_results[df_results["null_percentage"] > 0]
+        df_results_filtered = df_results.loc[df_results["null_percentage"] > 0, ["column", "null_percentage"]]
 
         if df_results_filtered.empty:
-            report = """**Data Quality Automated report didn't find any values to report**"""
+            st.markdown("""**Data Quality Automated report didn't find any values to report**""")
         else:
             # Null values graph
             st.subheader("Null Values Percentage per Column")
@@ -80,9 +79,7 @@ def data_quality_summary():
             )
             st.plotly_chart(fig)
             st.header("Open AI Report - Data Quality Recommendations")
-            prompt = generate_gpt_prompt(df_results_filtered, table_name)
-            report = get_gpt_report(prompt)
-        st.markdown(report)
+            show_gpt_report(df_results_filtered, table_name)
 
 
-data_quality_summary()
\ No newline at end of file
+data_quality_summary()
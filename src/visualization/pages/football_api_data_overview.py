@@ -2,12 +2,11 @@ import streamlit as st
 import pandas as pd
 import altair as alt
 
-from utils.database import get_connection
+from utils.data_access import read_sql
 
 try:
-    conn = get_connection()
     query = "SELECT * FROM marts.mart_fbs__competitions LIMIT 20"
-    df = pd.read_sql(query, conn)
+    df = read_sql(query, name="football_api_data_overview.competitions")
 except Exception as e:
     st.error(f"Error to connect to PostgreSQL: {e}")
 
@@ -1,38 +1,65 @@
 import streamlit as st
 import pandas as pd
 
-from utils.database import get_connection
+from utils.data_access import pooled_connection
+from utils.match_listener import get_match_listener
 
-def matches_today_summary():
+# Raw table the loaders notify about and interval (in seconds) the listener log is checked
+SOURCE_TABLE = "raw.matches_today"
+REFRESH_SECONDS = 5
+
+MATCHES_TODAY_QUERY = """select id, match_area_flag, match_area_code, competition_name,
+                                home_team_crest, home_team_short_name, home_final_score,
+                                away_final_score, away_team_short_name, away_team_crest,
+                                status, utc_date, date_from
+                            from staging.stg_fb__matches_today"""
+
+def load_matches_today(ids=None):
+    """
+    Loads today's matches. When ids are given, only those matches are loaded.
+    """
+    # Not cached: the listener already tells which rows changed
+    with pooled_connection() as conn:
+        if ids is None:
+            return pd.read_sql(MATCHES_TODAY_QUERY, conn)
+        return pd.read_sql(MATCHES_TODAY_QUERY + " where id = any(%(ids)s)", conn, params={"ids": list(ids)})
+
+def refresh_matches_today():
+    """
+    Keeps the matches of the session current, reloading only the matches notified by the loaders.
+    """
+    listener = get_match_listener()
+
+    if "matches_today" not in st.session_state:
+        # Read the sequence before loading, so nothing notified during the load is missed
+        st.session_state.matches_today_seq = listener.last_seq
+        st.session_state.matches_today = load_matches_today()
+        return st.session_state.matches_today
+
+    ids, deleted_ids, reload, seq = listener.changes_since(st.session_state.matches_today_seq, SOURCE_TABLE)
+    df_matches_today = st.session_state.matches_today
+
+    if reload:
+        df_matches_today = load_matches_today()
+    elif ids or deleted_ids:
+        df_matches_today = df_matches_today[~df_matches_today["id"].isin(ids | deleted_ids)]
+        if ids:
+            df_matches_today = pd.concat([df_matches_today, load_matches_today(ids)])
+        df_matches_today = df_matches_today.sort_values("utc_date", kind="stable")
+
+    st.session_state.matches_today_seq = seq
+    st.session_state.matches_today = df_matches_today
+    return df_matches_today
+
+@st.fragment(run_every=REFRESH_SECONDS)
+def matches_today_table():
     try:
-        conn = get_connection()
-        query = """select match_area_flag, match_area_code, competition_name,
-                          home_team_crest, home_team_short_name, home_final_score,
-                          away_final_score, away_team_short_name, away_team_crest,
-                          status, utc_date, date_from
-                      from staging.stg_fb__matches_today ;"""
-        df_matches_today = pd.read_sql(query, conn)
+        df_matches_today = refresh_matches_today()
     except Exception as e:
         st.error(f"Erro ao conectar no PostgreSQL: {e}")
+        return
 
-    st.markdown(
-        """
-        <style>
-        .center-title {
-            text-align: center;
-            font-size: 2.5em; /* Tamanho opcional */
-            font-weight: bold; /* Opcional para deixar em negrito */
-            color: white; /* Cor do texto */
-        }
-        </style>
-        """,
-        unsafe_allow_html=True,
-    )
-
-    # Título centralizado
-    st.markdown('<div class="center-title">Matches Today</div>', unsafe_allow_html=True)
-
-    st.dataframe(df_matches_today.drop('date_from', axis=1),
+    st.dataframe(df_matches_today.drop(['id', 'date_from'], axis=1),
                  use_container_width=True,
                  hide_index=True,
                  column_config={
@@ -59,5 +86,25 @@ def matches_today_summary():
 
                  },
         )
-    
-matches_today_summary()
\ No newline at end of file
+
+def matches_today_summary():
+    st.markdown(
+        """
+        <style>
+        .center-title {
+            text-align: center;
+            font-size: 2.5em; /* Tamanho opcional */
+            font-weight: bold; /* Opcional para deixar em negrito */
+            color: white; /* Cor do texto */
+        }
+        </style>
+        """,
+        unsafe_allow_html=True,
+    )
+
+    # Título centralizado
+    st.markdown('<div class="center-title">Matches Today</div>', unsafe_allow_html=True)
+
+    matches_today_table()
+
+matches_today_summary()
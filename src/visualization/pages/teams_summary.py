@@ -2,7 +2,7 @@ import streamlit as st
 import pandas as pd
 import altair as alt
 
-from utils.database import get_connection
+from utils.data_access import read_sql
 
 def team_summary():
 
@@ -23,52 +23,75 @@ def team_summary():
     # Título centralizado
     st.markdown('<div class="center-title">Teams Summary</div>', unsafe_allow_html=True)
 
+    # Only the competition and team indexes are loaded up front, the details are loaded for the selected team.
+    # The team profiles are read from the mart precomputed for this page (refreshed after each load).
     try:
-        conn = get_connection()
-        query = """select competition_name, team_id, team_area_flag, team_area_name, team_name,
-		                  tla, crest, club_colors, coach_name as coach, coach_contract_end,
-                          t.load_timestamp
-		              from staging.stg_fb__teams t inner join staging.stg_fb__competitions c 
-                      on t.competition_id = c.competition_id;"""
-        df_teams = pd.read_sql(query, conn)
+        query = """select distinct competition_id, competition_name
+                      from marts.mart_dash__team_profiles
+                    order by competition_name;"""
+        df_competitions = read_sql(query,
+                                   tables=("marts.mart_dash__team_profiles",),
+                                   name="teams_summary.competitions")
     except Exception as e:
         st.error(f"Erro ao conectar no PostgreSQL: {e}")
+        return
 
     
     st.sidebar.header("Filters")
     
     # Dropdown de competição
     selected_competition = st.sidebar.selectbox("Selecione a Competição", 
-                                                options=df_teams["competition_name"].unique(), 
+                                                options=df_competitions["competition_name"], 
                                                 key="competition")
-    
-    # Filtrar times pela competição selecionada
-    filtered_teams = df_teams[df_teams["competition_name"] == selected_competition]
+    competition_id = int(df_competitions.loc[df_competitions["competition_name"] == selected_competition, "competition_id"].iloc[0])
+
+    try:
+        query = """select team_id, team_name
+                      from marts.mart_dash__team_profiles
+                    where competition_id = %(competition_id)s
+                    order by team_name;"""
+        df_teams = read_sql(query, params={"competition_id": competition_id},
+                            tables=("marts.mart_dash__team_profiles",),
+                            name="teams_summary.teams")
+    except Exception as e:
+        st.error(f"Erro ao conectar no PostgreSQL: {e}")
+        return
 
     # Dropdown de time (dependente da competição)
     selected_team = st.sidebar.selectbox("Selecione o Time", 
-                                         options=filtered_teams["team_name"].unique(), 
+                                         options=df_teams["team_name"].unique(), 
                                          key="team")
-    
-    # Filtrar informações do time selecionado
-    team_info = filtered_teams[filtered_teams["team_name"] == selected_team].iloc[0]
-    team_id = team_info["team_id"]
+    team_id = int(df_teams.loc[df_teams["team_name"] == selected_team, "team_id"].iloc[0])
+
+    try:
+        query = """select competition_name, team_id, team_area_flag, team_area_name, team_name,
+                          tla, crest, club_colors, coach, coach_contract_end, load_timestamp
+                      from marts.mart_dash__team_profiles
+                    where competition_id = %(competition_id)s and team_id = %(team_id)s;"""
+        team_info = read_sql(query, params={"competition_id": competition_id, "team_id": team_id},
+                             tables=("marts.mart_dash__team_profiles",),
+                             name="teams_summary.team_info").iloc[0]
+    except Exception as e:
+        st.error(f"Erro ao conectar no PostgreSQL: {e}")
+        return
 
     try:
-        conn = get_connection()
-        query = f"""select player_name, player_position, player_nationality, player_date_of_birth
-                      from staging.stg_fb__players where team_id = {team_id}
+        query = """select player_name, player_position, player_nationality, player_date_of_birth
+                      from staging.stg_fb__players where team_id = %(team_id)s
                     order by 1"""
-        df_team_players = pd.read_sql(query, conn)
+        df_team_players = read_sql(query, params={"team_id": team_id},
+                                   tables=("staging.stg_fb__players",),
+                                   name="teams_summary.players")
     except Exception as e:
         st.error(f"Erro ao conectar no PostgreSQL: {e}")
 
     try:
-        conn = get_connection()
-        query = f"""select competition_name, competition_type, competition_emblem
-                      from staging.stg_fb__running_competitions where team_id = {team_id}
+        query = """select competition_name, competition_type, competition_emblem
+                      from staging.stg_fb__running_competitions where team_id = %(team_id)s
                     order by 1"""
-        df_team_running_competitions = pd.read_sql(query, conn)
+        df_team_running_competitions = read_sql(query, params={"team_id": team_id},
+                                                tables=("staging.stg_fb__running_competitions",),
+                                                name="teams_summary.running_competitions")
     except Exception as e:
         st.error(f"Erro ao conectar no PostgreSQL: {e}")
 
@@ -131,13 +154,14 @@ def team_summary():
         )
 
     try:
-        conn = get_connection()
         ## removing cups from the query
-        query = f"""select season, position 
+        query = """select season, position 
                        from staging.stg_fb__competitions_standings sfcs 
-                    where team_id = {team_id} and competition_id not in (2000,2001,2018,2152) 
+                    where team_id = %(team_id)s and competition_id not in (2000,2001,2018,2152) 
                     order by season"""
-        df_seasons_position = pd.read_sql(query, conn)
+        df_seasons_position = read_sql(query, params={"team_id": team_id},
+                                       tables=("staging.stg_fb__competitions_standings",),
+                                       name="teams_summary.seasons_position")
     except Exception as e:
         st.error(f"Erro ao conectar no PostgreSQL: {e}")
 
@@ -183,4 +207,31 @@ def team_summary():
     # Mostrar o gráfico no Streamlit
     st.altair_chart(line_chart, use_container_width=True)
 
+    try:
+        query = """select match_date, rating_after as rating, competition_id, opponent_id
+                      from raw.team_ratings
+                    where team_id = %(team_id)s
+                    order by match_date"""
+        df_ratings = read_sql(query, params={"team_id": team_id},
+                              tables=("raw.team_ratings",),
+                              name="teams_summary.ratings")
+    except Exception as e:
+        st.error(f"Erro ao conectar no PostgreSQL: {e}")
+        return
+
+    if not df_ratings.empty:
+        st.metric("Elo Rating", f"{df_ratings['rating'].iloc[-1]:.0f}",
+                  delta=f"{df_ratings['rating'].iloc[-1] - df_ratings['rating'].iloc[0]:+.0f} since {df_ratings['match_date'].iloc[0]:%Y-%m-%d}")
+        rating_chart = (
+            alt.Chart(df_ratings)
+            .mark_line(point=True)
+            .encode(
+                x=alt.X("match_date:T", title="Match Date"),
+                y=alt.Y("rating:Q", scale=alt.Scale(zero=False), title="Elo Rating"),
+                tooltip=["match_date", alt.Tooltip("rating:Q", format=".0f")]
+            )
+            .properties(height=400, title="Elo Rating Evolution")
+        )
+        st.altair_chart(rating_chart, use_container_width=True)
+
 team_summary()
\ No newline at end of file
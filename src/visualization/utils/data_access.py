@@ -0,0 +1,172 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+import psycopg2.pool
+import streamlit as st
+
+# How long (in seconds) the load_timestamp of a table is trusted before checking it again
+VERSION_TTL_SECONDS = int(os.getenv("CACHE_VERSION_TTL", 60))
+# Upper bound for a cached result, even if the table doesn't change
+RESULT_TTL_SECONDS = int(os.getenv("CACHE_RESULT_TTL", 6 * 60 * 60))
+
+_cache_miss = threading.local()
+
+
+class QueryStats:
+    """
+    Thread safe counters of the cache hits, misses and latencies of each query.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def record(self, name, elapsed_ms, hit):
+        with self._lock:
+            stats = self._stats.setdefault(name, {"calls": 0, "hits": 0, "total_ms": 0.0, "max_ms": 0.0, "last_ms": 0.0})
+            stats["calls"] += 1
+            stats["hits"] += int(hit)
+            stats["total_ms"] += elapsed_ms
+            stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+            stats["last_ms"] = elapsed_ms
+
+    def to_frame(self):
+        with self._lock:
+            rows = [{"query": name, **stats} for name, stats in self._stats.items()]
+        df = pd.DataFrame(rows, columns=["query", "calls", "hits", "total_ms", "max_ms", "last_ms"])
+        df["misses"] = df["calls"] - df["hits"]
+        df["hit_rate"] = df["hits"] / df["calls"] * 100
+        df["avg_ms"] = df["total_ms"] / df["calls"]
+        return df[["query", "calls", "hits", "misses", "hit_rate", "avg_ms", "max_ms", "last_ms"]]
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+
+class BlockingConnectionPool(psycopg2.pool.ThreadedConnectionPool):
+    """
+    Thread safe pool that waits for a connection when all of them are in use, instead of raising
+    `PoolError` right away as `ThreadedConnectionPool` does. Only raises after waiting `timeout` seconds.
+    """
+
+    def __init__(self, minconn, maxconn, *args, timeout=30, **kwargs):
+        super().__init__(minconn, maxconn, *args, **kwargs)
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(maxconn)
+
+    def getconn(self, key=None):
+        if not self._slots.acquire(timeout=self.timeout):
+            raise psycopg2.pool.PoolError(f"no connection available after {self.timeout}s, all {self.maxconn} are in use (see PG_POOL_SIZE)")
+        try:
+            return super().getconn(key)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def putconn(self, conn, key=None, close=False):
+        try:
+            super().putconn(conn, key, close)
+        finally:
+            self._slots.release()
+
+
+@st.cache_resource
+def get_pool():
+    """
+    Connection pool shared by every session of the app.
+
+    A query holds a connection only while it runs (cached results don't use one), so the pool is sized
+    for the queries running at the same time, not for the sessions: about one per concurrently active
+    session, plus the auto-refreshing fragments of the open pages. When every connection is in use, a
+    query waits up to PG_POOL_TIMEOUT seconds for one. Keep PG_POOL_SIZE below the connection limit of
+    the database (minus the extractor and dbt connections).
+    """
+    return BlockingConnectionPool(
+        minconn=1,
+        maxconn=int(os.getenv("PG_POOL_SIZE", 5)),
+        timeout=float(os.getenv("PG_POOL_TIMEOUT", 30)),
+        dbname=os.getenv("PG_DB"),
+        user=os.getenv("PG_USER"),
+        password=os.getenv("PG_PASS"),
+        host=os.getenv("PG_HOST"),
+        port=os.getenv("PG_PORT")
+    )
+
+
+@st.cache_resource
+def get_query_stats():
+    """Query statistics shared by every session of the app."""
+    return QueryStats()
+
+
+@contextmanager
+def pooled_connection():
+    """
+    Borrows a connection from the pool and gives it back when done.
+    """
+    pool = get_pool()
+    conn = pool.getconn()
+    try:
+        yield conn
+    finally:
+        if not conn.closed:
+            # Ends the read transaction, so the connection doesn't hold a snapshot while idle
+            conn.rollback()
+        pool.putconn(conn, close=bool(conn.closed))
+
+
+@st.cache_data(ttl=VERSION_TTL_SECONDS, show_spinner=False)
+def table_version(table):
+    """
+    Returns the last load_timestamp of a table. Cached results depending on the table expire when it changes.
+    """
+    with pooled_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(f"select max(load_timestamp) from {table}")
+            return cur.fetchone()[0]
+
+
+@st.cache_data(ttl=RESULT_TTL_SECONDS, show_spinner=False, max_entries=500)
+def _cached_read_sql(query, params, versions):
+    # Only runs on a cache miss. `versions` is only part of the cache key.
+    _cache_miss.value = True
+    with pooled_connection() as conn:
+        return pd.read_sql(query, conn, params=params)
+
+
+def read_sql(query, params=None, tables=(), name=None):
+    """
+    Runs a query through the cache.
+
+    The result is cached until the load_timestamp of any of the `tables` it depends on changes
+    (checked at most every VERSION_TTL_SECONDS) or RESULT_TTL_SECONDS have passed.
+
+    Args:
+        query (str): The SQL query, with pyformat placeholders (e.g. %(team_id)s).
+        params (dict, optional): The query parameters.
+        tables (tuple, optional): The tables (with a load_timestamp column) the result depends on.
+        name (str, optional): Name used in the statistics. Defaults to the query itself.
+
+    Returns:
+        pd.DataFrame: The query result.
+    """
+    versions = tuple(table_version(table) for table in tables)
+
+    _cache_miss.value = False
+    start = time.perf_counter()
+    df = _cached_read_sql(query, params, versions)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    get_query_stats().record(name or " ".join(query.split()), elapsed_ms, hit=not _cache_miss.value)
+    return df
+
+
+def clear_caches():
+    """Drops every cached result and the statistics."""
+    table_version.clear()
+    _cached_read_sql.clear()
+    get_query_stats().reset()
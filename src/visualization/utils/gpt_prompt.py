@@ -1,4 +1,19 @@
+import concurrent.futures
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
 import openai
+import streamlit as st
+
+# Where the reports are kept between restarts of the app, and for how long (in seconds) they are reused
+REPORT_CACHE_DIR = os.getenv("GPT_REPORT_CACHE_DIR", os.path.join(tempfile.gettempdir(), "gpt_reports"))
+REPORT_TTL_SECONDS = int(os.getenv("GPT_REPORT_TTL", 7 * 24 * 60 * 60))
+# How long (in seconds) a failed generation is reported as is before the API is called again
+REPORT_ERROR_BACKOFF_SECONDS = int(os.getenv("GPT_REPORT_ERROR_BACKOFF", 5 * 60))
 
 def generate_gpt_prompt(df_results, table_name):
     prompt = f"""
@@ -22,14 +37,190 @@ def generate_gpt_prompt(df_results, table_name):
     """
     return prompt
 
+class OpenAIReportClient:
+    """
+    Writes the reports with the chat completions API.
+    """
+
+    def __init__(self, model="gpt-3.5-turbo"):
+        self.model = model
+
+    def complete(self, message):
+        response = openai.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": "You are a specialist in data quality. We are building a football data app based on football-api.org."},
+                {"role": "user", "content": message},
+            ],
+            max_tokens=500,
+            temperature=0.7
+        )
+        return response.choices[0].message.content
+
+class StubReportClient:
+    """
+    Offline stand-in for the OpenAI client (tests and local runs without an API key).
+    Answers with a fixed report and keeps the prompts it received.
+    """
+
+    def __init__(self, report="**Stub data quality report**"):
+        self.report = report
+        self.messages = []
+
+    def complete(self, message):
+        self.messages.append(message)
+        return self.report
+
+class ReportCache:
+    """
+    Reports persisted as one JSON file per key, reused for `ttl` seconds.
+    """
+
+    def __init__(self, directory=REPORT_CACHE_DIR, ttl=REPORT_TTL_SECONDS):
+        self.directory = directory
+        self.ttl = ttl
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key):
+        try:
+            with open(self._path(key), encoding="utf-8") as file:
+                entry = json.load(file)
+        except (FileNotFoundError, ValueError):
+            return None
+        if time.time() - entry["created_at"] > self.ttl:
+            return None
+        return entry["report"]
+
+    def set(self, key, report):
+        os.makedirs(self.directory, exist_ok=True)
+        # Written to a temporary file first, so a reader never sees a partial report
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as file:
+            json.dump({"report": report, "created_at": time.time()}, file)
+        os.replace(tmp_path, self._path(key))
+
+def report_key(df_results, table_name):
+    """
+    Hashes the validation results and the table name. The same null profile always gives the same key.
+    """
+    content = f"{table_name}\n{df_results.to_csv(index=False)}"
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+class ReportService:
+    """
+    Generates the reports in background threads, at most once per key.
+
+    `request` never blocks: it returns the cached report, or starts generating it (unless it's
+    already being generated) and returns None so the page can show it on a later rerun.
+    A failed generation is kept for `error_backoff` seconds: a lasting failure (bad key, quota,
+    rate limit) doesn't call the API again on every rerun of every open page.
+    """
+
+    def __init__(self, client, cache, max_workers=2, error_backoff=REPORT_ERROR_BACKOFF_SECONDS):
+        self.client = client
+        self.cache = cache
+        self.error_backoff = error_backoff
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="gpt-report")
+        self._pending = {}
+        self._errors = {}
+        self._lock = threading.Lock()
+
+    def _generate(self, key, df_results, table_name):
+        try:
+            report = self.client.complete(generate_gpt_prompt(df_results, table_name))
+            self.cache.set(key, report)
+            return report
+        except Exception as e:
+            with self._lock:
+                self._errors[key] = (e, time.monotonic())
+            raise
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+
+    def request(self, df_results, table_name):
+        """
+        Returns the report for the validation results of a table, or None while it's being generated.
+
+        Args:
+            df_results (pd.DataFrame): The validation results (e.g. null percentage per column).
+            table_name (str): The validated table.
+
+        Returns:
+            str: The report, or None if it isn't ready yet.
+
+        Raises:
+            Exception: The error of the last generation of the report, if it failed less than
+                `error_backoff` seconds ago. The first call after that tries again.
+        """
+        key = report_key(df_results, table_name)
+        report = self.cache.get(key)
+        if report is not None:
+            return report
+
+        with self._lock:
+            error, failed_at = self._errors.get(key, (None, None))
+            if error is not None:
+                if time.monotonic() - failed_at < self.error_backoff:
+                    raise error
+                del self._errors[key]
+            future = self._pending.get(key)
+            if future is None:
+                future = self._executor.submit(self._generate, key, df_results.copy(), table_name)
+                self._pending[key] = future
+        return None
+
+    def pending(self, df_results, table_name):
+        """Returns the future of a report being generated, if any."""
+        with self._lock:
+            return self._pending.get(report_key(df_results, table_name))
+
+_service = None
+_service_lock = threading.Lock()
+
+def get_report_service():
+    """
+    Report service shared by every session of the app. Uses the stub client when `GPT_REPORT_CLIENT=stub`.
+    """
+    global _service
+    with _service_lock:
+        if _service is None:
+            client = StubReportClient() if os.getenv("GPT_REPORT_CLIENT") == "stub" else OpenAIReportClient()
+            _service = ReportService(client, ReportCache())
+        return _service
+
+def show_gpt_report(df_results, table_name, poll_seconds=2):
+    """
+    Shows the report of the validation results without blocking the page. While the report is being
+    generated, only this part of the page is rerun every `poll_seconds` until it's ready, or failed.
+    """
+    service = get_report_service()
+    try:
+        polling = service.request(df_results, table_name) is None
+    except Exception as e:
+        st.error(f"The report could not be generated: {e}")
+        return
+
+    def report_fragment():
+        try:
+            report = service.request(df_results, table_name)
+        except Exception as e:
+            if polling:
+                # Stops polling, the rerun shows the error (kept for the backoff) without a fragment
+                st.rerun()
+            st.error(f"The report could not be generated: {e}")
+            return
+        if report is None:
+            st.info("The report is being generated...")
+        elif polling:
+            # Stops polling
+            st.rerun()
+        else:
+            st.markdown(report)
+
+    st.fragment(report_fragment, run_every=poll_seconds if polling else None)()
+
 def get_gpt_report(message):
-    response = openai.chat.completions.create(
-        model="gpt-3.5-turbo",
-        messages=[
-            {"role": "system", "content": "You are a specialist in data quality. We are building a football data app based on football-api.org."},
-            {"role": "user", "content": message},
-        ],
-        max_tokens=500,
-        temperature=0.7
-    )
-    return response.choices[0].message.content
\ No newline at end of file
+    return OpenAIReportClient().complete(message)
@@ -0,0 +1,100 @@
+import collections
+import json
+import logging
+import select
+import threading
+import time
+
+import psycopg2.extensions
+import streamlit as st
+
+from utils.database import get_connection
+
+# Must match the channel notified by the loaders (utils/matches_api.py)
+MATCHES_CHANNEL = "matches_updates"
+
+
+class MatchUpdatesListener:
+    """
+    Listens to the match notifications sent by the loaders in a background thread.
+
+    Every notification is kept in a bounded log with an increasing sequence number, so each
+    Streamlit session can ask for the changes it hasn't seen yet without stealing them from the others.
+    """
+
+    def __init__(self, channel=MATCHES_CHANNEL, max_events=1000, poll_timeout=5):
+        self.channel = channel
+        self.poll_timeout = poll_timeout
+        self._events = collections.deque(maxlen=max_events)
+        self._seq = 0
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name=f"listen-{channel}", daemon=True)
+        self._thread.start()
+
+    @property
+    def last_seq(self):
+        """Sequence number of the last notification received."""
+        with self._lock:
+            return self._seq
+
+    def changes_since(self, seq, table):
+        """
+        Returns the changes notified for a table after a sequence number.
+
+        Deletions should be applied before the refreshes: a match deleted and then inserted again
+        shows up in both sets.
+
+        Returns:
+            tuple: (ids to refresh, ids to delete, whether a full reload is needed, new sequence number)
+        """
+        ids, deleted_ids, reload = set(), set(), False
+        with self._lock:
+            # Events older than the log were dropped, the caller has to reload everything
+            if self._events and self._events[0][0] > seq + 1:
+                return ids, deleted_ids, True, self._seq
+            for event_seq, payload in self._events:
+                # Events without a table (e.g. after a reconnection) apply to every table
+                if event_seq <= seq or payload.get("table") not in (table, None):
+                    continue
+                reload = reload or payload.get("reload", False)
+                ids.update(payload.get("ids", []))
+                deleted_ids.update(payload.get("deleted_ids", []))
+            return ids, deleted_ids, reload, self._seq
+
+    def _append(self, payload):
+        with self._lock:
+            self._seq += 1
+            self._events.append((self._seq, payload))
+
+    def _run(self):
+        retry_delay = 1
+        while True:
+            conn = None
+            try:
+                conn = get_connection()
+                conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+                with conn.cursor() as cur:
+                    cur.execute(f"LISTEN {self.channel};")
+                retry_delay = 1
+                while True:
+                    if select.select([conn], [], [], self.poll_timeout) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        notification = conn.notifies.pop(0)
+                        self._append(json.loads(notification.payload))
+            except Exception as e:
+                logging.error(f"Match listener disconnected, retrying in {retry_delay} seconds: {e}")
+                # Notifications sent while disconnected are lost, every table has to be reloaded
+                self._append({"table": None, "reload": True})
+                time.sleep(retry_delay)
+                retry_delay = min(retry_delay * 2, 60)
+            finally:
+                if conn is not None:
+                    conn.close()
+
+
+@st.cache_resource
+def get_match_listener():
+    """Starts a single listener shared by every session of the app."""
+    return MatchUpdatesListener()
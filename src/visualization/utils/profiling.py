@@ -0,0 +1,275 @@
+"""
+Column profiling of the raw tables, used by the Data Quality page.
+
+Each table is profiled by a single query: the rows are read once (sampled with TABLESAMPLE when the
+table is large) and every column gets its null percentage, distinct count, min and max, plus the
+key coverage of its JSONB objects. Results go through `read_sql`, so they are cached until the
+load_timestamp of the table changes.
+
+The tables come from the DDL registry of the extractor (`utils/queries/create_queries.py`).
+The profiles the loaders store for each load (meta.table_profiles) are read by `load_profiles`.
+"""
+import functools
+import importlib.util
+import math
+import os
+from pathlib import Path
+
+import pandas as pd
+
+from utils.data_access import read_sql
+
+# The registry is copied next to the app in the image, and lives in src/utils/queries in the repository
+REGISTRY_PATH = os.getenv(
+    "DDL_REGISTRY_PATH",
+    str(Path(__file__).resolve().parents[2] / "utils" / "queries" / "create_queries.py"),
+)
+# Tables with more (estimated) rows than this are sampled down to about this many rows
+SAMPLE_ROWS = int(os.getenv("PROFILE_SAMPLE_ROWS", 200_000))
+# Same seed on every run, so the same data always gives the same profile
+SAMPLE_SEED = 42
+
+# Types with min/max (booleans and JSON don't have them)
+ORDERED_TYPES = ("smallint", "integer", "bigint", "numeric", "real", "double precision",
+                 "date", "timestamp", "time", "text", "character")
+
+
+@functools.lru_cache
+def registry_tables(path=REGISTRY_PATH):
+    """
+    Lists the tables of the DDL registry: the constants holding a `CREATE TABLE {schema}.{table}` statement.
+
+    Args:
+        path (str, optional): Path of the create_queries module.
+
+    Returns:
+        tuple: The table names, in the order they are declared.
+    """
+    spec = importlib.util.spec_from_file_location("create_queries", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    return tuple(
+        name.lower() for name, value in vars(module).items()
+        if name.isupper() and isinstance(value, str)
+        and value.strip().startswith("CREATE TABLE {schema}.{table}")
+    )
+
+
+def get_catalog(schema, tables):
+    """
+    Reads the columns of the tables with their type, the estimated row count of the table
+    (summed over its partitions) and the planner's distinct estimate of the column, when analyzed.
+    """
+    query = """
+        select c.table_name, c.column_name, c.data_type,
+               greatest(cls.reltuples, coalesce((
+                   select sum(child.reltuples)
+                     from pg_inherits
+                     join pg_class child on child.oid = pg_inherits.inhrelid
+                    where pg_inherits.inhparent = cls.oid
+               ), 0)) as estimated_rows,
+               s.n_distinct
+          from information_schema.columns c
+          join pg_namespace n on n.nspname = c.table_schema
+          join pg_class cls on cls.relnamespace = n.oid and cls.relname = c.table_name
+          left join pg_stats s on s.schemaname = c.table_schema and s.tablename = c.table_name
+                              and s.attname = c.column_name and s.inherited = (cls.relkind = 'p')
+         where c.table_schema = %(schema)s and c.table_name = any(%(tables)s)
+         order by c.table_name, c.ordinal_position
+    """
+    return read_sql(query, params={"schema": schema, "tables": list(tables)}, name="data_quality.catalog")
+
+
+def sample_percent(estimated_rows, sample_rows=SAMPLE_ROWS):
+    """Returns the TABLESAMPLE percentage to read about `sample_rows` rows, or None to read the whole table."""
+    if estimated_rows <= sample_rows:
+        return None
+    return math.ceil(sample_rows / estimated_rows * 10000) / 100
+
+
+def build_profile_query(qualified_table, columns, percent=None):
+    """
+    Builds the query profiling every column of a table in a single pass.
+
+    The (sampled) rows are materialized once. The query returns a single row with the statistics of
+    every column (`<column>.<statistic>`) and, in `json_keys`, the number of rows having each top level
+    key of each JSONB column.
+
+    Args:
+        qualified_table (str): The table, with its schema.
+        columns (list): (column_name, data_type) pairs.
+        percent (float, optional): TABLESAMPLE SYSTEM percentage. Defaults to None (no sampling).
+
+    Returns:
+        str: The query.
+    """
+    sampling = f" tablesample system ({percent}) repeatable ({SAMPLE_SEED})" if percent else ""
+
+    stats = ["count(*) as rows"]
+    json_keys = []
+    for column, data_type in columns:
+        stats.append(f'count("{column}") as "{column}.non_null"')
+        if data_type != "json":
+            stats.append(f'count(distinct "{column}") as "{column}.distinct"')
+        if data_type.startswith(ORDERED_TYPES):
+            stats.append(f'min("{column}")::text as "{column}.min"')
+            stats.append(f'max("{column}")::text as "{column}.max"')
+        if data_type == "jsonb":
+            json_keys.append(f"""
+                select '{column}' as column_name, key, count(*) as rows
+                  from profiled, jsonb_object_keys(case when jsonb_typeof("{column}") = 'object' then "{column}" end) as key
+                 group by key""")
+
+    keys_query = " union all ".join(json_keys) or "select null::text as column_name, null::text as key, 0 as rows where false"
+    return f"""
+        with profiled as materialized (
+            select * from {qualified_table}{sampling}
+        ),
+        stats as (
+            select {", ".join(stats)} from profiled
+        ),
+        json_keys as ({keys_query}
+        )
+        select stats.*,
+               (select coalesce(jsonb_agg(jsonb_build_array(column_name, key, rows)), '[]') from json_keys) as json_keys
+          from stats
+    """
+
+
+def build_profile(result, columns, estimated_rows=None, n_distinct=None, percent=None):
+    """
+    Shapes the row returned by the profile query.
+
+    Distinct counts of a sample are only a lower bound, so for sampled tables the planner estimate
+    (pg_stats.n_distinct, negative when it's a fraction of the rows) is used when available.
+
+    Args:
+        result (dict): The row returned by the query built by `build_profile_query`.
+        columns (list): (column_name, data_type) pairs.
+        estimated_rows (float, optional): Estimated rows of the table, used when it was sampled.
+        n_distinct (dict, optional): pg_stats.n_distinct by column.
+        percent (float, optional): The sampling percentage used, if any.
+
+    Returns:
+        dict: `rows` (rows of the table, estimated when sampled), `sampled_rows`, `sample_percent`,
+        `columns` (one row per column) and `json_keys` (coverage of each key of the JSONB columns).
+    """
+    sampled_rows = int(result["rows"])
+    rows = int(estimated_rows) if percent else sampled_rows
+    n_distinct = n_distinct or {}
+
+    records = []
+    for column, data_type in columns:
+        non_null = int(result[f"{column}.non_null"])
+        distinct = result.get(f"{column}.distinct")
+        estimate = n_distinct.get(column)
+        if percent and estimate is not None and not pd.isna(estimate):
+            distinct = estimate if estimate > 0 else -estimate * rows
+        records.append({
+            "column": column,
+            "data_type": data_type,
+            "null_percentage": (sampled_rows - non_null) / sampled_rows * 100 if sampled_rows else 0.0,
+            "distinct": None if distinct is None else int(round(distinct)),
+            "min": result.get(f"{column}.min"),
+            "max": result.get(f"{column}.max"),
+        })
+
+    df_keys = pd.DataFrame(result["json_keys"] or [], columns=["column", "key", "rows"])
+    non_null_by_column = {column: int(result[f"{column}.non_null"]) for column, _ in columns}
+    df_keys["coverage_percentage"] = [
+        rows_with_key / non_null_by_column[column] * 100 if non_null_by_column[column] else 0.0
+        for column, rows_with_key in zip(df_keys["column"], df_keys["rows"])
+    ]
+
+    return {
+        "rows": rows,
+        "sampled_rows": sampled_rows,
+        "sample_percent": percent,
+        "columns": pd.DataFrame(records, columns=["column", "data_type", "null_percentage", "distinct", "min", "max"]),
+        "json_keys": df_keys.sort_values(["column", "coverage_percentage"], ascending=[True, False], ignore_index=True),
+    }
+
+
+def profile_table(table, schema="raw"):
+    """
+    Profiles a table of the registry. Cached until the load_timestamp of the table changes.
+
+    Args:
+        table (str): The table name, without the schema.
+        schema (str, optional): The schema. Defaults to "raw".
+
+    Returns:
+        dict: The profile (see `build_profile`), or None if the table doesn't exist yet.
+    """
+    catalog = get_catalog(schema, registry_tables())
+    catalog = catalog[catalog["table_name"] == table]
+    if catalog.empty:
+        return None
+
+    columns = list(zip(catalog["column_name"], catalog["data_type"]))
+    estimated_rows = float(catalog["estimated_rows"].iloc[0])
+    percent = sample_percent(estimated_rows)
+
+    qualified_table = f"{schema}.{table}"
+    # Tables without a load_timestamp (e.g. the sync watermarks) are only cached for RESULT_TTL_SECONDS
+    versioned = (qualified_table,) if "load_timestamp" in catalog["column_name"].values else ()
+    result = read_sql(build_profile_query(qualified_table, columns, percent),
+                      tables=versioned, name="data_quality.profile").iloc[0].to_dict()
+
+    return build_profile(result, columns, estimated_rows,
+                         dict(zip(catalog["column_name"], catalog["n_distinct"])), percent)
+
+
+def list_profiled_tables(schema="raw"):
+    """Returns the tables of the registry that already exist in the schema."""
+    tables = registry_tables()
+    existing = set(get_catalog(schema, tables)["table_name"])
+    return [table for table in tables if table in existing]
+
+
+def load_profiles(table, schema="raw"):
+    """
+    Reads the profiles stored by the loaders (meta.table_profiles) for the last two loads of a table.
+
+    Args:
+        table (str): The table name, without the schema.
+        schema (str, optional): The schema. Defaults to "raw".
+
+    Returns:
+        pd.DataFrame: One row per column, with the null percentage and distinct count of the last load,
+        the same values for the previous load (`*_previous`, empty when there's a single load) and the
+        load timestamps. Empty if the table was never profiled at load time.
+    """
+    found = read_sql("select to_regclass('meta.table_profiles') is not null as found",
+                     name="data_quality.load_profiles_found").iloc[0]["found"]
+    if not found:
+        return pd.DataFrame()
+
+    query = """
+        with loads as (
+            select distinct load_timestamp
+              from meta.table_profiles
+             where schema_name = %(schema)s and table_name = %(table)s
+             order by load_timestamp desc
+             limit 2
+        )
+        select load_timestamp, column_name, data_type, row_count, null_percentage, distinct_count, min_value, max_value
+          from meta.table_profiles
+         where schema_name = %(schema)s and table_name = %(table)s
+           and load_timestamp in (select load_timestamp from loads)
+    """
+    df = read_sql(query, params={"schema": schema, "table": table},
+                  tables=("meta.table_profiles",), name="data_quality.load_profiles")
+    if df.empty:
+        return df
+
+    loads = sorted(df["load_timestamp"].unique(), reverse=True)
+    current = df[df["load_timestamp"] == loads[0]]
+    previous = df[df["load_timestamp"] == loads[1]] if len(loads) > 1 else df.iloc[0:0]
+    merged = current.merge(
+        previous[["column_name", "load_timestamp", "null_percentage", "distinct_count"]],
+        on="column_name", how="left", suffixes=("", "_previous")
+    )
+    merged["null_percentage_change"] = merged["null_percentage"].astype(float) - merged["null_percentage_previous"].astype(float)
+    return merged
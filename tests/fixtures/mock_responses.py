@@ -17,3 +17,39 @@ def mock_team_response():
         "name": "Liverpool FC",
         "area": {"name": "England"}
     }
+
+def build_match(match_id, competition_id=2021, last_updated="2024-12-01T18:00:00Z", status="FINISHED", home_score=1, away_score=0):
+    return {
+        "area": {"id": 2072, "name": "England", "code": "ENG", "flag": "https://crests.football-data.org/770.svg"},
+        "competition": {"id": competition_id, "name": "Premier League", "code": "PL", "type": "LEAGUE", "emblem": None},
+        "season": {"id": 2287, "startDate": "2024-08-16", "endDate": "2025-05-25", "currentMatchday": 13, "winner": None},
+        "id": match_id,
+        "utcDate": "2024-12-01T16:00:00Z",
+        "status": status,
+        "matchday": 13,
+        "stage": "REGULAR_SEASON",
+        "group": None,
+        "lastUpdated": last_updated,
+        "homeTeam": {"id": 64, "name": "Liverpool FC", "shortName": "Liverpool", "tla": "LIV", "crest": "https://crests.football-data.org/64.png"},
+        "awayTeam": {"id": 65, "name": "Manchester City FC", "shortName": "Man City", "tla": "MCI", "crest": "https://crests.football-data.org/65.png"},
+        "score": {
+            "winner": "HOME_TEAM" if home_score > away_score else ("AWAY_TEAM" if away_score > home_score else "DRAW"),
+            "duration": "REGULAR",
+            "fullTime": {"home": home_score, "away": away_score},
+            "halfTime": {"home": home_score, "away": 0},
+        },
+        "odds": {"msg": "Activate Odds-Package in User-Panel to retrieve odds."},
+        "referees": [{"id": 11605, "name": "Anthony Taylor", "type": "REFEREE", "nationality": "England"}],
+    }
+
+@pytest.fixture
+def mock_matches_response():
+    return {
+        "filters": {"dateFrom": "2024-11-28", "dateTo": "2024-12-02", "permission": "TIER_ONE", "competitions": "2021,2014"},
+        "resultSet": {"count": 3, "competitions": "PL,PD", "first": "2024-12-01", "last": "2024-12-01", "played": 3},
+        "matches": [
+            build_match(1001, competition_id=2021, last_updated="2024-12-01T18:00:00Z"),
+            build_match(1002, competition_id=2021, last_updated="2024-12-01T19:30:00Z"),
+            build_match(1003, competition_id=2014, last_updated="2024-12-01T17:00:00Z"),
+        ]
+    }
@@ -0,0 +1,42 @@
+import json
+from src.utils import football_api
+from src.utils.archive import ResponseArchive
+from tests.fixtures.mock_responses import mock_competitions_response
+
+def test_identical_responses_are_stored_once(tmp_path):
+    archive = ResponseArchive(str(tmp_path))
+    body = json.dumps({"count": 1, "standings": []}).encode()
+
+    first = archive.store('competitions/2021/standings?season=2024', None, body, fetched_at='2024-12-01T10:00:00+00:00')
+    second = archive.store('competitions/2021/standings?season=2024', None, body, fetched_at='2024-12-02T10:00:00+00:00')
+    archive.store('competitions/2021/standings?season=2023', None, b'{"count": 0}')
+
+    assert first == second
+    assert len(list(tmp_path.rglob('*.json.zst'))) == 2
+    entries = list(archive.entries('competitions/2021/standings'))
+    assert [(entry['params'], entry['new']) for entry in entries[:2]] == [({'season': '2024'}, True), ({'season': '2024'}, False)]
+    assert entries[0]['endpoint'] == 'competitions/2021/standings'
+    assert archive.read(first) == body
+
+def test_api_archives_its_responses(tmp_path, monkeypatch, mock_competitions_response):
+    body = json.dumps(mock_competitions_response).encode()
+
+    class FakeResponse:
+        status_code = 200
+        content = body
+
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            return json.loads(body)
+
+    monkeypatch.setenv('RESPONSE_ARCHIVE_DIR', str(tmp_path))
+    monkeypatch.setattr(football_api.requests, 'get', lambda url, headers, params: FakeResponse())
+    api = football_api.FootballAPIBase(token='token')
+
+    assert api._make_request('competitions', params={'plan': 'TIER_ONE'}) == mock_competitions_response
+
+    entry, = api.archive.entries()
+    assert (entry['endpoint'], entry['params']) == ('competitions', {'plan': 'TIER_ONE'})
+    assert api.archive.load(entry['sha256']) == mock_competitions_response
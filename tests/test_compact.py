@@ -0,0 +1,23 @@
+import pandas as pd
+from benchmarks.compact import compact_matches, iter_dataframes
+from src.utils.flatten import flatten_matches
+from src.contracts.matches_contract import MatchesTodayResponse
+from tests.fixtures.mock_responses import mock_matches_response
+
+def test_compact_matches_keeps_the_rows_of_flatten_matches(mock_matches_response, monkeypatch):
+    monkeypatch.delenv('ARCHIVE_RAW_JSON', raising=False)
+    expected = flatten_matches(MatchesTodayResponse(**mock_matches_response).matches)
+
+    # Raw matches, validated one at a time, in batches of 2 rows
+    tables = compact_matches(mock_matches_response['matches'], batch_size=2)
+
+    matches = tables['matches'].to_pandas()
+    assert tables['matches'].num_rows == 3 and tables['matches'].column('competition_name').num_chunks == 2
+    assert isinstance(matches['competition_name'].dtype, pd.CategoricalDtype)
+    assert list(matches.columns) == list(expected['matches'].columns)
+    pd.testing.assert_frame_equal(matches.astype(object).where(matches.notna(), None),
+                                  expected['matches'].astype(object).where(expected['matches'].notna(), None),
+                                  check_dtype=False)
+
+    referees = pd.concat(iter_dataframes(tables['match_referees'], rows=1), ignore_index=True)
+    assert referees[['match_id', 'referee_id']].values.tolist() == [[1001, 11605], [1002, 11605], [1003, 11605]]
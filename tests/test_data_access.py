@@ -0,0 +1,37 @@
+import threading
+import time
+import psycopg2.pool
+import pytest
+from src.visualization.utils.data_access import BlockingConnectionPool
+
+class FakeConnection:
+    closed = 0
+
+    def close(self):
+        self.closed = 1
+
+class FakePool(BlockingConnectionPool):
+    def _connect(self, key=None):
+        conn = FakeConnection()
+        if key is not None:
+            self._used[key] = conn
+            self._rused[id(conn)] = key
+        else:
+            self._pool.append(conn)
+        return conn
+
+def test_pool_waits_for_a_connection_instead_of_failing():
+    pool = FakePool(0, 1, timeout=5)
+    conn = pool.getconn()
+    threading.Timer(0.2, pool.putconn, args=(conn,)).start()
+
+    start = time.perf_counter()
+    assert isinstance(pool.getconn(), FakeConnection)
+    assert time.perf_counter() - start >= 0.15
+
+def test_pool_fails_after_the_timeout():
+    pool = FakePool(0, 1, timeout=0.1)
+    pool.getconn()
+
+    with pytest.raises(psycopg2.pool.PoolError, match='PG_POOL_SIZE'):
+        pool.getconn()
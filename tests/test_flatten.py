@@ -0,0 +1,42 @@
+from src.utils.flatten import flatten_matches, flatten_teams
+from src.contracts.matches_contract import MatchesTodayResponse
+from src.contracts.teams_contract import Team
+from tests.fixtures.mock_responses import mock_matches_response
+
+def test_flatten_matches_writes_typed_columns_and_referees(mock_matches_response, monkeypatch):
+    monkeypatch.delenv('ARCHIVE_RAW_JSON', raising=False)
+    flat = flatten_matches(MatchesTodayResponse(**mock_matches_response).matches)
+
+    matches = flat['matches']
+    assert matches['id'].tolist() == [1001, 1002, 1003]
+    assert matches['competition_id'].tolist() == [2021, 2021, 2014]
+    assert matches.loc[0, 'home_team_short_name'] == 'Liverpool'
+    assert (matches.loc[0, 'full_time_home'], matches.loc[0, 'full_time_away']) == (1, 0)
+    assert matches['raw_json'].isna().all()
+
+    assert flat['match_referees'][['match_id', 'referee_id']].values.tolist() == [[1001, 11605], [1002, 11605], [1003, 11605]]
+
+def test_flatten_matches_archives_raw_json_when_enabled(mock_matches_response, monkeypatch):
+    monkeypatch.setenv('ARCHIVE_RAW_JSON', 'true')
+    flat = flatten_matches(MatchesTodayResponse(**mock_matches_response).matches)
+
+    assert '"id":1001' in flat['matches'].loc[0, 'raw_json']
+
+def test_flatten_teams_splits_child_tables():
+    team = Team(**{
+        "id": 64, "name": "Liverpool FC", "shortName": "Liverpool", "tla": "LIV",
+        "crest": "https://crests.football-data.org/64.png", "address": "Anfield Road Liverpool L4 0TH",
+        "area": {"id": 2072, "name": "England", "code": "ENG", "flag": None},
+        "runningCompetitions": [{"id": 2021, "name": "Premier League", "code": "PL", "type": "LEAGUE", "emblem": None}],
+        "coach": None,
+        "squad": [{"id": 1, "name": "Alisson", "position": "Goalkeeper", "dateOfBirth": "1992-10-02", "nationality": "Brazil"}],
+        "staff": [],
+    })
+
+    flat = flatten_teams([team], competition_id=2021)
+
+    assert flat['teams'].loc[0, 'area_name'] == 'England'
+    assert flat['teams'].loc[0, 'coach_id'] is None
+    assert flat['team_players'][['team_id', 'player_id']].values.tolist() == [[64, 1]]
+    assert flat['team_running_competitions']['running_competition_id'].tolist() == [2021]
+    assert flat['team_staff'].empty
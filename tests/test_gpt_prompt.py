@@ -0,0 +1,56 @@
+import pytest
+import pandas as pd
+from src.visualization.utils.gpt_prompt import ReportCache, ReportService, StubReportClient
+
+def test_report_is_generated_once_and_reused(tmp_path):
+    client = StubReportClient()
+    service = ReportService(client, ReportCache(directory=tmp_path))
+    df_results = pd.DataFrame({'column': ['coach_id'], 'null_percentage': [12.5]})
+
+    # Never blocks: the first request only starts the generation
+    assert service.request(df_results, 'raw.teams') is None
+    future = service.pending(df_results, 'raw.teams')
+    if future is not None:
+        future.result(timeout=5)
+
+    assert service.request(df_results.copy(), 'raw.teams') == client.report
+    assert len(client.messages) == 1
+
+    # A new service (e.g. after a restart) reads the persisted report
+    assert ReportService(StubReportClient(), ReportCache(directory=tmp_path)).request(df_results, 'raw.teams') == client.report
+
+def test_expired_reports_are_generated_again(tmp_path):
+    cache = ReportCache(directory=tmp_path, ttl=-1)
+    cache.set('key', 'report')
+
+    assert cache.get('key') is None
+
+def wait_for(service, df_results):
+    future = service.pending(df_results, 'raw.teams')
+    if future is not None:
+        future.exception(timeout=5)
+
+def test_failed_reports_are_not_requested_again_during_the_backoff(tmp_path):
+    class FailingClient(StubReportClient):
+        def complete(self, message):
+            self.messages.append(message)
+            raise RuntimeError('invalid api key')
+
+    client = FailingClient()
+    service = ReportService(client, ReportCache(directory=tmp_path), error_backoff=60)
+    df_results = pd.DataFrame({'column': ['coach_id'], 'null_percentage': [12.5]})
+
+    assert service.request(df_results, 'raw.teams') is None
+    wait_for(service, df_results)
+
+    # Every rerun shows the same error, without calling the API again
+    for _ in range(3):
+        with pytest.raises(RuntimeError, match='invalid api key'):
+            service.request(df_results, 'raw.teams')
+    assert len(client.messages) == 1
+
+    # After the backoff, the next request tries again
+    service.error_backoff = 0
+    assert service.request(df_results, 'raw.teams') is None
+    wait_for(service, df_results)
+    assert len(client.messages) == 2
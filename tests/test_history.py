@@ -0,0 +1,51 @@
+import datetime
+import pandas as pd
+from src.utils.history import compute_deltas
+
+KEYS = ['competition_id', 'team_id', 'player_id']
+VALUES = ['name', 'position', 'date_of_birth']
+
+def squad(rows):
+    return pd.DataFrame(rows, columns=KEYS + VALUES)
+
+def test_compute_deltas_keeps_only_new_and_changed_rows():
+    latest = squad([
+        (2021, 64, 1, 'Alisson', 'Goalkeeper', datetime.date(1992, 10, 2)),
+        (2021, 64, 2, 'Salah', 'Offence', datetime.date(1992, 6, 15)),
+    ]).assign(is_removed=False)
+    current = squad([
+        (2021, 64, 1, 'Alisson', 'Goalkeeper', datetime.date(1992, 10, 2)),
+        (2021, 64, 2, 'Salah', 'Midfield', datetime.date(1992, 6, 15)),
+        (2021, 64, 3, 'Szoboszlai', 'Midfield', None),
+    ])
+
+    deltas = compute_deltas(current, latest, KEYS, VALUES)
+
+    assert deltas['player_id'].tolist() == [2, 3]
+    assert not deltas['is_removed'].any()
+
+def test_compute_deltas_ignores_dtype_differences():
+    # Integers read back from the database vs floats produced by a column with missing values
+    latest = pd.DataFrame({'competition_id': [2021], 'season': [2024], 'team_id': [64], 'points': [30]}).assign(is_removed=False)
+    current = pd.DataFrame({'competition_id': [2021], 'season': [2024], 'team_id': [64], 'points': [30.0]})
+
+    assert compute_deltas(current, latest, ['competition_id', 'season', 'team_id'], ['points']).empty
+
+def test_compute_deltas_adds_tombstones_only_inside_loaded_scopes():
+    latest = squad([
+        (2021, 64, 1, 'Alisson', 'Goalkeeper', None),
+        (2021, 64, 2, 'Salah', 'Offence', None),
+        (2021, 65, 9, 'Haaland', 'Offence', None),
+    ]).assign(is_removed=False)
+    # Team 65 was not part of this load, its players must not be removed
+    current = squad([(2021, 64, 1, 'Alisson', 'Goalkeeper', None)])
+
+    deltas = compute_deltas(current, latest, KEYS, VALUES, scope_columns=['competition_id', 'team_id'])
+
+    assert deltas[KEYS + ['is_removed']].values.tolist() == [[2021, 64, 2, True]]
+
+def test_compute_deltas_brings_removed_rows_back():
+    latest = squad([(2021, 64, 2, 'Salah', 'Offence', None)]).assign(is_removed=True)
+    current = squad([(2021, 64, 2, 'Salah', 'Offence', None)])
+
+    assert compute_deltas(current, latest, KEYS, VALUES)['player_id'].tolist() == [2]
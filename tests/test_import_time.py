@@ -0,0 +1,72 @@
+import os
+import subprocess
+import sys
+import pytest
+from benchmarks.cold_start import REQUEST_MODULES
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+
+# Cumulative import time budgets (ms), scaled by IMPORT_BUDGET_SCALE on slow machines. They depend on the
+# machine and its load, so they are only checked with IMPORT_TIME_BUDGETS=1; the imported modules always are.
+SCALE = float(os.getenv('IMPORT_BUDGET_SCALE', 1))
+HELP_BUDGET_MS = 250 * SCALE
+REQUEST_BUDGET_MS = 2500 * SCALE
+budgets = pytest.mark.skipif(os.getenv('IMPORT_TIME_BUDGETS') != '1', reason='import time budgets (IMPORT_TIME_BUDGETS=1)')
+
+
+def import_times(code: str) -> dict:
+    """Runs `code` with `python -X importtime` (telemetry disabled), returns the cumulative ms of each top level import."""
+    env = {**os.environ, 'TELEMETRY_ENABLED': 'false'}
+    env.pop('PYDANTIC_DISABLE_PLUGINS', None)
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=SRC, env=env,
+                            capture_output=True, text=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        times[name.rstrip()] = int(cumulative) / 1000
+    return times
+
+
+def startup_cost(code: str) -> tuple:
+    """The import time added by `code` on top of the interpreter startup, and the modules it imported."""
+    baseline = import_times('pass')
+    times = import_times(code)
+    added = {name: ms for name, ms in times.items() if name.strip() not in {n.strip() for n in baseline}}
+    total = sum(ms for name, ms in added.items() if not name.startswith(' '))
+    return total, {name.strip() for name in added}
+
+
+def request_imports(request_type: str) -> str:
+    """The code importing what a request type needs, after the telemetry is configured."""
+    imports = '; '.join(f'import {module}' for module in REQUEST_MODULES[request_type])
+    return f'import main; main.configure_telemetry(); {imports}'
+
+
+def test_help_does_not_import_the_processors():
+    _, modules = startup_cost('import main')
+
+    assert not modules & {'pandas', 'psycopg2', 'pydantic', 'requests', 'logfire'}
+
+
+@pytest.mark.parametrize('request_type', sorted(REQUEST_MODULES))
+def test_request_type_does_not_import_logfire(request_type):
+    _, modules = startup_cost(request_imports(request_type))
+
+    assert 'logfire' not in modules
+
+
+@budgets
+def test_help_import_budget():
+    total, _ = startup_cost('import main')
+
+    assert total < HELP_BUDGET_MS, f"import main took {total:.0f}ms"
+
+
+@budgets
+@pytest.mark.parametrize('request_type', sorted(REQUEST_MODULES))
+def test_request_type_import_budget(request_type):
+    total, _ = startup_cost(request_imports(request_type))
+
+    assert total < REQUEST_BUDGET_MS, f"{request_type} took {total:.0f}ms to import"
@@ -0,0 +1,74 @@
+import datetime
+import pytest
+from src.utils.matches_live import diff_matches, match_state, next_poll_interval
+from src.contracts.matches_contract import Match
+from tests.fixtures.mock_responses import build_match
+
+NOW = datetime.datetime(2024, 12, 1, 15, 0, tzinfo=datetime.timezone.utc)
+
+def test_diff_matches_detects_new_changed_and_removed():
+    previous = [Match(**build_match(1, status="IN_PLAY", home_score=0, away_score=0)), Match(**build_match(2)), Match(**build_match(3))]
+    snapshot = {match.id: match_state(match) for match in previous}
+    current = [Match(**build_match(1, status="IN_PLAY", home_score=1, away_score=0)), Match(**build_match(2)), Match(**build_match(4))]
+
+    new_matches, changed_matches, removed_ids = diff_matches(snapshot, current)
+
+    assert [match.id for match in new_matches] == [4]
+    assert [match.id for match in changed_matches] == [1]
+    assert removed_ids == {3}
+
+def test_diff_matches_ignores_unchanged_poll():
+    matches = [Match(**build_match(1)), Match(**build_match(2))]
+    snapshot = {match.id: match_state(match) for match in matches}
+    assert diff_matches(snapshot, matches) == ([], [], set())
+
+def test_next_poll_interval_is_fast_while_live():
+    matches = [Match(**build_match(1, status="IN_PLAY")), Match(**build_match(2, status="FINISHED"))]
+    assert next_poll_interval(matches, NOW, live_interval=20, idle_interval=300) == 20
+
+@pytest.mark.parametrize("status, expected", [("TIMED", 300), ("FINISHED", 300)])
+def test_next_poll_interval_is_slow_when_idle(status, expected):
+    # build_match kicks off at 16:00, one hour after NOW
+    matches = [Match(**build_match(1, status=status))]
+    assert next_poll_interval(matches, NOW, live_interval=20, idle_interval=300) == expected
+
+def test_next_poll_interval_wakes_up_for_next_kickoff():
+    matches = [Match(**build_match(1, status="TIMED"))]
+    now = datetime.datetime(2024, 12, 1, 15, 58, tzinfo=datetime.timezone.utc)
+    assert next_poll_interval(matches, now, live_interval=20, idle_interval=300) == 120
+
+def test_notify_match_changes_splits_large_payloads():
+    import json
+    from unittest.mock import Mock
+    from src.utils.matches_api import notify_match_changes, MATCHES_CHANNEL, NOTIFY_MAX_BYTES
+
+    db = Mock()
+    # 9 digit ids: 500 of them and 500 deleted ones no longer fit in one payload
+    ids, deleted_ids = list(range(100_000_000, 100_001_200)), list(range(200_000_000, 200_000_500))
+    notify_match_changes(db, 'raw.matches_today', ids=ids, deleted_ids=deleted_ids)
+
+    payloads = [call.args[1] for call in db.notify.call_args_list]
+    assert {call.args[0] for call in db.notify.call_args_list} == {MATCHES_CHANNEL}
+    assert all(len(payload.encode()) < NOTIFY_MAX_BYTES for payload in payloads)
+    assert all(len(payload.encode()) > NOTIFY_MAX_BYTES - 20 for payload in payloads[:-1])
+    payloads = [json.loads(payload) for payload in payloads]
+    assert [match_id for payload in payloads for match_id in payload["ids"]] == ids
+    assert [match_id for payload in payloads for match_id in payload["deleted_ids"]] == deleted_ids
+    assert len(payloads) == 3
+
+def test_changes_are_only_landed_without_the_postgres_sink():
+    from unittest.mock import MagicMock
+    from src.utils.matches_live import MatchesLivePoller
+
+    poller = MatchesLivePoller.__new__(MatchesLivePoller)
+    poller.schema, poller.table, poller.write_postgres, poller.db = 'raw', 'matches_today', False, MagicMock()
+    landed = []
+    poller._land = lambda df, table=None: landed.append((table, df))
+
+    poller._write_changes([Match(**build_match(4))], [Match(**build_match(1, status="IN_PLAY"))], {3}, datetime.date(2024, 12, 1))
+
+    assert poller.db.method_calls == []
+    (matches_table, matches), (referees_table, referees) = landed
+    assert (matches_table, referees_table) == (None, 'match_referees')
+    assert list(matches['id']) == [4, 1]
+    assert list(referees['match_id']) == [4]
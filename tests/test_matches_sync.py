@@ -0,0 +1,85 @@
+import datetime
+from unittest.mock import MagicMock, patch
+import pytest
+from src.utils.matches_api import MatchesAPI, behind_watermarks, filter_advanced_matches, compute_watermarks, MatchesSyncProcessor
+from src.contracts.matches_contract import MatchesTodayResponse
+from tests.fixtures.mock_responses import mock_matches_response
+
+@pytest.fixture
+def matches(mock_matches_response):
+    return MatchesTodayResponse(**mock_matches_response).matches
+
+def test_filter_advanced_matches_keeps_matches_never_loaded(matches):
+    assert [match.id for match in filter_advanced_matches(matches, {})] == [1001, 1002, 1003]
+
+def test_filter_advanced_matches_drops_matches_loaded_with_the_same_version(matches):
+    loaded_versions = {
+        1001: datetime.datetime(2024, 12, 1, 18, 0, tzinfo=datetime.timezone.utc),
+        1002: datetime.datetime(2024, 12, 1, 18, 0, tzinfo=datetime.timezone.utc),
+        1003: datetime.datetime(2024, 12, 1, 17, 30, tzinfo=datetime.timezone.utc),
+    }
+    assert [match.id for match in filter_advanced_matches(matches, loaded_versions)] == [1002]
+
+def test_behind_watermarks_only_selects_matches_not_past_their_watermark(matches):
+    watermarks = {
+        2021: datetime.datetime(2024, 12, 1, 18, 0, tzinfo=datetime.timezone.utc),
+        2014: datetime.datetime(2024, 12, 1, 17, 0, tzinfo=datetime.timezone.utc),
+    }
+    assert behind_watermarks(matches, watermarks) == [1001, 1003]
+
+def test_sync_loads_a_match_older_than_the_watermark_that_was_never_loaded(mock_matches_response):
+    # 1001 and 1003 enter the window with a lastUpdated behind their competition's watermark
+    processor = MatchesSyncProcessor(MagicMock(), schema='raw', table='matches')
+    processor.db = MagicMock()
+    processor.db.select.return_value = [(2021,), (2014,)]
+    processor.api_connection.get_matches.return_value = mock_matches_response
+    processor._validate_tables = lambda: None
+    processor._read_watermarks = lambda: {
+        2021: datetime.datetime(2024, 12, 2, 0, 0, tzinfo=datetime.timezone.utc),
+        2014: datetime.datetime(2024, 12, 2, 0, 0, tzinfo=datetime.timezone.utc),
+    }
+    processor._read_loaded_versions = MagicMock(return_value={
+        1003: datetime.datetime(2024, 12, 1, 17, 0, tzinfo=datetime.timezone.utc),
+    })
+    processor._write_watermarks = lambda watermarks: None
+    upserted = []
+    processor._upsert_matches = lambda df, referees, load_timestamp: upserted.extend(df['id'])
+
+    processor.process()
+
+    processor._read_loaded_versions.assert_called_once_with([1001, 1002, 1003])
+    assert upserted == [1001, 1002]
+
+def test_sync_only_lands_the_matches_without_the_postgres_sink(mock_matches_response):
+    processor = MatchesSyncProcessor(MagicMock(), schema='raw', table='matches')
+    processor.write_postgres, processor.db = False, MagicMock()
+    processor.db.select.return_value = [(2021,), (2014,)]
+    processor.api_connection.get_matches.return_value = mock_matches_response
+    landed = []
+    processor._land = lambda df, table=None: landed.append((table, list(df.get('id', df.get('match_id')))))
+
+    processor.process()
+
+    # The competitions are still read, nothing is created or written
+    assert [call[0] for call in processor.db.method_calls] == ['select']
+    assert landed[0] == (None, [1001, 1002, 1003])
+    assert landed[1][0] == 'match_referees'
+
+def test_compute_watermarks_takes_greatest_last_updated(matches):
+    assert compute_watermarks(matches) == {
+        2021: datetime.datetime(2024, 12, 1, 19, 30, tzinfo=datetime.timezone.utc),
+        2014: datetime.datetime(2024, 12, 1, 17, 0, tzinfo=datetime.timezone.utc),
+    }
+
+@patch('src.utils.football_api.requests.get')
+def test_get_matches_sends_window_and_competitions(mock_get, mock_matches_response):
+    mock_get.return_value.json.return_value = mock_matches_response
+    mock_get.return_value.status_code = 200
+
+    MatchesAPI(token=None).get_matches(datetime.date(2024, 11, 28), datetime.date(2024, 12, 2), [2021, 2014])
+
+    assert mock_get.call_args.kwargs['params'] == {"dateFrom": "2024-11-28", "dateTo": "2024-12-02", "competitions": "2021,2014"}
+
+def test_sync_window_respects_api_limit():
+    with pytest.raises(ValueError):
+        MatchesSyncProcessor(MatchesAPI(token=None), schema='raw', table='matches', lookback_days=9, lookahead_days=1)
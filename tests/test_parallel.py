@@ -0,0 +1,61 @@
+import pandas as pd
+import pytest
+from pydantic import ValidationError
+from src.utils import parallel
+from src.utils.matches_api import transform_matches_today
+from src.utils.parallel import ShardPool, decode_tables, encode_tables, pages
+from tests.fixtures.mock_responses import build_match, mock_matches_response
+
+def test_pages_are_valid_responses(mock_matches_response):
+    split = pages(mock_matches_response, size=2)
+
+    assert [[match['id'] for match in page['matches']] for page in split] == [[1001, 1002], [1003]]
+    assert all(page['filters'] == mock_matches_response['filters'] for page in split)
+    assert pages(mock_matches_response) == [mock_matches_response]
+
+def test_tables_survive_the_process_boundary(mock_matches_response):
+    tables = transform_matches_today(mock_matches_response)
+    tables['mixed'] = pd.DataFrame({'value': [1, 'a', None]})
+
+    encoded = encode_tables(tables)
+    decoded = decode_tables(encoded)
+
+    assert {name: kind for name, (kind, _) in encoded.items()} == {'matches': 'arrow', 'match_referees': 'arrow', 'mixed': 'pickle'}
+    # Arrow gives back the UTC of the dates as its own timezone object, the values are the same
+    pd.testing.assert_frame_equal(decoded['matches'], tables['matches'], check_dtype=False)
+    pd.testing.assert_frame_equal(decoded['match_referees'], tables['match_referees'])
+    assert list(decoded['mixed']['value']) == [1, 'a', None]
+
+def test_pool_gives_the_tables_of_the_process(mock_matches_response):
+    broken = {**mock_matches_response, 'matches': [{**build_match(1004), 'id': None}]}
+    shards = [(page,) for page in pages(mock_matches_response, size=1)] + [(broken,)]
+
+    with ShardPool(1) as pool:
+        expected = [shard.result() for shard in pool.map(transform_matches_today, shards[:-1])]
+    with ShardPool(2) as pool:
+        results = list(pool.map(transform_matches_today, shards))
+        tables = [shard.result() for shard in results[:-1]]
+        try:
+            results[-1].result()
+            assert False, 'the broken page should fail its contract'
+        except Exception as e:
+            assert 'id' in str(e)
+
+    assert [len(flat['matches']) for flat in tables] == [1, 1, 1]
+    for flat, expected_flat in zip(tables, expected):
+        pd.testing.assert_frame_equal(flat['matches'], expected_flat['matches'], check_dtype=False)
+
+def test_single_worker_transforms_the_shard_in_its_result(mock_matches_response):
+    broken = {**mock_matches_response, 'matches': [{**build_match(1004), 'id': None}]}
+
+    with ShardPool(1) as pool:
+        # Nothing runs on submit: the transform (and its error) belongs to the stage collecting the results
+        shard = pool.submit(transform_matches_today, broken)
+        with pytest.raises(ValidationError):
+            shard.result()
+
+def test_workers_from_env(monkeypatch):
+    monkeypatch.delenv('PROCESSOR_WORKERS', raising=False)
+    assert parallel.workers_from_env() == 1
+    assert parallel.workers_from_env('4') == 4
+    assert parallel.workers_from_env('auto') >= 1
@@ -0,0 +1,110 @@
+import datetime
+import os
+import pandas as pd
+import pytest
+from src.utils.database import Database
+from src.utils.partitions import (PARTITIONED_TABLES, check_retention, detach_expired_partitions, ensure_partitions,
+                                  expired_partitions, retention_cutoff)
+
+def test_matches_partitions_cover_each_month():
+    df = pd.DataFrame({'utc_date': ['2024-12-31T20:00:00Z', '2025-01-01T15:00:00Z', '2024-12-01T16:00:00Z']})
+
+    assert PARTITIONED_TABLES['matches'].partitions(df) == {
+        '2024_12': {'start': '2024-12-01 00:00:00+00', 'end': '2025-01-01 00:00:00+00'},
+        '2025_01': {'start': '2025-01-01 00:00:00+00', 'end': '2025-02-01 00:00:00+00'},
+    }
+
+def test_matches_partition_bounds_dont_depend_on_the_session_timezone():
+    # How Postgres reads a timestamptz literal: in the session TimeZone unless it has an offset
+    def as_postgres(literal, session_timezone):
+        value = datetime.datetime.fromisoformat(literal)
+        return value if value.tzinfo else value.replace(tzinfo=session_timezone)
+
+    match = datetime.datetime(2024, 12, 1, 1, 0, tzinfo=datetime.timezone.utc)
+    bounds = PARTITIONED_TABLES['matches'].partitions(pd.DataFrame({'utc_date': [match.isoformat()]}))['2024_12']
+    for session_timezone in (datetime.timezone.utc, datetime.timezone(datetime.timedelta(hours=-3)), datetime.timezone(datetime.timedelta(hours=9))):
+        assert as_postgres(bounds['start'], session_timezone) <= match < as_postgres(bounds['end'], session_timezone)
+
+@pytest.mark.skipif(not os.getenv('PG_HOST'), reason='needs a Postgres database (PG_* variables)')
+def test_matches_partitions_accept_rows_in_a_non_utc_session():
+    schema = 'test_partitions_timezone'
+    db = Database(db_name=os.getenv('PG_DB'), user=os.getenv('PG_USER'), password=os.getenv('PG_PASS'),
+                  host=os.getenv('PG_HOST'), port=5432)
+    try:
+        db.execute_query("SET TimeZone = 'America/Sao_Paulo'")
+        db.execute_query(f'DROP SCHEMA IF EXISTS {schema} CASCADE; CREATE SCHEMA {schema}')
+        db.execute_query(f'CREATE TABLE {schema}.matches (id BIGINT, utc_date TIMESTAMPTZ NOT NULL) PARTITION BY RANGE (utc_date)')
+        df = pd.DataFrame({'id': [1, 2], 'utc_date': ['2024-12-01T01:00:00Z', '2024-11-30T23:30:00Z']})
+
+        assert ensure_partitions(db, schema, 'matches', df) == ['matches_2024_11', 'matches_2024_12']
+        db.execute_query(f"INSERT INTO {schema}.matches VALUES (1, '2024-12-01T01:00:00Z'), (2, '2024-11-30T23:30:00Z')")
+        rows = db.execute_query(f'SELECT tableoid::regclass::text, id FROM {schema}.matches ORDER BY id')
+        assert [tuple(row) for row in rows] == [(f'{schema}.matches_2024_12', 1), (f'{schema}.matches_2024_11', 2)]
+    finally:
+        db.execute_query(f'DROP SCHEMA IF EXISTS {schema} CASCADE')
+        db.close()
+
+class FakeCatalog:
+    """Answers the catalog queries of the partitions module and records the DDL."""
+    def __init__(self, attached, tables=()):
+        self.attached = list(attached)
+        self.tables = set(tables) | set(attached)
+        self.ddl = []
+
+    def execute_query(self, query, params=None):
+        if 'pg_inherits' in query:
+            return [(partition,) for partition in sorted(self.attached)]
+        if 'to_regclass' in query:
+            return [(params[0] if params[0].split('.')[1] in self.tables else None,)]
+        self.ddl.append(' '.join(query.split()))
+        return None
+
+def test_ensure_partitions_skips_the_attached_partitions():
+    db = FakeCatalog(attached=['matches_2024_12'])
+    df = pd.DataFrame({'utc_date': ['2024-12-31T20:00:00Z', '2025-01-01T15:00:00Z']})
+
+    assert ensure_partitions(db, 'raw', 'matches', df) == ['matches_2024_12', 'matches_2025_01']
+    assert len(db.ddl) == 1 and 'raw.matches_2025_01 PARTITION OF raw.matches' in db.ddl[0]
+
+def test_ensure_partitions_recreates_a_detached_partition():
+    # Detached without being renamed: CREATE TABLE IF NOT EXISTS alone would leave the range without a partition
+    db = FakeCatalog(attached=[], tables=['competitions_standings_2023'])
+
+    ensure_partitions(db, 'raw', 'competitions_standings', pd.DataFrame({'season': [2023]}))
+
+    assert db.ddl[0].startswith('ALTER TABLE raw.competitions_standings_2023 RENAME TO competitions_standings_2023_detached_')
+    assert 'raw.competitions_standings_2023 PARTITION OF raw.competitions_standings' in db.ddl[1]
+
+def test_detached_partitions_are_renamed():
+    db = FakeCatalog(attached=['matches_2023_12', 'matches_2024_02'])
+
+    assert detach_expired_partitions(db, 'raw', 'matches', datetime.date(2024, 2, 1)) == ['matches_2023_12']
+    assert db.ddl[0] == 'ALTER TABLE raw.matches DETACH PARTITION raw.matches_2023_12;'
+    assert db.ddl[1].startswith('ALTER TABLE raw.matches_2023_12 RENAME TO matches_2023_12_detached_')
+
+def test_retention_keeps_the_reloaded_seasons():
+    today = datetime.date(2025, 3, 10)
+
+    # The standings loader reloads 2023, 2024 and 2025: the 2023 partition holds data until 2025-01-01
+    check_retention('competitions_standings', datetime.date(2024, 12, 1), today=today)
+    check_retention('matches', datetime.date(2025, 3, 1), today=today)
+    with pytest.raises(ValueError, match='season 2023'):
+        check_retention('competitions_standings', datetime.date(2025, 1, 1), today=today)
+
+def test_history_partitions_by_competition_and_year():
+    df = pd.DataFrame({'competition_id': [2021, 2021, 2014], 'load_date': [datetime.date(2024, 12, 1)] * 3})
+
+    assert list(PARTITIONED_TABLES['competitions_standings_history'].partitions(df)) == ['2014_2024', '2021_2024']
+
+def test_expired_partitions_only_selects_partitions_before_cutoff():
+    partitions = ['matches_2023_12', 'matches_2024_01', 'matches_2024_02', 'matches_default']
+
+    assert expired_partitions('matches', partitions, datetime.date(2024, 2, 1)) == ['matches_2023_12', 'matches_2024_01']
+
+def test_season_partitions_expire_after_the_season_ends():
+    partitions = ['competitions_standings_2022', 'competitions_standings_2023']
+
+    assert expired_partitions('competitions_standings', partitions, datetime.date(2024, 6, 1)) == ['competitions_standings_2022']
+
+def test_retention_cutoff_goes_back_whole_months():
+    assert retention_cutoff(3, today=datetime.date(2025, 2, 15)) == datetime.date(2024, 11, 1)
@@ -0,0 +1,49 @@
+import pytest
+import pandas as pd
+from src.utils.ratings import EloRatings
+
+def matches(rows):
+    return pd.DataFrame(rows, columns=['id', 'utc_date', 'competition_id', 'home_team_id', 'away_team_id', 'full_time_home', 'full_time_away'])
+
+MATCHES = matches([
+    (1, pd.Timestamp('2024-09-01', tz='UTC'), 2021, 64, 65, 2, 0),
+    (2, pd.Timestamp('2024-09-08', tz='UTC'), 2021, 65, 57, 1, 1),
+    (3, pd.Timestamp('2024-09-15', tz='UTC'), 2021, 57, 64, 0, 3),
+])
+
+def test_ratings_are_zero_sum_and_reward_the_winner():
+    ratings = EloRatings()
+    history = ratings.update(MATCHES)
+
+    state = ratings.state().set_index('team_id')
+    assert state['rating'].sum() == pytest.approx(1500 * 3)
+    assert state['rating'].idxmax() == 64
+    assert state['matches_played'].to_dict() == {64: 2, 57: 2, 65: 2}
+
+    liverpool = history[history['team_id'] == 64].sort_values('match_id')
+    assert liverpool['matches_played'].tolist() == [1, 2]
+    assert liverpool['rating_before'].iloc[1] == liverpool['rating_after'].iloc[0]
+
+def test_incremental_updates_match_a_full_recompute():
+    full = EloRatings()
+    full.update(MATCHES)
+
+    incremental = EloRatings()
+    incremental.update(MATCHES.iloc[:2])
+    restored = EloRatings.from_state(incremental.state())
+    restored.update(MATCHES.iloc[2:])
+
+    pd.testing.assert_frame_equal(restored.state(), full.state())
+
+def test_unrated_matches_are_read_however_old():
+    from unittest.mock import MagicMock
+    from src.utils.ratings import TeamRatingsProcessor
+
+    processor = TeamRatingsProcessor(schema='raw')
+    processor.db = MagicMock()
+
+    processor._read_unrated_matches()
+
+    # A result arriving long after the latest rated match must still be rated: only the anti-join filters
+    query = processor.db.select_pandas.call_args.args[0]
+    assert 'not exists' in query and 'utc_date >=' not in query
@@ -0,0 +1,74 @@
+import json
+from src.utils import replay
+from src.utils.archive import ResponseArchive
+from tests.fixtures.mock_responses import build_match, mock_matches_response
+
+class RecordingProcessor:
+    write_postgres = False
+
+    def __init__(self):
+        self.writes = []
+        self.upserts = []
+
+    def _validate_tables(self):
+        pass
+
+    def _write_to_db(self, df, table=None):
+        self.writes.append((table, df))
+
+    def _land(self, df, table=None):
+        self.writes.append((table, df))
+
+    def _upsert_matches(self, df, referees, load_timestamp):
+        self.upserts.append((df, referees, load_timestamp))
+
+def store(archive, endpoint, params, response, fetched_at):
+    archive.store(endpoint, params, json.dumps(response).encode(), fetched_at=fetched_at)
+
+def test_replaced_tables_keep_the_latest_response(tmp_path, monkeypatch, mock_matches_response):
+    archive = ResponseArchive(str(tmp_path))
+    older = {**mock_matches_response, 'matches': [build_match(1001, status="TIMED")]}
+    store(archive, 'matches', {}, older, '2024-12-01T10:00:00+00:00')
+    store(archive, 'matches', {}, mock_matches_response, '2024-12-01T20:00:00+00:00')
+    processor = RecordingProcessor()
+    monkeypatch.setattr(replay, '_processor', lambda request_type, schema: processor)
+
+    rows = replay.replay('matches_today', str(tmp_path), workers=2)
+
+    assert rows == {'matches_today': 3, 'match_referees': 3}
+    (table, df), (referees_table, _) = processor.writes
+    assert (table, referees_table) == ('matches_today', 'match_referees')
+    assert list(df['id']) == [1001, 1002, 1003]
+    assert set(df['status']) == {'FINISHED'}
+    assert set(df['load_timestamp']) == {'2024-12-01T20:00:00+00:00'}
+
+def test_matches_history_replays_every_distinct_response(tmp_path, monkeypatch, mock_matches_response):
+    archive = ResponseArchive(str(tmp_path))
+    params = {'dateFrom': '2024-11-28', 'dateTo': '2024-12-02'}
+    store(archive, 'matches', params, mock_matches_response, '2024-12-01T10:00:00+00:00')
+    store(archive, 'matches', params, mock_matches_response, '2024-12-01T11:00:00+00:00')
+    later = {**mock_matches_response, 'matches': [build_match(1001, last_updated="2024-12-01T21:00:00Z", home_score=2)]}
+    store(archive, 'matches', params, later, '2024-12-01T22:00:00+00:00')
+    # Today's matches (no window) aren't part of the history
+    store(archive, 'matches', {}, later, '2024-12-01T23:00:00+00:00')
+    processor = RecordingProcessor()
+    monkeypatch.setattr(replay, '_processor', lambda request_type, schema: processor)
+
+    assert len(replay.select_entries(archive, 'matches')) == 2
+    rows = replay.replay('matches', str(tmp_path), workers=2, batch_rows=3)
+
+    assert rows == {'matches': 4, 'match_referees': 4}
+    assert [len(df) for df, _, _ in processor.upserts] == [3, 1]
+    df, referees, load_timestamp = processor.upserts[-1]
+    assert df.loc[0, 'full_time_home'] == 2
+    assert load_timestamp == '2024-12-01T22:00:00+00:00'
+
+def test_responses_failing_their_contract_are_skipped(tmp_path, monkeypatch, mock_matches_response):
+    archive = ResponseArchive(str(tmp_path))
+    store(archive, 'matches', {'competitions': '2021'}, mock_matches_response, '2024-12-01T10:00:00+00:00')
+    broken = {**mock_matches_response, 'matches': [{**build_match(1004), 'id': None}]}
+    store(archive, 'matches', {'competitions': '2014'}, broken, '2024-12-01T10:00:00+00:00')
+    processor = RecordingProcessor()
+    monkeypatch.setattr(replay, '_processor', lambda request_type, schema: processor)
+
+    assert replay.replay('matches_today', str(tmp_path), workers=1) == {'matches_today': 3, 'match_referees': 3}
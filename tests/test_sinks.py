@@ -0,0 +1,71 @@
+import pandas as pd
+import pytest
+from unittest.mock import MagicMock
+from src.utils.database import Database
+from src.utils.sinks import ParquetSink, import_partition, partition_table
+
+def teams_load():
+    return pd.DataFrame({
+        'competition_id': [2021, 2021, 2014],
+        'team_id': [64, 65, 86],
+        'name': ['Liverpool FC', 'Manchester City FC', 'Real Madrid CF'],
+        'website': [None, None, None],
+        'load_timestamp': ['2024-12-01T10:00:00+00:00'] * 3,
+    }, index=[5, 5, 7])
+
+def test_parquet_sink_partitions_each_load(tmp_path):
+    sink = ParquetSink(str(tmp_path))
+
+    assert sink.write(teams_load(), 'raw', 'teams') == 3
+
+    files = sorted(path.relative_to(tmp_path).parent.as_posix() for path in tmp_path.rglob('*.parquet'))
+    assert files == ['teams/competition=2014/load_date=2024-12-01', 'teams/competition=2021/load_date=2024-12-01']
+    assert not list(tmp_path.rglob('*.tmp'))
+    assert partition_table(str(tmp_path / files[1])) == 'teams'
+
+def test_import_partition_imports_the_latest_load_of_the_partition(tmp_path):
+    sink = ParquetSink(str(tmp_path))
+    sink.write(teams_load(), 'raw', 'teams')
+    # A second load, where the all-null column of the first one has values
+    sink.write(teams_load().assign(website='https://www.liverpoolfc.com', load_timestamp='2024-12-02T10:00:00+00:00'), 'raw', 'teams')
+    db = MagicMock()
+
+    rows = import_partition(db, str(tmp_path / 'teams' / 'competition=2021'), truncate=True, batch_rows=1)
+
+    assert rows == 2
+    assert db.validate_table_exists.call_args.args[:2] == ('raw', 'teams')
+    # Only the rows of the competition are replaced, in the transaction of the inserts
+    assert db.execute_query.call_args_list[0].args == ('DELETE FROM raw.teams WHERE competition_id = %s', ['2021'])
+    assert db.transaction.return_value.__enter__.called
+    imported = pd.concat([call.args[0] for call in db.insert_pandas_bulk.call_args_list])
+    assert sorted(imported['team_id']) == [64, 65]
+    assert set(imported['website']) == {'https://www.liverpoolfc.com'}
+    assert {call.args[1] for call in db.insert_pandas_bulk.call_args_list} == {'raw.teams'}
+
+def test_import_partition_upserts_every_load_of_the_incremental_tables(tmp_path):
+    sink = ParquetSink(str(tmp_path))
+    match = {'id': 1, 'competition_id': 2021, 'utc_date': '2024-12-01T16:00:00Z'}
+    sink.write(pd.DataFrame([{**match, 'status': 'TIMED', 'load_timestamp': '2024-12-01T10:00:00+00:00'}]), 'raw', 'matches')
+    sink.write(pd.DataFrame([{**match, 'status': 'FINISHED', 'load_timestamp': '2024-12-02T10:00:00+00:00'},
+                             {**match, 'id': 2, 'status': 'TIMED', 'load_timestamp': '2024-12-02T10:00:00+00:00'}]), 'raw', 'matches')
+    db = MagicMock()
+
+    assert import_partition(db, str(tmp_path / 'matches')) == 3
+
+    upserts = db.upsert_pandas_bulk.call_args_list
+    assert [list(call.args[0]['status']) for call in upserts] == [['TIMED'], ['FINISHED', 'TIMED']]
+    assert {tuple(call.kwargs['conflict_columns']) for call in upserts} == {('id', 'utc_date')}
+    db.insert_pandas_bulk.assert_not_called()
+
+def test_transaction_rolls_back_every_query_of_the_block():
+    connection = MagicMock()
+    db = Database('football', 'user', 'password', 'localhost')
+    db.connection = connection
+
+    with pytest.raises(RuntimeError):
+        with db.transaction():
+            db.execute_query('DELETE FROM raw.teams')
+            raise RuntimeError('insert failed')
+
+    connection.commit.assert_not_called()
+    connection.rollback.assert_called_once()
@@ -0,0 +1,32 @@
+import datetime
+from src.utils.standings import standings_from_matches
+from src.contracts.matches_contract import Match
+from tests.fixtures.mock_responses import build_match
+
+def match(match_id, home_id, away_id, home_score, away_score, matchday, status='FINISHED'):
+    payload = build_match(match_id, status=status, home_score=home_score or 0, away_score=away_score or 0)
+    payload['score']['fullTime'] = {'home': home_score, 'away': away_score}
+    payload['homeTeam'] = {**payload['homeTeam'], 'id': home_id, 'name': f'Team {home_id}'}
+    payload['awayTeam'] = {**payload['awayTeam'], 'id': away_id, 'name': f'Team {away_id}'}
+    payload['matchday'] = matchday
+    payload['utcDate'] = f'2024-09-{matchday:02d}T15:00:00Z'
+    return Match(**payload)
+
+MATCHES = [
+    match(1, 1, 2, 2, 0, matchday=1),
+    match(2, 3, 1, 1, 1, matchday=2),
+    match(3, 2, 3, 0, 3, matchday=3),
+    match(4, 1, 2, None, None, matchday=4, status='SCHEDULED'),
+]
+
+def test_standings_are_rebuilt_from_results():
+    standings = standings_from_matches(MATCHES)
+
+    assert standings['team_id'].tolist() == [3, 1, 2]
+    assert standings.iloc[0][['position', 'played_games', 'won', 'draw', 'lost', 'points', 'goal_difference', 'form']].tolist() == [1, 2, 1, 1, 0, 4, 3, 'W,D']
+    assert standings.iloc[1][['points', 'goals_for', 'goals_against', 'form']].tolist() == [4, 3, 1, 'D,W']
+    assert standings['season'].unique().tolist() == [2024]
+
+def test_standings_on_a_matchday_or_date():
+    assert standings_from_matches(MATCHES, matchday=1)[['team_id', 'points']].values.tolist() == [[1, 3], [2, 0]]
+    assert standings_from_matches(MATCHES, as_of=datetime.datetime(2024, 9, 1, 23))['team_id'].tolist() == [1, 2]
@@ -0,0 +1,30 @@
+import json
+from benchmarks.payloads import SyntheticResponses, stream_response
+from src.contracts.competitions_contract import CompetitionsResponse
+from src.contracts.competitions_standings_contract import CompetitionStandingsResponse
+from src.contracts.competitions_top_scorers_contract import TopScorersResponse
+from src.contracts.matches_contract import MatchesTodayResponse
+from src.contracts.teams_contract import TeamsResponse
+
+def test_payloads_are_valid_for_every_contract():
+    responses = SyntheticResponses(scale=2, seed=7)
+
+    assert len(CompetitionsResponse(**responses.competitions()).competitions) == 26
+    assert len(CompetitionStandingsResponse(**responses.standings(2002, 2024)).standings[0].table) == 40
+    assert len(TopScorersResponse(**responses.top_scorers(2002)).scorers) == 20
+    teams = TeamsResponse(**responses.teams(2002)).teams
+    assert len(teams) == 40 and len(teams[0].squad) == 30
+    assert len(MatchesTodayResponse(**responses.team_upcoming_matches(20020001)).matches) == 10
+    today = MatchesTodayResponse(**responses.matches_today())
+    assert today.result_set.count == len(today.matches) == 80
+
+def test_streamed_match_history_is_deterministic():
+    def history(seed):
+        return b''.join(stream_response(SyntheticResponses(seed=seed).response('matches', count=1000), chunk_size=1024))
+
+    document = json.loads(history(1))
+    matches = MatchesTodayResponse(**document).matches
+    assert len(matches) == document['resultSet']['count'] == 1000
+    assert len({match.id for match in matches}) == 1000
+    assert [match.utc_date for match in matches] == sorted(match.utc_date for match in matches)
+    assert history(1) == history(1) != history(2)
@@ -0,0 +1,27 @@
+import pandas as pd
+from src.utils.table_profiles import profile_dataframe, profile_drift
+
+def test_profile_dataframe_counts_nulls_and_distinct_values():
+    df = pd.DataFrame({
+        'id': [1, 2, 3, 4],
+        'name': ['Liverpool', None, 'Arsenal', 'Arsenal'],
+        'raw_json': [{'id': 1}, {'id': 2}, None, None],
+    })
+
+    profile = profile_dataframe(df).set_index('column_name')
+
+    assert profile.loc['id', ['null_count', 'distinct_count', 'min_value', 'max_value']].tolist() == [0, 4, '1', '4']
+    assert profile.loc['name', 'null_percentage'] == 25.0
+    assert profile.loc['name', 'distinct_count'] == 2
+    # Dicts are unhashable and unordered
+    assert profile.loc['raw_json', 'distinct_count'] == 2
+    assert profile.loc['raw_json', 'min_value'] is None
+
+def test_profile_drift_flags_null_jumps_and_new_columns():
+    previous = profile_dataframe(pd.DataFrame({'id': [1, 2], 'coach_id': [10, 11]}))
+    current = profile_dataframe(pd.DataFrame({'id': [1, 2], 'coach_id': [10, None], 'venue': ['Anfield', 'Emirates']}))
+
+    drift = profile_drift(current, previous).set_index('column_name')
+
+    assert drift['drifted'].to_dict() == {'coach_id': True, 'id': False, 'venue': True}
+    assert drift.loc['coach_id', 'null_percentage_change'] == 50.0
@@ -1,5 +1,7 @@
 import pytest, os
+import pandas as pd
 from src.utils.teams_api import TeamsAPI
+from tests.fixtures.mock_responses import mock_matches_response
 
 @pytest.fixture
 def api_instance():
@@ -15,3 +17,34 @@ def test_get_team_by_id(api_instance):
     team = api_instance.get_team_by_id(64)  # Exemplo: Liverpool FC
     assert isinstance(team, dict)
     assert "name" in team
+
+def test_upcoming_matches_shared_by_two_teams_are_written_once(monkeypatch, mock_matches_response):
+    from src.utils.teams_api import TeamUpcomingMatchesProcessor, transform_team_matches
+
+    written = []
+    monkeypatch.setattr(TeamUpcomingMatchesProcessor.__bases__[0], '_write_to_db', lambda self, df, table=None: written.append(df))
+    upcoming = TeamUpcomingMatchesProcessor.__new__(TeamUpcomingMatchesProcessor)
+    upcoming.schema, upcoming.table, upcoming.write_postgres = 'raw', 'teams_upcoming_matches', False
+    # Liverpool and Manchester City both list the match 1001
+    df = pd.concat([transform_team_matches(mock_matches_response)['teams_upcoming_matches']] * 2)
+
+    upcoming._write_to_db(df)
+
+    assert list(written[0]['id']) == [1001, 1002, 1003]
+
+def test_upcoming_matches_referees_are_written(monkeypatch, mock_matches_response):
+    from unittest.mock import MagicMock
+    from src.utils.teams_api import TeamUpcomingMatchesProcessor
+
+    monkeypatch.setattr(TeamUpcomingMatchesProcessor.__bases__[0], '_write_to_db', lambda self, df, table=None: None)
+    upcoming = TeamUpcomingMatchesProcessor(MagicMock(), schema='raw', table='teams_upcoming_matches')
+    upcoming.db, upcoming.write_postgres, upcoming.workers = MagicMock(), True, 1
+    upcoming.db.select.return_value = [(64,), (65,)]
+    upcoming.api_connection.get_team_upcoming_matches.return_value = mock_matches_response
+
+    upcoming.process()
+
+    (referees, table), kwargs = upcoming.db.upsert_pandas_bulk.call_args
+    assert table == 'raw.match_referees' and kwargs['conflict_columns'] == ['match_id', 'referee_id']
+    # Each referee once, although both teams list the matches
+    assert len(referees) == len(referees.drop_duplicates(subset=['match_id', 'referee_id'])) > 0
@@ -0,0 +1,54 @@
+import json
+import pytest
+from src.utils.processor import Processor
+from src.utils.telemetry import JsonLinesMetrics, PrometheusTextfileMetrics, StageRecord
+
+class FakeAPI:
+    last_response_bytes = 128
+
+    def get_items(self):
+        return {"items": [1, 2, 3]}
+
+class ItemsProcessor(Processor):
+    def __init__(self, backend):
+        super().__init__(FakeAPI(), 'ItemsProcessor')
+        self.table = 'items'
+        self.backend = backend
+
+    def on_stage_end(self, record):
+        self.backend.record(record)
+
+    def process(self):
+        response = self._fetch(self.api_connection.get_items)
+        with self.stage('transform') as stage:
+            stage.rows = len(response['items'])
+        with self.stage('load'):
+            raise RuntimeError('database down')
+
+def test_processor_stages_are_recorded(tmp_path):
+    path = tmp_path / 'stages.jsonl'
+
+    with pytest.raises(RuntimeError):
+        ItemsProcessor(JsonLinesMetrics(str(path))).process()
+
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [(r['stage'], r['table'], r['rows'], r['bytes'], r['error']) for r in records] == [
+        ('fetch', 'items', None, 128, None),
+        ('transform', 'items', 3, None, None),
+        ('load', 'items', None, None, 'RuntimeError'),
+    ]
+    assert all(r['seconds'] >= 0 and r['timestamp'] for r in records)
+
+def test_prometheus_textfile_sums_a_run_and_keeps_other_processors(tmp_path):
+    path = tmp_path / 'football.prom'
+    PrometheusTextfileMetrics(str(path)).record(StageRecord('TeamsProcessor', 'teams', 'load', seconds=2.0, rows=10))
+
+    backend = PrometheusTextfileMetrics(str(path))
+    for rows in (3, 4):
+        backend.record(StageRecord('MatchesProcessor', 'matches_today', 'fetch', seconds=0.5, rows=rows, bytes=100))
+
+    text = path.read_text()
+    assert 'football_processor_stage_rows{processor="TeamsProcessor",stage="load",table="teams"} 10' in text
+    assert 'football_processor_stage_rows{processor="MatchesProcessor",stage="fetch",table="matches_today"} 7' in text
+    assert 'football_processor_stage_calls{processor="MatchesProcessor",stage="fetch",table="matches_today"} 2' in text
+    assert '# TYPE football_processor_stage_seconds gauge' in text